@@ -1,10 +1,19 @@
 from flask import Flask, request, send_file, render_template
-from docxtpl import DocxTemplate
 import os
+import sys
 from datetime import datetime
 import io
 
+# Share the cover template cache with the main report app
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from template_cache import template_cache
+
 app = Flask(__name__)
+app.config['REPORT_TEMPLATE'] = os.path.join(app.root_path, 'templates', 'report_template.docx')
+
+# Parse the template once at start so the first request renders from the cache
+if os.path.exists(app.config['REPORT_TEMPLATE']):
+    template_cache.warm(app.config['REPORT_TEMPLATE'])
 
 @app.route('/')
 def index():
@@ -20,8 +29,7 @@ def generate_document():
     findings_count = request.form.get('findingsCount', '5')
     
    
-    template_path = os.path.join(app.root_path, 'templates', 'report_template.docx')
-    doc = DocxTemplate(template_path)
+    doc = template_cache.get(app.config['REPORT_TEMPLATE'])
     
    
     context = {
@@ -0,0 +1,223 @@
+"""
+Batch generation of client reports from a manifest.
+
+The manifest is a CSV with one report per row:
+
+    csv_path,finding_id_prefix,company_name,network_type,assessment_date
+    scans/acme.csv,ACME,Acme Corp,External Network,2025-01-31
+
+network_type, assessment_date (YYYY-MM-DD) and findings_count are optional
+and default as in the web form; relative csv_path values are resolved
+against the manifest's directory. Reports are built on a process pool whose
+workers load the cover template and the finding block template once, when
+they start, and every report is written to the output directory along with
+batch_summary.json, which records the outcome and stage timings of each
+entry.
+
+    python batch_reports.py manifest.csv -o reports/ [--workers 4] [--cache-dir finding_cache]
+                            [--scan-cache-dir scan_cache]
+"""
+import argparse
+import csv
+import json
+import logging
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from finding_cache import FindingCache
+from scan_cache import ScanCache
+from report_logging import configure_logging
+from report_pipeline import build_report_document
+from report_profiling import ReportProfiler, stage
+from script5 import get_finding_block_template
+from template_cache import template_cache
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TEMPLATE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'templates', 'report_template.docx')
+SUMMARY_FILENAME = 'batch_summary.json'
+
+MANIFEST_REQUIRED_FIELDS = ('csv_path', 'finding_id_prefix', 'company_name')
+# Optional fields and their defaults, matching the web form
+MANIFEST_DEFAULTS = {
+    'network_type': 'External Network',
+    'assessment_date': '',
+    'findings_count': '5',
+}
+
+
+class ManifestError(Exception):
+    """The manifest is missing columns or has an invalid entry"""
+
+
+def read_manifest(manifest_path):
+    """Return the manifest entries as dicts, with csv_path made absolute and defaults filled in"""
+    base_dir = os.path.dirname(os.path.abspath(manifest_path))
+    with open(manifest_path, newline='', encoding='utf-8') as manifest_file:
+        reader = csv.DictReader(manifest_file)
+        missing = [field for field in MANIFEST_REQUIRED_FIELDS if field not in (reader.fieldnames or [])]
+        if missing:
+            raise ManifestError(f"Manifest is missing column(s): {', '.join(missing)}")
+        entries = []
+        for line_number, row in enumerate(reader, start=2):
+            entry = {field: (row.get(field) or default).strip() for field, default in MANIFEST_DEFAULTS.items()}
+            for field in MANIFEST_REQUIRED_FIELDS:
+                value = (row.get(field) or '').strip()
+                if not value:
+                    raise ManifestError(f"Manifest line {line_number}: {field} is empty")
+                entry[field] = value
+            entry['csv_path'] = os.path.join(base_dir, entry['csv_path'])
+            entries.append(entry)
+    logger.info(f"Read {len(entries)} entries from manifest {manifest_path}")
+    return entries
+
+
+def report_context(entry):
+    """Cover template context for one entry, as the web form builds it"""
+    if entry['assessment_date']:
+        assessment_date = datetime.strptime(entry['assessment_date'], '%Y-%m-%d').strftime('%d/%m/%Y')
+    else:
+        assessment_date = datetime.now().strftime('%d/%m/%Y')
+    return {
+        'companyName': entry['company_name'],
+        'networkType': entry['network_type'],
+        'assessmentDate': assessment_date,
+        'findingsCount': entry['findings_count'],
+    }
+
+
+def output_filenames(entries):
+    """One unique report filename per entry: <prefix>_<company>_vulnerability_report.docx"""
+    filenames = []
+    seen = set()
+    for entry in entries:
+        stem = re.sub(r'[^A-Za-z0-9._-]+', '_', f"{entry['finding_id_prefix']}_{entry['company_name']}").strip('._')
+        filename = f"{stem}_vulnerability_report.docx"
+        counter = 2
+        while filename in seen:
+            filename = f"{stem}_{counter}_vulnerability_report.docx"
+            counter += 1
+        seen.add(filename)
+        filenames.append(filename)
+    return filenames
+
+
+def warm_worker(template_path):
+    """Pool initializer: set up logging and load the shared templates once per worker"""
+    configure_logging("batch_reports")
+    try:
+        template_cache.warm(template_path)
+        get_finding_block_template()
+    except Exception as e:
+        # Each report reports its own failure if the templates really cannot be loaded
+        logger.error(f"Worker warm-up failed: {str(e)}")
+
+
+def run_batch_entry(entry, output_path, template_path, finding_cache_dir=None, scan_cache_dir=None):
+    """Build and save one report; returns its summary record and never raises"""
+    record = {
+        'csv_path': entry['csv_path'],
+        'finding_id_prefix': entry['finding_id_prefix'],
+        'company_name': entry['company_name'],
+        'output_path': output_path,
+    }
+    profiler = ReportProfiler()
+    try:
+        with profiler.run():
+            doc, merged = build_report_document(
+                entry['csv_path'],
+                entry['finding_id_prefix'],
+                report_context(entry),
+                template_path,
+                FindingCache(finding_cache_dir) if finding_cache_dir else None,
+                ScanCache(scan_cache_dir) if scan_cache_dir else None,
+            )
+            with stage("save"):
+                doc.save(output_path)
+        record.update(status='done', merged=merged)
+        logger.info(f"Report for {entry['company_name']} written to {output_path}")
+    except Exception as e:
+        record.update(status='failed', error=str(e))
+        if e.__cause__ is not None:
+            # Pipeline errors carry a user-facing message; keep the underlying reason too
+            record['cause'] = str(e.__cause__)
+        logger.error(f"Report for {entry['company_name']} failed: {str(e)}")
+    record.update(profiler.report())
+    return record
+
+
+def run_batch(entries, output_dir, template_path=DEFAULT_TEMPLATE_PATH, workers=None, finding_cache_dir=None,
+              scan_cache_dir=None):
+    """
+    Build the report of every manifest entry into output_dir and return the batch summary.
+
+    With more than one worker the entries run on a process pool; otherwise
+    they run one after the other in this process.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    workers = max(1, min(workers or os.cpu_count() or 1, len(entries) or 1))
+    output_paths = [os.path.join(output_dir, filename) for filename in output_filenames(entries)]
+    logger.info(f"Building {len(entries)} reports with {workers} worker(s)")
+
+    start = time.perf_counter()
+    if workers == 1:
+        warm_worker(template_path)
+        records = [run_batch_entry(entry, output_path, template_path, finding_cache_dir, scan_cache_dir)
+                   for entry, output_path in zip(entries, output_paths)]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=warm_worker, initargs=(template_path,)) as executor:
+            futures = [executor.submit(run_batch_entry, entry, output_path, template_path, finding_cache_dir,
+                                       scan_cache_dir)
+                       for entry, output_path in zip(entries, output_paths)]
+            records = [future.result() for future in futures]
+
+    failed = sum(1 for record in records if record['status'] != 'done')
+    return {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'template_path': template_path,
+        'workers': workers,
+        'reports': len(records),
+        'succeeded': len(records) - failed,
+        'failed': failed,
+        'total_seconds': round(time.perf_counter() - start, 6),
+        'entries': records,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build client reports for every entry of a manifest")
+    parser.add_argument('manifest', help="CSV manifest: csv_path, finding_id_prefix, company_name, ...")
+    parser.add_argument('-o', '--output-dir', required=True, help="directory for the reports and the summary")
+    parser.add_argument('--template', default=DEFAULT_TEMPLATE_PATH, help="cover page template")
+    parser.add_argument('--workers', type=int, help="report processes (default: one per CPU)")
+    parser.add_argument('--cache-dir', help="finding page cache shared by all reports")
+    parser.add_argument('--scan-cache-dir', help="parsed scan cache, so scans shared by several entries are parsed once")
+    parser.add_argument('--summary', help=f"summary file (default: <output-dir>/{SUMMARY_FILENAME})")
+    args = parser.parse_args(argv)
+
+    configure_logging("batch_reports")
+    try:
+        entries = read_manifest(args.manifest)
+    except (OSError, ManifestError) as e:
+        parser.error(str(e))
+
+    summary = run_batch(entries, args.output_dir, args.template, args.workers, args.cache_dir, args.scan_cache_dir)
+    summary_path = args.summary or os.path.join(args.output_dir, SUMMARY_FILENAME)
+    with open(summary_path, 'w', encoding='utf-8') as summary_file:
+        json.dump(summary, summary_file, indent=2)
+
+    print(f"{summary['succeeded']} of {summary['reports']} reports built in {summary['total_seconds']:.1f}s, "
+          f"summary written to {summary_path}")
+    for record in summary['entries']:
+        if record['status'] != 'done':
+            cause = f" ({record['cause']})" if 'cause' in record else ""
+            print(f"FAILED {record['company_name']} ({record['csv_path']}): {record['error']}{cause}")
+    return 1 if summary['failed'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
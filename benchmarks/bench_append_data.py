@@ -0,0 +1,39 @@
+"""
+Scaling benchmark for the detail page build in script5.main.
+
+Runs the full generation for increasing finding counts and reports the time
+per finding, which should stay roughly constant now that append_data fills
+the tables returned by create_table instead of re-scanning doc.tables.
+
+    python benchmarks/bench_append_data.py
+"""
+import logging
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import script5
+from synthetic_csv import write_synthetic_csv
+
+FINDING_COUNTS = [10, 100, 500, 1000, 2000]
+
+
+def time_generation(findings):
+    with tempfile.TemporaryDirectory() as work_dir:
+        csv_path = write_synthetic_csv(os.path.join(work_dir, 'dataset.csv'), findings=findings)
+        output_path = os.path.join(work_dir, 'output_document.docx')
+        start = time.perf_counter()
+        if not script5.main('BENCH', csv_path=csv_path, output_path=output_path):
+            raise RuntimeError(f"Generation failed for {findings} findings")
+        return time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    script5.logger.setLevel(logging.WARNING)
+    print(f"{'findings':>10} {'seconds':>10} {'ms/finding':>12}")
+    for count in FINDING_COUNTS:
+        elapsed = time_generation(count)
+        print(f"{count:>10} {elapsed:>10.2f} {elapsed / count * 1000:>12.2f}")
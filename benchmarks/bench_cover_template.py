@@ -0,0 +1,80 @@
+"""
+Cold versus warm cover rendering.
+
+Cold builds a DocxTemplate from disk for every render, as the web app used
+to; warm renders through template_cache. Uses templates/report_template.docx
+when present, otherwise a generated template of similar shape.
+
+    python benchmarks/bench_cover_template.py [renders]
+"""
+import io
+import logging
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from docx import Document
+from docxtpl import DocxTemplate
+
+import template_cache
+
+CONTEXT = {
+    'companyName': 'Example Corp',
+    'networkType': 'External Network',
+    'assessmentDate': '01/01/2025',
+    'findingsCount': '42',
+}
+
+
+def write_sample_template(path, paragraphs=400):
+    doc = Document()
+    doc.add_heading('{{ companyName }} - {{ networkType }} Assessment', 0)
+    for i in range(paragraphs):
+        doc.add_paragraph(f"Section {i}: assessment of {{{{ companyName }}}} performed on {{{{ assessmentDate }}}}.")
+    table = doc.add_table(rows=4, cols=2)
+    for row_index, key in enumerate(CONTEXT):
+        table.cell(row_index, 0).text = key
+        table.cell(row_index, 1).text = f"{{{{ {key} }}}}"
+    doc.save(path)
+    return path
+
+
+def render_cold(template_path):
+    doc = DocxTemplate(template_path)
+    doc.render(CONTEXT)
+    doc.save(io.BytesIO())
+
+
+def render_warm(template_path):
+    doc = template_cache.template_cache.get(template_path)
+    doc.render(CONTEXT)
+    doc.save(io.BytesIO())
+
+
+def time_renders(render, template_path, renders):
+    start = time.perf_counter()
+    for _ in range(renders):
+        render(template_path)
+    return (time.perf_counter() - start) / renders
+
+
+if __name__ == '__main__':
+    renders = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    template_cache.logger.setLevel(logging.WARNING)
+    repo_template = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'templates', 'report_template.docx')
+    with tempfile.TemporaryDirectory() as work_dir:
+        if os.path.exists(repo_template):
+            template_path = repo_template
+        else:
+            template_path = write_sample_template(os.path.join(work_dir, 'report_template.docx'))
+
+        template_cache.template_cache.warm(template_path, CONTEXT)
+        cold = time_renders(render_cold, template_path, renders)
+        warm = time_renders(render_warm, template_path, renders)
+
+    print(f"template:      {template_path}")
+    print(f"cold render:   {cold * 1000:.1f} ms")
+    print(f"warm render:   {warm * 1000:.1f} ms")
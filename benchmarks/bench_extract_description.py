@@ -0,0 +1,84 @@
+"""
+extract_description on Nessus-length plugin descriptions.
+
+Compares the previous implementation (implicit re cache, debug f-strings
+always built, substring test on every pattern) with script5's compiled,
+memoised one, once per row as ingestion sees them (the same description
+repeated for every host) and once on unique descriptions only. Outputs are
+checked to be identical.
+
+    python benchmarks/bench_extract_description.py [rows] [hosts_per_finding]
+"""
+import logging
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import script5
+
+legacy_logger = logging.getLogger('legacy_extract_description')
+
+
+def legacy_extract_description(text):
+    legacy_logger.debug(f"Extracting description from: {text}")
+    if not text:
+        return text
+    if len(text) < 200:
+        return text
+    special_patterns = re.findall(r'\b\w+\.\w+\b', text)
+    legacy_logger.debug(f"Found special patterns to preserve: {special_patterns}")
+    sentences = re.split(r'\.(?=\s+[A-Z])', text)
+    if len(sentences) <= 1:
+        return text
+    result = sentences[0] + '.'
+    if len(sentences) > 1:
+        if len(sentences[1]) < 150:
+            result += sentences[1] + '.'
+    for pattern in special_patterns:
+        if pattern not in result and len(result) + len(pattern) + 20 < 400:
+            result += f" Relevant: {pattern}."
+    legacy_logger.debug(f"Extracted description: {result}")
+    return result
+
+
+def nessus_description(index):
+    """A plugin description of realistic length: advisory prose plus a long list of affected versions"""
+    versions = ", ".join(f"{major}.{minor}.{index % 30}" for major in range(1, 6) for minor in range(0, 40))
+    return (
+        f"According to its self-reported version number, the remote host is running Apache httpd 2.4.{index} "
+        f"which is affected by multiple vulnerabilities in mod_proxy and mod_http2 as referenced in the "
+        f"httpd.apache.org advisory and the ASP.NET compatibility notes. "
+        f"An unauthenticated, remote attacker can exploit this to cause a denial of service or disclose "
+        f"sensitive information. Affected releases include {versions}. "
+        f"Note that Nessus has not tested for these issues but has instead relied only on the application's "
+        f"self-reported version number. See also e.g. CVE-2024-{index:05d}."
+    )
+
+
+def time_calls(function, texts):
+    start = time.perf_counter()
+    results = [function(text) for text in texts]
+    return time.perf_counter() - start, results
+
+
+if __name__ == '__main__':
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    hosts_per_finding = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    logging.getLogger().setLevel(logging.WARNING)
+    script5.logger.setLevel(logging.WARNING)
+
+    unique = [nessus_description(index) for index in range(rows // hosts_per_finding)]
+    per_row = [text for text in unique for _ in range(hosts_per_finding)]
+    print(f"rows: {len(per_row)}, unique descriptions: {len(unique)}, "
+          f"average length: {sum(map(len, unique)) // len(unique)} chars")
+
+    for label, texts in (('per row', per_row), ('unique', unique)):
+        script5.extract_description.cache_clear()
+        legacy_time, legacy_results = time_calls(legacy_extract_description, texts)
+        current_time, current_results = time_calls(script5.extract_description, texts)
+        identical = 'yes' if legacy_results == current_results else 'NO'
+        print(f"{label:>8}: legacy {legacy_time:.3f}s  current {current_time:.3f}s  "
+              f"speedup {legacy_time / current_time:.1f}x  identical: {identical}")
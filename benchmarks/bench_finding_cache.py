@@ -0,0 +1,59 @@
+"""
+Cold, warm and one-host-added regeneration with the finding page cache.
+
+    python benchmarks/bench_finding_cache.py [findings]
+"""
+import csv
+import logging
+import os
+import sys
+import tempfile
+import time
+import zipfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import script5
+from synthetic_csv import write_synthetic_csv
+
+
+def timed_main(csv_path, output_path, cache_dir):
+    start = time.perf_counter()
+    if not script5.main('BENCH', csv_path=csv_path, output_path=output_path, cache_dir=cache_dir):
+        raise RuntimeError("Report generation failed")
+    return time.perf_counter() - start
+
+
+def document_xml(path):
+    with zipfile.ZipFile(path) as docx:
+        return docx.read('word/document.xml')
+
+
+if __name__ == '__main__':
+    findings = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    logging.getLogger().setLevel(logging.WARNING)
+    script5.logger.setLevel(logging.WARNING)
+    with tempfile.TemporaryDirectory() as work_dir:
+        csv_path = write_synthetic_csv(os.path.join(work_dir, 'dataset.csv'), findings=findings)
+        cache_dir = os.path.join(work_dir, 'cache')
+
+        # The same scan with one more affected host on one finding
+        with open(csv_path, newline='', encoding='utf-8') as csv_file:
+            rows = list(csv.reader(csv_file))
+        extra_row = list(rows[1])
+        extra_row[rows[0].index(script5.required_fields['host'])] = '192.0.2.1'
+        edited_path = os.path.join(work_dir, 'edited.csv')
+        with open(edited_path, 'w', newline='', encoding='utf-8') as csv_file:
+            csv.writer(csv_file).writerows(rows + [extra_row])
+
+        uncached = timed_main(csv_path, os.path.join(work_dir, 'uncached.docx'), None)
+        cold = timed_main(csv_path, os.path.join(work_dir, 'cold.docx'), cache_dir)
+        warm = timed_main(csv_path, os.path.join(work_dir, 'warm.docx'), cache_dir)
+        edited = timed_main(edited_path, os.path.join(work_dir, 'edited.docx'), cache_dir)
+
+        identical = document_xml(os.path.join(work_dir, 'uncached.docx')) == document_xml(os.path.join(work_dir, 'warm.docx'))
+        print(f"findings: {findings}")
+        print(f"{'no cache':>10} {uncached:>8.2f}s")
+        print(f"{'cold':>10} {cold:>8.2f}s")
+        print(f"{'warm':>10} {warm:>8.2f}s  identical to uncached: {'yes' if identical else 'NO'}")
+        print(f"{'one edit':>10} {edited:>8.2f}s")
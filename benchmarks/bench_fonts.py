@@ -0,0 +1,67 @@
+"""
+Font normalisation benchmark on a generated report.
+
+Compares the previous per-paragraph / per-table python-docx walk (the one
+used by reset_document_fonts and enforce_font_on_appended_content) against
+script5.normalize_fonts, which updates runs in a single lxml pass.
+
+    python benchmarks/bench_fonts.py [findings]
+"""
+import logging
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from docx import Document
+from docx.shared import Pt
+
+import script5
+from synthetic_csv import write_synthetic_csv
+
+
+def legacy_font_walk(doc, font_name="Helvetica", font_size=10.5):
+    for paragraph in doc.paragraphs:
+        for run in paragraph.runs:
+            run.font.name = font_name
+            run.font.size = Pt(font_size)
+    for table in doc.tables:
+        for row in table.rows:
+            for cell in row.cells:
+                for paragraph in cell.paragraphs:
+                    for run in paragraph.runs:
+                        run.font.name = font_name
+                        run.font.size = Pt(font_size)
+
+
+def build_report(work_dir, findings):
+    csv_path = write_synthetic_csv(os.path.join(work_dir, 'dataset.csv'), findings=findings)
+    output_path = os.path.join(work_dir, 'output_document.docx')
+    start = time.perf_counter()
+    if not script5.main('BENCH', csv_path=csv_path, output_path=output_path):
+        raise RuntimeError("Report generation failed")
+    return output_path, time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    findings = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    script5.logger.setLevel(logging.WARNING)
+    with tempfile.TemporaryDirectory() as work_dir:
+        report_path, generation_time = build_report(work_dir, findings)
+
+        doc = Document(report_path)
+        start = time.perf_counter()
+        legacy_font_walk(doc)
+        legacy_time = time.perf_counter() - start
+
+        doc = Document(report_path)
+        start = time.perf_counter()
+        script5.normalize_fonts(doc, "Helvetica", 10.5, elements=[doc.element.body])
+        single_pass_time = time.perf_counter() - start
+
+    print(f"findings:                {findings}")
+    print(f"report generation:       {generation_time:.2f}s")
+    print(f"legacy run walk:         {legacy_time:.2f}s")
+    print(f"normalize_fonts (lxml):  {single_pass_time:.2f}s")
@@ -0,0 +1,50 @@
+"""
+Peak memory of CSV ingestion as the row count grows.
+
+The number of unique findings and hosts is fixed while the number of scans
+merged into the CSV (and so the row count) grows; peak memory of
+script5.load_grouped_vulnerabilities should stay roughly flat.
+
+    python benchmarks/bench_ingest_memory.py [csv|columnar]
+"""
+import logging
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import script5
+from synthetic_csv import write_synthetic_csv
+
+FINDINGS = 500
+HOSTS_PER_FINDING = 20
+SCAN_COUNTS = [1, 5, 20, 50]
+
+
+def measure_ingestion(csv_path, engine):
+    tracemalloc.start()
+    start = time.perf_counter()
+    grouped = script5.load_grouped_vulnerabilities(csv_path, 'BENCH', engine)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return len(grouped), elapsed, peak
+
+
+if __name__ == '__main__':
+    engine = sys.argv[1] if len(sys.argv) > 1 else 'csv'
+    script5.logger.setLevel(logging.WARNING)
+    print(f"engine: {engine}")
+    print(f"{'rows':>10} {'csv MB':>8} {'findings':>9} {'seconds':>9} {'peak MB':>9}")
+    with tempfile.TemporaryDirectory() as work_dir:
+        for scans in SCAN_COUNTS:
+            csv_path = os.path.join(work_dir, f'scan_{scans}.csv')
+            write_synthetic_csv(csv_path, findings=FINDINGS, hosts_per_finding=HOSTS_PER_FINDING, scans=scans)
+            rows = FINDINGS * HOSTS_PER_FINDING * scans
+            size_mb = os.path.getsize(csv_path) / (1024 * 1024)
+            findings, elapsed, peak = measure_ingestion(csv_path, engine)
+            os.remove(csv_path)
+            print(f"{rows:>10} {size_mb:>8.1f} {findings:>9} {elapsed:>9.2f} {peak / (1024 * 1024):>9.2f}")
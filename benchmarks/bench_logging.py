@@ -0,0 +1,90 @@
+"""
+Per-row logging overhead of CSV ingestion.
+
+Runs script5.group_vulnerabilities over a synthetic CSV three ways, each in
+its own process since logging configuration is global:
+
+  legacy  the previous setup: FileHandler + stdout StreamHandler written
+          synchronously, with the two INFO lines per row the loop used to emit
+  queued  the previous per-row lines, but through report_logging's
+          QueueHandler/QueueListener writer
+  current report_logging with the per-stage counters the loop now uses
+
+Console output of each run goes to /dev/null so the terminal is not the
+bottleneck being measured.
+
+    python benchmarks/bench_logging.py [rows]
+"""
+import csv
+import logging
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+MODES = ['legacy', 'queued', 'current']
+
+
+def rows_with_legacy_logging(csv_reader, logger):
+    """Yield rows while logging them the way the ingestion loop used to"""
+    for row_count, row in enumerate(csv_reader, start=1):
+        logger.info(f"Processing row {row_count}")
+        yield row
+        logger.info(f"Successfully processed vulnerability: {row[0]}")
+
+
+def run_mode(mode, csv_path, log_dir):
+    import script5
+    from report_logging import configure_logging, shutdown_logging
+
+    if mode == 'legacy':
+        logging.basicConfig(
+            level=logging.INFO,
+            format='%(asctime)s - %(levelname)s - %(message)s',
+            handlers=[
+                logging.FileHandler(os.path.join(log_dir, 'legacy.log')),
+                logging.StreamHandler(sys.stdout),
+            ],
+        )
+    else:
+        configure_logging(f'bench_{mode}', log_dir=log_dir)
+
+    start = time.perf_counter()
+    with open(csv_path, newline='', encoding='utf-8') as csv_file:
+        csv_reader = csv.reader(csv_file)
+        column_map = script5.build_column_map(next(csv_reader))
+        if mode != 'current':
+            csv_reader = rows_with_legacy_logging(csv_reader, script5.logger)
+        script5.group_vulnerabilities(csv_reader, column_map)
+    elapsed = time.perf_counter() - start
+    # Include draining the queue, so the queued modes are not flattered
+    shutdown_logging()
+    return elapsed, time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1 and sys.argv[1] == '--mode':
+        elapsed, total = run_mode(sys.argv[2], sys.argv[3], sys.argv[4])
+        sys.stderr.write(f"{elapsed} {total}\n")
+        sys.exit(0)
+
+    from synthetic_csv import write_synthetic_csv
+
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    findings = 500
+    with tempfile.TemporaryDirectory() as work_dir:
+        csv_path = write_synthetic_csv(
+            os.path.join(work_dir, 'dataset.csv'), findings=findings, hosts_per_finding=rows // findings
+        )
+        print(f"rows: {rows}")
+        print(f"{'mode':>8} {'loop s':>8} {'+drain s':>9} {'us/row':>8}")
+        for mode in MODES:
+            result = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), '--mode', mode, csv_path, work_dir],
+                stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, check=True,
+            )
+            elapsed, total = map(float, result.stderr.split()[-2:])
+            print(f"{mode:>8} {elapsed:>8.2f} {total:>9.2f} {total / rows * 1e6:>8.1f}")
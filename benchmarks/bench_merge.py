@@ -0,0 +1,72 @@
+"""
+Cover + VA report merge: previous element-by-element append versus
+docx_merge.append_document.
+
+Both merges start from the same saved cover and VA report; the benchmark
+also checks that the merged documents have the same text.
+
+    python benchmarks/bench_merge.py [findings]
+"""
+import logging
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from docx import Document
+from docx.oxml.ns import qn
+
+import script5
+from bench_cover_template import CONTEXT, write_sample_template
+from report_pipeline import merge_document_objects, render_cover_document
+from synthetic_csv import write_synthetic_csv
+
+
+def legacy_merge(first_doc, second_doc):
+    """report_pipeline.merge_document_objects before the bulk merge engine"""
+    body_elements = list(second_doc.element.body)
+    font_elements = list(first_doc.element.body.iterchildren(qn('w:tbl'))) + body_elements
+    script5.normalize_fonts(first_doc, "Helvetica", 10.5, elements=font_elements)
+    for element in body_elements:
+        first_doc.element.body.append(element)
+    return first_doc
+
+
+def document_text(doc):
+    # The bulk merge adds an empty paragraph to carry the cover's section break when the cover ends with a table
+    return [text for text in doc.element.body.itertext() if text]
+
+
+def time_merge(merge, cover_path, va_path, output_path):
+    first_doc, second_doc = Document(cover_path), Document(va_path)
+    start = time.perf_counter()
+    merged = merge(first_doc, second_doc)
+    merge_time = time.perf_counter() - start
+    merged.save(output_path)
+    return merge_time, time.perf_counter() - start, document_text(Document(output_path))
+
+
+if __name__ == '__main__':
+    findings = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    logging.getLogger().setLevel(logging.WARNING)
+    script5.logger.setLevel(logging.WARNING)
+    with tempfile.TemporaryDirectory() as work_dir:
+        csv_path = write_synthetic_csv(os.path.join(work_dir, 'dataset.csv'), findings=findings)
+        va_path = os.path.join(work_dir, 'va.docx')
+        if not script5.main('BENCH', csv_path=csv_path, output_path=va_path):
+            raise RuntimeError("Report generation failed")
+        template_path = write_sample_template(os.path.join(work_dir, 'report_template.docx'))
+        cover_path = os.path.join(work_dir, 'cover.docx')
+        render_cover_document(template_path, CONTEXT).save(cover_path)
+
+        print(f"findings: {findings}")
+        print(f"{'merge':>8} {'merge s':>8} {'+ save s':>9}")
+        results = {}
+        for name, merge in (('legacy', legacy_merge), ('bulk', merge_document_objects)):
+            merge_time, total_time, text = time_merge(merge, cover_path, va_path,
+                                                      os.path.join(work_dir, f'{name}.docx'))
+            results[name] = text
+            print(f"{name:>8} {merge_time:>8.2f} {total_time:>9.2f}")
+        print(f"same text: {'yes' if results['legacy'] == results['bulk'] else 'NO'}")
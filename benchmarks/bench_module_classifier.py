@@ -0,0 +1,73 @@
+"""
+Module-name lookup cost as the keyword list grows.
+
+Compares the previous get_module_name loop (lower-casing the name and every
+keyword per call) with module_classifier.KeywordClassifier, without its
+memoisation, on random keyword lists of increasing size. The classifier
+only matches whole words, so its results are checked against the previous
+loop with that rule added.
+
+    python benchmarks/bench_module_classifier.py [names]
+"""
+import os
+import random
+import re
+import string
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from module_classifier import KeywordClassifier
+
+KEYWORD_COUNTS = [5, 50, 500, 2000]
+
+
+def legacy_get_module_name(name, predefined_keywords):
+    for keyword in predefined_keywords:
+        if keyword.lower() in name.lower():
+            return predefined_keywords[keyword]
+    return ""
+
+
+def whole_word_patterns(predefined_keywords):
+    """The keywords as patterns following the classifier's whole-word rule"""
+    return [(re.compile(rf'(?<![^\W\d_]){re.escape(keyword.lower())}(?![^\W\d_])'), module)
+            for keyword, module in predefined_keywords.items()]
+
+
+def whole_word_get_module_name(name, patterns):
+    """The previous loop with the whole-word rule added, as the reference for the classifier's results"""
+    name = name.lower()
+    for pattern, module in patterns:
+        if pattern.search(name):
+            return module
+    return ""
+
+
+def random_word(rng, low, high):
+    return ''.join(rng.choice(string.ascii_letters) for _ in range(rng.randint(low, high)))
+
+
+if __name__ == '__main__':
+    name_count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    rng = random.Random(1)
+    names = [' '.join(random_word(rng, 3, 9) for _ in range(8)) for _ in range(name_count)]
+    print(f"{'keywords':>9} {'legacy us':>10} {'classifier us':>14} {'agree':>6}")
+    for count in KEYWORD_COUNTS:
+        keywords = {random_word(rng, 3, 8): f"Module {index}" for index in range(count)}
+        classifier = KeywordClassifier(keywords)
+
+        start = time.perf_counter()
+        for name in names:
+            legacy_get_module_name(name, keywords)
+        legacy_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        current = [classifier._classify(name) for name in names]
+        current_time = time.perf_counter() - start
+        patterns = whole_word_patterns(keywords)
+        expected = [whole_word_get_module_name(name, patterns) for name in names]
+
+        print(f"{count:>9} {legacy_time / name_count * 1e6:>10.1f} {current_time / name_count * 1e6:>14.1f} "
+              f"{'yes' if expected == current else 'NO':>6}")
@@ -0,0 +1,68 @@
+"""
+Regenerating a report from the same scan with another finding ID prefix,
+with and without the parsed scan cache.
+
+Times parsing alone (the parse_csv stage) and the whole script5.main run.
+
+    python benchmarks/bench_scan_cache.py [findings] [hosts_per_finding]
+"""
+import logging
+import os
+import sys
+import tempfile
+import time
+import zipfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import script5
+from scan_cache import ScanCache
+from synthetic_csv import write_synthetic_csv
+
+
+def timed_load(csv_path, prefix, scan_cache):
+    start = time.perf_counter()
+    grouped = script5.load_grouped_vulnerabilities(csv_path, prefix, scan_cache=scan_cache)
+    return time.perf_counter() - start, grouped
+
+
+def timed_main(csv_path, prefix, output_path, scan_cache_dir):
+    start = time.perf_counter()
+    if not script5.main(prefix, csv_path=csv_path, output_path=output_path, scan_cache_dir=scan_cache_dir):
+        raise RuntimeError("Report generation failed")
+    return time.perf_counter() - start
+
+
+def document_xml(path):
+    with zipfile.ZipFile(path) as docx:
+        return docx.read('word/document.xml')
+
+
+if __name__ == '__main__':
+    findings = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    hosts_per_finding = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    logging.getLogger().setLevel(logging.WARNING)
+    script5.logger.setLevel(logging.WARNING)
+    with tempfile.TemporaryDirectory() as work_dir:
+        csv_path = write_synthetic_csv(os.path.join(work_dir, 'dataset.csv'), findings=findings,
+                                       hosts_per_finding=hosts_per_finding)
+        cache_dir = os.path.join(work_dir, 'scan_cache')
+        scan_cache = ScanCache(cache_dir)
+
+        uncached, expected = timed_load(csv_path, 'NEW', None)
+        cold, _ = timed_load(csv_path, 'OLD', scan_cache)
+        warm, grouped = timed_load(csv_path, 'NEW', scan_cache)
+        same = [(name, finding) for name, finding in expected.items()] == [(name, finding) for name, finding in grouped.items()]
+
+        main_uncached = timed_main(csv_path, 'NEW', os.path.join(work_dir, 'uncached.docx'), None)
+        timed_main(csv_path, 'OLD', os.path.join(work_dir, 'cold.docx'), cache_dir)
+        main_warm = timed_main(csv_path, 'NEW', os.path.join(work_dir, 'warm.docx'), cache_dir)
+        identical = document_xml(os.path.join(work_dir, 'uncached.docx')) == document_xml(os.path.join(work_dir, 'warm.docx'))
+
+        print(f"findings: {findings}, hosts per finding: {hosts_per_finding}, "
+              f"CSV: {os.path.getsize(csv_path) / 1e6:.1f} MB")
+        print(f"{'':>10} {'parse s':>8} {'main s':>8}")
+        print(f"{'no cache':>10} {uncached:>8.3f} {main_uncached:>8.2f}")
+        print(f"{'cold':>10} {cold:>8.3f}")
+        print(f"{'warm':>10} {warm:>8.3f} {main_warm:>8.2f}")
+        print(f"same findings: {'yes' if same else 'NO'}, identical report: {'yes' if identical else 'NO'}")
@@ -0,0 +1,45 @@
+"""
+Serial versus sharded generation of the finding pages.
+
+Builds the same report with script5.build_document for each worker count
+and checks that the document XML is identical to the serial build.
+
+    python benchmarks/bench_sharding.py [findings] [workers,...]
+"""
+import logging
+import os
+import sys
+import tempfile
+import time
+import zipfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import script5
+from synthetic_csv import write_synthetic_csv
+
+
+def build(csv_path, output_path, workers):
+    start = time.perf_counter()
+    doc = script5.build_document('BENCH', csv_path, workers=workers)
+    elapsed = time.perf_counter() - start
+    doc.save(output_path)
+    with zipfile.ZipFile(output_path) as docx:
+        return elapsed, docx.read('word/document.xml')
+
+
+if __name__ == '__main__':
+    findings = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    worker_counts = [int(count) for count in sys.argv[2].split(',')] if len(sys.argv) > 2 else [2, 4, 8]
+    logging.getLogger().setLevel(logging.WARNING)
+    script5.logger.setLevel(logging.WARNING)
+    print(f"findings: {findings}, cpus: {os.cpu_count()}")
+    with tempfile.TemporaryDirectory() as work_dir:
+        csv_path = write_synthetic_csv(os.path.join(work_dir, 'dataset.csv'), findings=findings)
+        serial_time, serial_xml = build(csv_path, os.path.join(work_dir, 'serial.docx'), None)
+        print(f"{'workers':>8} {'seconds':>9} {'speedup':>8} {'identical':>10}")
+        print(f"{1:>8} {serial_time:>9.2f} {1:>8.2f} {'yes':>10}")
+        for workers in worker_counts:
+            elapsed, xml = build(csv_path, os.path.join(work_dir, f'sharded_{workers}.docx'), workers)
+            identical = 'yes' if xml == serial_xml else 'NO'
+            print(f"{workers:>8} {elapsed:>9.2f} {serial_time / elapsed:>8.2f} {identical:>10}")
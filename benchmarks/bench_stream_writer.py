@@ -0,0 +1,54 @@
+"""
+python-docx versus streaming writer backend: time and peak RSS.
+
+Each run happens in a fresh process, since most of a report's memory is
+lxml/libxml2 allocations that tracemalloc does not see.
+
+    python benchmarks/bench_stream_writer.py [findings,...]
+"""
+import logging
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+WRITERS = ['python-docx', 'stream']
+
+
+def run_writer(writer, csv_path, output_path):
+    import script5
+    logging.getLogger().setLevel(logging.WARNING)
+    script5.logger.setLevel(logging.WARNING)
+    start = time.perf_counter()
+    if not script5.main('BENCH', csv_path=csv_path, output_path=output_path, writer=writer):
+        raise RuntimeError("Report generation failed")
+    elapsed = time.perf_counter() - start
+    # ru_maxrss is in KiB on Linux
+    return elapsed, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1 and sys.argv[1] == '--writer':
+        elapsed, peak_mb = run_writer(sys.argv[2], sys.argv[3], sys.argv[4])
+        print(f"{elapsed} {peak_mb}")
+        sys.exit(0)
+
+    from synthetic_csv import write_synthetic_csv
+
+    sizes = [int(size) for size in sys.argv[1].split(',')] if len(sys.argv) > 1 else [250, 1000, 2000]
+    print(f"{'findings':>9} {'writer':>12} {'seconds':>9} {'peak RSS MB':>12}")
+    with tempfile.TemporaryDirectory() as work_dir:
+        for findings in sizes:
+            csv_path = write_synthetic_csv(os.path.join(work_dir, f'dataset_{findings}.csv'), findings=findings)
+            for writer in WRITERS:
+                result = subprocess.run(
+                    [sys.executable, os.path.abspath(__file__), '--writer', writer, csv_path,
+                     os.path.join(work_dir, f'{writer}_{findings}.docx')],
+                    stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True, check=True,
+                )
+                elapsed, peak_mb = map(float, result.stdout.split()[-2:])
+                print(f"{findings:>9} {writer:>12} {elapsed:>9.2f} {peak_mb:>12.1f}")
@@ -0,0 +1,34 @@
+"""
+Time script5.create_summary_table for growing numbers of findings.
+
+    python benchmarks/bench_summary_table.py [findings,...]
+"""
+import logging
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from docx import Document
+
+import script5
+from synthetic_csv import write_synthetic_csv
+
+
+if __name__ == '__main__':
+    sizes = [int(size) for size in sys.argv[1].split(',')] if len(sys.argv) > 1 else [250, 1000, 4000]
+    logging.getLogger().setLevel(logging.WARNING)
+    script5.logger.setLevel(logging.WARNING)
+    print(f"{'findings':>9} {'seconds':>9} {'rows/s':>9}")
+    with tempfile.TemporaryDirectory() as work_dir:
+        for findings in sizes:
+            csv_path = write_synthetic_csv(os.path.join(work_dir, f'dataset_{findings}.csv'), findings=findings)
+            grouped = script5.load_grouped_vulnerabilities(csv_path, 'BENCH')
+            doc = Document()
+            start = time.perf_counter()
+            if not script5.create_summary_table(doc, grouped):
+                raise RuntimeError("Failed to create summary table")
+            elapsed = time.perf_counter() - start
+            print(f"{findings:>9} {elapsed:>9.3f} {len(grouped) / elapsed:>9.0f}")
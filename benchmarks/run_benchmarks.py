@@ -0,0 +1,228 @@
+"""
+Benchmark harness for report generation.
+
+Generates synthetic Nessus CSVs for a set of scenarios (finding count, host
+fan-out, description length, duplicate ratio) and times:
+
+  script5_main      script5.main writing the VA report to disk
+  merge_documents   report_pipeline.merge_documents of a rendered cover and
+                    that VA report
+  webapp_index      a full POST to webapp.index through Flask's test client,
+                    with the finding page and parsed scan caches disabled so
+                    every repeat parses and renders the whole report
+  webapp_job        the same report as a background job: POST /jobs, poll
+                    its status until it is done, then download it
+
+A web request only counts once it has returned the report as a DOCX
+attachment; the form page the app shows on an error is a failure, not a fast
+sample.
+
+Each measurement is the median of --repeat runs. Results are written as JSON
+(benchmarks/results/<timestamp>.json by default). With --baseline the run is
+compared to an earlier result file and every timing slower by more than
+--threshold percent is reported as a regression; the exit status is 1 when
+there is one.
+
+    python benchmarks/run_benchmarks.py [--scenarios small,hosts] [--repeat 3]
+                                        [--baseline results/old.json] [--threshold 10]
+"""
+import argparse
+import csv
+import json
+import logging
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARKS_DIR))
+
+from bench_cover_template import CONTEXT, write_sample_template
+from synthetic_csv import write_synthetic_csv
+
+# name -> write_synthetic_csv arguments
+SCENARIOS = {
+    'small': dict(findings=50, hosts_per_finding=3),
+    'findings': dict(findings=500, hosts_per_finding=3),
+    'hosts': dict(findings=50, hosts_per_finding=200),
+    'descriptions': dict(findings=200, hosts_per_finding=3, description_sentences=40),
+    'duplicates': dict(findings=100, hosts_per_finding=20, duplicate_ratio=0.75),
+}
+DEFAULT_SCENARIOS = ['small', 'findings', 'hosts', 'descriptions', 'duplicates']
+
+DOCX_MIMETYPE = 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'
+# Seconds between status polls of a background job
+JOB_POLL_SECONDS = 0.05
+
+
+def time_runs(repeat, function):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def check_report_response(response, what):
+    """Raise unless response is a generated report; errors come back as a 200 form page"""
+    disposition = response.headers.get('Content-Disposition', '')
+    if response.status_code != 200 or response.mimetype != DOCX_MIMETYPE or not disposition.startswith('attachment'):
+        raise RuntimeError(f"{what} returned {response.status_code} {response.mimetype} instead of a report")
+
+
+def report_form(csv_file):
+    return {
+        'companyName': CONTEXT['companyName'],
+        'networkType': CONTEXT['networkType'],
+        'assessmentDate': '2025-01-01',
+        'findingIdPrefix': 'BENCH',
+        'file': (csv_file, 'dataset.csv'),
+    }
+
+
+def run_scenario(work_dir, scenario, repeat, template_path):
+    import script5
+    import webapp
+    from report_jobs import JOB_DONE, JOB_QUEUED, JOB_RUNNING
+    from report_pipeline import merge_documents, render_cover_document
+
+    csv_path = write_synthetic_csv(os.path.join(work_dir, f'{scenario}.csv'), **SCENARIOS[scenario])
+    va_path = os.path.join(work_dir, f'{scenario}_va.docx')
+    cover_path = os.path.join(work_dir, f'{scenario}_cover.docx')
+    merged_path = os.path.join(work_dir, f'{scenario}_merged.docx')
+    render_cover_document(template_path, CONTEXT).save(cover_path)
+
+    def generate():
+        if not script5.main('BENCH', csv_path=csv_path, output_path=va_path):
+            raise RuntimeError(f"script5.main failed for scenario {scenario}")
+
+    def merge():
+        if not merge_documents(cover_path, va_path, merged_path):
+            raise RuntimeError(f"merge_documents failed for scenario {scenario}")
+
+    client = webapp.app.test_client()
+
+    def post_index():
+        with open(csv_path, 'rb') as csv_file:
+            response = client.post('/', content_type='multipart/form-data', data=report_form(csv_file))
+        check_report_response(response, f"webapp index for scenario {scenario}")
+
+    def run_job():
+        with open(csv_path, 'rb') as csv_file:
+            response = client.post('/jobs', content_type='multipart/form-data', data=report_form(csv_file))
+        if response.status_code != 202:
+            raise RuntimeError(f"webapp job submission returned {response.status_code} for scenario {scenario}")
+        status = response.get_json()
+        while status['status'] in (JOB_QUEUED, JOB_RUNNING):
+            time.sleep(JOB_POLL_SECONDS)
+            status = client.get(status['status_url']).get_json()
+        if status['status'] != JOB_DONE:
+            raise RuntimeError(f"webapp job for scenario {scenario} ended {status['status']}: {status.get('error')}")
+        check_report_response(client.get(status['download_url']), f"webapp job download for scenario {scenario}")
+
+    with open(csv_path, newline='', encoding='utf-8') as csv_file:
+        csv_rows = sum(1 for _ in csv.reader(csv_file)) - 1
+
+    return {
+        'csv_rows': csv_rows,
+        'csv_bytes': os.path.getsize(csv_path),
+        'timings': {
+            'script5_main': time_runs(repeat, generate),
+            'merge_documents': time_runs(repeat, merge),
+            'webapp_index': time_runs(repeat, post_index),
+            'webapp_job': time_runs(repeat, run_job),
+        },
+    }
+
+
+def compare(results, baseline, threshold):
+    """Return (scenario, benchmark, baseline, current, percent) for timings over the threshold"""
+    regressions = []
+    for scenario, result in results['scenarios'].items():
+        previous = baseline.get('scenarios', {}).get(scenario)
+        if previous is None:
+            continue
+        for benchmark, seconds in result['timings'].items():
+            previous_seconds = previous['timings'].get(benchmark)
+            if not previous_seconds:
+                continue
+            change = (seconds - previous_seconds) / previous_seconds * 100
+            if change > threshold:
+                regressions.append((scenario, benchmark, previous_seconds, seconds, change))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark report generation on synthetic Nessus CSVs")
+    parser.add_argument('--scenarios', default=','.join(DEFAULT_SCENARIOS),
+                        help=f"comma-separated, from: {', '.join(SCENARIOS)}")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--output', help="result file (default: benchmarks/results/<timestamp>.json)")
+    parser.add_argument('--baseline', help="earlier result file to compare against")
+    parser.add_argument('--threshold', type=float, default=10.0, help="regression threshold in percent")
+    args = parser.parse_args()
+
+    scenarios = [name.strip() for name in args.scenarios.split(',') if name.strip()]
+    unknown = [name for name in scenarios if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenario(s): {', '.join(unknown)}")
+
+    # Importing webapp configures logging; keep the console quiet while timing
+    import webapp
+    logging.getLogger().setLevel(logging.WARNING)
+
+    results = {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'repeat': args.repeat,
+        # Cache hits would make repeats after the first time a different path; baselines need the same setting
+        'webapp_caches': False,
+        'scenarios': {},
+    }
+    with tempfile.TemporaryDirectory() as work_dir:
+        template_path = write_sample_template(os.path.join(work_dir, 'report_template.docx'))
+        webapp.app.config['REPORT_TEMPLATE'] = template_path
+        # Time the uncached index path, and never write into the app's own cache folders
+        webapp.app.config['FINDING_CACHE_FOLDER'] = None
+        webapp.app.config['SCAN_CACHE_FOLDER'] = None
+        # Jobs run on a thread of this process, in the temporary directory
+        webapp.app.config['JOBS_FOLDER'] = os.path.join(work_dir, 'jobs')
+        webapp.app.config['REPORT_JOB_EXECUTOR'] = 'thread'
+        for scenario in scenarios:
+            result = run_scenario(work_dir, scenario, args.repeat, template_path)
+            result['parameters'] = SCENARIOS[scenario]
+            results['scenarios'][scenario] = result
+            timings = "  ".join(f"{name}={seconds:.3f}s" for name, seconds in result['timings'].items())
+            print(f"{scenario:>12} rows={result['csv_rows']:<7} {timings}")
+
+    output = args.output or os.path.join(
+        BENCHMARKS_DIR, 'results', f"{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as result_file:
+        json.dump(results, result_file, indent=2)
+    print(f"Results written to {output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as baseline_file:
+            baseline = json.load(baseline_file)
+        if baseline.get('webapp_caches', True):
+            print(f"WARNING {args.baseline} was recorded with the web app caches enabled; "
+                  f"its webapp_index timings are cache hits, re-record it")
+        regressions = compare(results, baseline, args.threshold)
+        for scenario, benchmark, previous_seconds, seconds, change in regressions:
+            print(f"REGRESSION {scenario}/{benchmark}: {previous_seconds:.3f}s -> {seconds:.3f}s (+{change:.1f}%)")
+        if regressions:
+            return 1
+        print(f"No regressions over {args.threshold:g}% against {args.baseline}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
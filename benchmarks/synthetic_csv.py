@@ -0,0 +1,71 @@
+"""
+Synthetic Nessus-style CSV generator used by the benchmarks.
+
+Produces files with the columns listed in script5.required_fields so they can
+be fed straight into script5.main.
+"""
+import csv
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from script5 import required_fields
+
+PRODUCTS = ['Apache', 'Windows', 'SSH', 'Oracle', 'DNS', 'OpenSSL', 'PHP', 'IIS']
+
+
+def write_synthetic_csv(path, findings=100, hosts_per_finding=3, scans=1, seed=1,
+                        description_sentences=3, duplicate_ratio=0.0):
+    """
+    Write a CSV with `findings` unique plugins, each seen on `hosts_per_finding`
+    hosts. `scans` repeats every row that many times, like a merged export of
+    several scans of the same estate.
+
+    `description_sentences` sets the length of each description and
+    `duplicate_ratio` the share of rows (0 to <1) that repeat the row before
+    them, as Nessus does for a plugin reported several times on one port.
+    """
+    if not 0 <= duplicate_ratio < 1:
+        raise ValueError("duplicate_ratio must be in [0, 1)")
+    rng = random.Random(seed)
+    duplicates_per_row = duplicate_ratio / (1 - duplicate_ratio)
+    duplicate_budget = 0.0
+    header = list(required_fields.values())
+    with open(path, 'w', newline='', encoding='utf-8') as csv_file:
+        writer = csv.writer(csv_file)
+        writer.writerow(header)
+        for finding in range(findings):
+            product = PRODUCTS[finding % len(PRODUCTS)]
+            name = f"{product} Synthetic Vulnerability {finding}"
+            sentences = [
+                f"The remote {product} 2.4.{finding} service is affected by a synthetic issue.",
+                "An attacker could exploit it via crafted requests.",
+                "See ASP.NET notes for details.",
+            ]
+            while len(sentences) < description_sentences:
+                sentences.append(f"Note {len(sentences)}: see ASP.NET and e.g. vendor advisory {finding} for details.")
+            description = " ".join(sentences[:max(description_sentences, 1)])
+            score = f"{rng.uniform(0, 10):.1f}"
+            for host_index in range(hosts_per_finding):
+                host = f"10.{finding % 250}.{host_index // 250}.{host_index % 250}"
+                port = rng.choice(['0', '22', '80', '443'])
+                row = {
+                    'Name': name,
+                    'Description': description,
+                    'CVSS v3.0 Base Score': score,
+                    'Risk Factor': '',
+                    'Host': host,
+                    'Port': port,
+                    'Solution': f"upgrade {product} to the latest version.",
+                    'See Also': f"https://example.com/advisories/{finding}",
+                }
+                values = [row[column] for column in header]
+                for _ in range(scans):
+                    writer.writerow(values)
+                    duplicate_budget += duplicates_per_row
+                    while duplicate_budget >= 1:
+                        writer.writerow(values)
+                        duplicate_budget -= 1
+    return path
@@ -0,0 +1,373 @@
+"""
+Resumable chunked uploads for scans larger than one request may carry.
+
+A client creates an upload, PUTs the file in chunks at explicit offsets and
+completes it; after a dropped connection it asks for the upload's offset
+and carries on from there. Chunks are appended to a file in the upload's
+directory as they are read from the request, so memory stays bounded by
+the copy buffer whatever the file size.
+
+The scan is parsed on a background thread from the moment the upload is
+created: GrowingFileReader hands the parser each chunk as soon as it is on
+disk and blocks until the next one arrives, so by the time the last chunk
+lands most of the parsing is done. Gzipped CSVs are decompressed on the fly
+by script5.open_csv_source; a zip archive can only be read once its central
+directory (at the end of the file) is there, so zips are parsed on
+completion.
+
+Upload state lives on disk and nowhere else: the offset is the size of the
+data file and completion is recorded in upload.json. Every check re-reads
+them, and appends hold an exclusive lock on the data file, so the chunks
+of one upload can go to different server processes (several gunicorn
+workers) and an upload survives a restart. A process that is asked about
+an upload parses it itself, following the file on disk; the parse of a
+process that never hears from the upload again gives up after
+IDLE_SECONDS without new data, and is restarted if the upload comes back.
+"""
+import io
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+from script5 import parse_scans
+
+try:
+    import fcntl
+except ImportError:
+    # No cross-process locking off POSIX; run a single server process there
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+DATA_FILENAME = 'data'
+STATE_FILENAME = 'upload.json'
+# Bytes copied from the request to disk, and handed to the parser, at a time
+COPY_BUFFER_SIZE = 64 * 1024
+# How often a waiting parser looks at the upload on disk, for chunks written by other processes
+POLL_SECONDS = 0.5
+# A parser that sees no new data for this long stops; it is restarted if the upload is used again
+IDLE_SECONDS = 15 * 60
+# UploadStore.get removes expired uploads at most this often
+EXPIRE_INTERVAL_SECONDS = 60
+
+
+class ChunkedUploadError(ValueError):
+    """An upload request was rejected; the message is shown to the client"""
+
+
+class OffsetMismatch(ChunkedUploadError):
+    """A chunk was sent for an offset other than the upload's current size"""
+
+    def __init__(self, expected, received):
+        super().__init__(f"Chunk offset {received} does not match the upload offset {expected}")
+        self.expected = expected
+
+
+class UploadAborted(Exception):
+    """The upload was discarded while its scan was being parsed"""
+
+
+class UploadIdle(Exception):
+    """No data arrived for IDLE_SECONDS while the scan was being parsed"""
+
+
+class GrowingFileReader(io.RawIOBase):
+    """
+    Reads an upload's data file while chunks are still being appended,
+    blocking until more data arrives and reaching end of file only once the
+    upload is complete.
+    """
+
+    def __init__(self, upload):
+        self._upload = upload
+        self._file = open(upload.data_path, 'rb')
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        while True:
+            count = self._file.readinto(buffer)
+            if count:
+                return count
+            if not self._upload.wait_for_data(self._file.tell()):
+                return 0
+
+    def close(self):
+        self._file.close()
+        super().close()
+
+
+@contextmanager
+def locked(path, mode):
+    """Open path with an exclusive lock shared with other processes"""
+    with open(path, mode) as locked_file:
+        if fcntl is not None:
+            fcntl.flock(locked_file, fcntl.LOCK_EX)
+        yield locked_file
+
+
+class ChunkedUpload:
+    """One upload: its data file and persisted state, and this process's parse of it"""
+
+    def __init__(self, upload_id, directory, filename, created=None):
+        self.upload_id = upload_id
+        self.directory = directory
+        self.filename = filename
+        self.data_path = os.path.join(directory, DATA_FILENAME)
+        self.state_path = os.path.join(directory, STATE_FILENAME)
+        self.created = created or time.time()
+        self.aborted = False
+        self._changed = threading.Condition()
+        self._parse_lock = threading.Lock()
+        self._parser = None
+        self._parsed = threading.Event()
+        self._parsed_scan = None
+        self._parse_error = None
+
+    @property
+    def offset(self):
+        """Bytes received so far, by any process; where the next chunk starts"""
+        try:
+            return os.path.getsize(self.data_path)
+        except FileNotFoundError:
+            return 0
+
+    @property
+    def complete(self):
+        """Whether any process has completed the upload"""
+        try:
+            with open(self.state_path, encoding='utf-8') as state_file:
+                return json.load(state_file)['complete']
+        except (OSError, ValueError):
+            return False
+
+    @property
+    def discarded(self):
+        return self.aborted or not os.path.isdir(self.directory)
+
+    def status(self):
+        status = {
+            'upload_id': self.upload_id,
+            'filename': self.filename,
+            'offset': self.offset,
+            'complete': self.complete,
+            'parsed': self._parsed.is_set(),
+        }
+        # A rejected header is known after the first chunk, so the client can stop sending the rest
+        error = self.parse_error()
+        if error:
+            status['error'] = error
+        return status
+
+    def parse_error(self):
+        """Why the scan could not be parsed, or None while parsing or once it succeeded"""
+        if self._parse_error is not None:
+            return f"{self.filename}: {str(self._parse_error)}"
+        if self._parsed_scan is not None and not self._parsed_scan.valid:
+            return self._parsed_scan.error_message
+        return None
+
+    def save_state(self, complete=False):
+        """Write upload.json in one step, so other processes never read half of it"""
+        state = {'filename': self.filename, 'complete': complete, 'created': self.created}
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as state_file:
+            json.dump(state, state_file)
+        os.replace(temp_path, self.state_path)
+
+    def write_chunk(self, offset, stream):
+        """Append the chunk read from stream at offset and return the new offset"""
+        with locked(self.data_path, 'ab') as data_file:
+            # Checked under the lock, against what every process has written
+            if self.complete:
+                raise ChunkedUploadError("Upload is already complete")
+            size = os.fstat(data_file.fileno()).st_size
+            if offset != size:
+                raise OffsetMismatch(size, offset)
+            while True:
+                block = stream.read(COPY_BUFFER_SIZE)
+                if not block:
+                    break
+                data_file.write(block)
+                # Flushed so the parser can read the block straight away
+                data_file.flush()
+                size += len(block)
+                with self._changed:
+                    self._changed.notify_all()
+            return size
+
+    def finish(self, size=None):
+        """Mark the upload complete; size, when given, must match what was received"""
+        with locked(self.data_path, 'ab') as data_file:
+            received = os.fstat(data_file.fileno()).st_size
+            if size is not None and size != received:
+                raise ChunkedUploadError(f"Upload has {received} bytes, expected {size}")
+            self.save_state(complete=True)
+        with self._changed:
+            self._changed.notify_all()
+        logger.info(f"Upload {self.upload_id} complete: {received} bytes")
+
+    def abort(self):
+        with self._changed:
+            self.aborted = True
+            self._changed.notify_all()
+
+    def _wait(self, ready):
+        """
+        Block until ready() is true, looking at the upload on disk every
+        POLL_SECONDS as other processes may be receiving its chunks.
+        """
+        last_offset, idle_since = self.offset, time.monotonic()
+        with self._changed:
+            while not ready():
+                if self.discarded:
+                    raise UploadAborted(f"Upload {self.upload_id} was discarded")
+                offset = self.offset
+                if offset != last_offset:
+                    last_offset, idle_since = offset, time.monotonic()
+                elif time.monotonic() - idle_since > IDLE_SECONDS:
+                    raise UploadIdle(f"No data for upload {self.upload_id} in {IDLE_SECONDS}s")
+                self._changed.wait(POLL_SECONDS)
+
+    def wait_for_data(self, position):
+        """Block until there is data past position; False at the end of a complete upload"""
+        self._wait(lambda: self.offset > position or self.complete)
+        # The upload may have been completed after more data was written
+        return self.offset > position
+
+    def wait_for_completion(self):
+        self._wait(lambda: self.complete)
+
+    def start_parsing(self, engine="csv"):
+        """Parse the upload on a background thread unless this process already is, or has"""
+        with self._parse_lock:
+            if self._parsed.is_set() or (self._parser is not None and self._parser.is_alive()):
+                return
+            self._parser = threading.Thread(target=self._parse, args=(engine,), name=f"upload-{self.upload_id}",
+                                            daemon=True)
+            self._parser.start()
+
+    def _parse(self, engine):
+        try:
+            if self.filename.lower().endswith('.zip'):
+                self.wait_for_completion()
+                self._parsed_scan = parse_scans([self.data_path], engine, names=[self.filename])
+            else:
+                with io.BufferedReader(GrowingFileReader(self), COPY_BUFFER_SIZE) as reader:
+                    self._parsed_scan = parse_scans([reader], engine, names=[self.filename])
+            logger.info(f"Upload {self.upload_id} parsed")
+        except UploadIdle as e:
+            # Not finished: the next request for this upload starts parsing again
+            logger.info(f"Parsing of upload {self.upload_id} paused: {str(e)}")
+            return
+        except UploadAborted:
+            logger.info(f"Parsing of upload {self.upload_id} stopped, the upload was discarded")
+        except Exception as e:
+            logger.error(f"Parsing upload {self.upload_id} failed: {str(e)}")
+            self._parse_error = e
+        self._parsed.set()
+
+    def parsed_scan(self, timeout=None):
+        """
+        Wait for the background parse and return its valid ParsedScan. Raises
+        ChunkedUploadError when the upload is incomplete or was rejected.
+        """
+        if not self.complete:
+            raise ChunkedUploadError(f"Upload {self.filename} is not complete")
+        if not self._parsed.wait(timeout):
+            raise ChunkedUploadError(f"Upload {self.filename} is still being parsed")
+        error = self.parse_error()
+        if error:
+            raise ChunkedUploadError(error)
+        if self._parsed_scan is None:
+            raise ChunkedUploadError(f"Upload {self.filename} was discarded")
+        return self._parsed_scan
+
+
+class UploadStore:
+    """
+    Chunked uploads kept under one directory, which every server process
+    shares. An upload created or completed by another process, or before a
+    restart, is loaded from disk on first use. Uploads untouched for
+    max_age_seconds are removed by create() and, at most every
+    EXPIRE_INTERVAL_SECONDS, by get().
+    """
+
+    def __init__(self, directory, max_age_seconds=24 * 3600, engine="csv"):
+        self.directory = directory
+        self.max_age_seconds = max_age_seconds
+        self.engine = engine
+        self._uploads = {}
+        self._lock = threading.Lock()
+        self._last_expired = 0.0
+        os.makedirs(directory, exist_ok=True)
+
+    def create(self, filename):
+        self.expire()
+        upload_id = uuid.uuid4().hex
+        directory = os.path.join(self.directory, upload_id)
+        os.makedirs(directory)
+        upload = ChunkedUpload(upload_id, directory, filename)
+        open(upload.data_path, 'wb').close()
+        upload.save_state()
+        with self._lock:
+            self._uploads[upload_id] = upload
+        upload.start_parsing(self.engine)
+        logger.info(f"Upload {upload_id} created for {filename}")
+        return upload
+
+    def get(self, upload_id):
+        """The upload, loaded from disk if needed, or None when there is none"""
+        if time.monotonic() - self._last_expired > EXPIRE_INTERVAL_SECONDS:
+            self.expire()
+        # Upload ids are generated hex strings; anything else cannot name an upload
+        if not upload_id.isalnum():
+            return None
+        directory = os.path.join(self.directory, upload_id)
+        state_path = os.path.join(directory, STATE_FILENAME)
+        with self._lock:
+            upload = self._uploads.get(upload_id)
+            if upload is not None and upload.discarded:
+                # Discarded or expired by another process
+                del self._uploads[upload_id]
+                upload = None
+            if upload is None:
+                try:
+                    with open(state_path, encoding='utf-8') as state_file:
+                        state = json.load(state_file)
+                except (OSError, ValueError):
+                    return None
+                upload = ChunkedUpload(upload_id, directory, state['filename'], state['created'])
+                self._uploads[upload_id] = upload
+                logger.info(f"Upload {upload_id} loaded at offset {upload.offset}")
+        # Restarts a parse that went idle, or was never started in this process
+        upload.start_parsing(self.engine)
+        return upload
+
+    def discard(self, upload_id):
+        with self._lock:
+            upload = self._uploads.pop(upload_id, None)
+        if upload is not None:
+            upload.abort()
+        shutil.rmtree(os.path.join(self.directory, upload_id), ignore_errors=True)
+
+    def expire(self):
+        self._last_expired = time.monotonic()
+        cutoff = time.time() - self.max_age_seconds
+        for upload_id in os.listdir(self.directory):
+            directory = os.path.join(self.directory, upload_id)
+            try:
+                last_used = max(os.path.getmtime(os.path.join(directory, name))
+                                for name in (STATE_FILENAME, DATA_FILENAME))
+            except OSError:
+                continue
+            if last_used < cutoff:
+                logger.info(f"Removing expired upload {upload_id}")
+                self.discard(upload_id)
@@ -0,0 +1,187 @@
+"""
+Bulk merge of the VA report into the rendered cover page.
+
+Appending the VA body element by element moves every node between lxml
+documents, which costs a few microseconds per node and dominates the merge
+of a large report. append_document instead serialises the VA body once,
+splices it into the cover's document XML and parses the result in one go.
+It then fixes up what a plain append leaves broken:
+
+- the cover's body-level sectPr becomes a section break on the cover's last
+  paragraph, so the cover keeps its page setup and the VA report's sectPr
+  is the document's final one;
+- styles referenced by the VA content that the cover does not define are
+  copied over, with the styles they are based on;
+- list numbering referenced by the VA content is copied into the cover's
+  numbering part under fresh IDs.
+"""
+import logging
+from copy import deepcopy
+
+from docx.oxml import parse_xml
+from docx.oxml.ns import qn
+from docx.oxml.shared import OxmlElement
+from lxml import etree
+
+from docx_stream_writer import ChunkSerializer, root_start_tag
+
+logger = logging.getLogger(__name__)
+
+# Elements holding a style reference in w:val
+STYLE_REFERENCE_TAGS = tuple(qn(f'w:{tag}') for tag in ('pStyle', 'rStyle', 'tblStyle', 'numStyleLink', 'styleLink'))
+# Style properties naming another style that has to be copied along
+STYLE_DEPENDENCY_TAGS = tuple(qn(f'w:{tag}') for tag in ('basedOn', 'next', 'link'))
+# Relationship references are only valid inside the part they came from
+SECTION_REFERENCE_TAGS = (qn('w:headerReference'), qn('w:footerReference'))
+
+
+def splice_body_xml(first_root, second_body):
+    """
+    Document XML of first_root with the children of second_body appended to its body.
+
+    The merged root declares the namespaces of both documents, so the
+    appended elements are written without repeating them.
+    """
+    namespaces = dict(second_body.nsmap)
+    namespaces.update(first_root.nsmap)
+    merged_root = etree.Element(first_root.tag, attrib=dict(first_root.attrib), nsmap=namespaces)
+
+    first_xml = etree.tostring(first_root)
+    content_start = first_xml.index(b'>') + 1
+    body_end = first_xml.rindex(b'</', 0, first_xml.rindex(b'</'))
+
+    if set(second_body.nsmap.items()) <= set(namespaces.items()):
+        # Serialise the body in one call and keep what is between its start and end tags
+        second_xml = etree.tostring(second_body)
+        appended_xml = second_xml[second_xml.index(b'>') + 1:second_xml.rindex(b'</')]
+    else:
+        # A prefix is bound to different namespaces in the two documents; elements keep their own declarations
+        serialize = ChunkSerializer(merged_root)
+        appended_xml = b''.join(serialize(element) for element in second_body)
+
+    return b''.join((root_start_tag(merged_root), first_xml[content_start:body_end], appended_xml,
+                     first_xml[body_end:]))
+
+
+def end_section_at_paragraph(sectPr):
+    """Move a body-level sectPr onto the paragraph before it, adding an empty paragraph when there is none"""
+    previous = sectPr.getprevious()
+    if previous is None or previous.tag != qn('w:p') or (previous.pPr is not None and previous.pPr.sectPr is not None):
+        previous = OxmlElement('w:p')
+        sectPr.addprevious(previous)
+    previous.set_sectPr(sectPr)
+
+
+def copy_missing_styles(target_styles, source_styles, style_ids):
+    """Copy the styles in style_ids that target_styles lacks, with the styles they depend on"""
+    pending = list(style_ids)
+    copied = []
+    while pending:
+        style_id = pending.pop()
+        if target_styles.get_by_id(style_id) is not None:
+            continue
+        style = source_styles.get_by_id(style_id)
+        if style is None:
+            logger.warning(f"Style {style_id} is referenced but not defined")
+            continue
+        target_styles.append(deepcopy(style))
+        copied.append(style_id)
+        pending.extend(dependency.get(qn('w:val')) for dependency in style.iterchildren(*STYLE_DEPENDENCY_TAGS))
+    if copied:
+        logger.info(f"Copied {len(copied)} styles: {', '.join(copied)}")
+    return copied
+
+
+def copy_numbering(target_doc, source_doc, numId_elements):
+    """
+    Copy the numbering definitions referenced by numId_elements into
+    target_doc under fresh IDs and point the elements at the copies.
+    """
+    referenced = {element.get(qn('w:val')) for element in numId_elements} - {'0', None}
+    if not referenced:
+        return
+    try:
+        target = target_doc.part.numbering_part.element
+    except NotImplementedError:
+        # python-docx cannot create a numbering part from scratch
+        logger.warning(f"Cover has no numbering part, {len(referenced)} lists will lose their numbering")
+        return
+    source = source_doc.part.numbering_part.element
+
+    abstractNum_tag = qn('w:abstractNum')
+    abstractNum_id_attr = qn('w:abstractNumId')
+    abstract_ids = [int(abstract.get(abstractNum_id_attr)) for abstract in target.iterchildren(abstractNum_tag)]
+    next_abstract_id = max(abstract_ids, default=-1) + 1
+
+    new_ids = {}
+    for numId in sorted(referenced, key=int):
+        num = deepcopy(source.num_having_numId(int(numId)))
+        abstract_id = num.abstractNumId.val
+        abstract = deepcopy(source.find(f'{abstractNum_tag}[@{abstractNum_id_attr}="{abstract_id}"]'))
+        abstract.set(abstractNum_id_attr, str(next_abstract_id))
+        # The list identifier would otherwise tie the copy to a list of the cover
+        for nsid in abstract.findall(qn('w:nsid')):
+            abstract.remove(nsid)
+        # abstractNum definitions come before every num
+        existing = list(target.iterchildren(abstractNum_tag))
+        if existing:
+            existing[-1].addnext(abstract)
+        else:
+            target.insert(0, abstract)
+
+        num.numId = target._next_numId
+        num.abstractNumId.val = next_abstract_id
+        target._insert_num(num)
+        new_ids[numId] = str(num.numId)
+        next_abstract_id += 1
+
+    for element in numId_elements:
+        if element.get(qn('w:val')) in new_ids:
+            element.set(qn('w:val'), new_ids[element.get(qn('w:val'))])
+    logger.info(f"Copied {len(new_ids)} numbering definitions")
+
+
+def append_document(first_doc, second_doc):
+    """
+    Append the body of second_doc to first_doc and return the merged Document.
+
+    The merged content replaces first_doc's document part, so use the
+    returned Document rather than first_doc afterwards. second_doc is left
+    as it was, and first_doc is only modified once the merged XML has been
+    parsed. Raises on failure.
+    """
+    first_root = first_doc.element
+    cover_length = len(first_root.body)
+    merged_root = parse_xml(splice_body_xml(first_root, second_doc.element.body))
+    merged_body = merged_root.body
+
+    # The cover's final sectPr is now followed by the VA content
+    cover_sectPr = merged_body[cover_length - 1] if cover_length else None
+    appended = merged_body[cover_length:]
+    if cover_sectPr is not None and cover_sectPr.tag == qn('w:sectPr'):
+        end_section_at_paragraph(cover_sectPr)
+
+    # Header and footer references of the VA sectPr point at parts of the other package
+    final_sectPr = merged_body.sectPr
+    if final_sectPr is not None:
+        for reference in list(final_sectPr.iterchildren(*SECTION_REFERENCE_TAGS)):
+            final_sectPr.remove(reference)
+
+    style_ids = set()
+    numId_elements = []
+    numId_tag, val_attr = qn('w:numId'), qn('w:val')
+    for element in appended:
+        for reference in element.iter(*STYLE_REFERENCE_TAGS, numId_tag):
+            if reference.tag == numId_tag:
+                numId_elements.append(reference)
+            else:
+                style_ids.add(reference.get(val_attr))
+    copied_styles = copy_missing_styles(first_doc.styles.element, second_doc.styles.element, style_ids)
+    # Copied styles can carry list numbering too
+    for style_id in copied_styles:
+        numId_elements.extend(first_doc.styles.element.get_by_id(style_id).iter(qn('w:numId')))
+    copy_numbering(first_doc, second_doc, numId_elements)
+
+    first_doc.part._element = merged_root
+    logger.info(f"Appended {len(appended)} body elements")
+    return first_doc.part.document
@@ -0,0 +1,180 @@
+"""
+Streaming writer backend for the VA report.
+
+build_document keeps the whole report as one python-docx Document, so memory
+grows with the number of findings. This backend writes word/document.xml
+straight into the output zip instead: the summary table and the finding
+pages are built a chunk at a time in scratch documents, with the same
+create_summary_table / add_finding_pages code and therefore the same
+styling, and each chunk is serialised and dropped before the next one is
+built. The other package parts (styles, settings, content types) come from
+an empty skeleton document.
+
+Memory is bounded by the chunk size and the grouped findings, not by the
+size of the generated document.
+"""
+import gc
+import io
+import logging
+import re
+import zipfile
+
+from docx import Document
+from docx.enum.section import WD_SECTION
+from docx.oxml.ns import qn
+from lxml import etree
+
+from report_logging import StageCounters
+from report_profiling import stage
+from script5 import (
+    add_finding_pages,
+    create_summary_table,
+    load_grouped_vulnerabilities,
+    normalize_fonts,
+    sort_summary_findings,
+)
+
+logger = logging.getLogger(__name__)
+
+# Findings built per scratch document; even, so alternating summary row shading lines up across chunks
+DEFAULT_CHUNK_SIZE = 200
+
+XML_DECLARATION = b"<?xml version='1.0' encoding='UTF-8' standalone='yes'?>\n"
+_NAMESPACE_DECLARATION = re.compile(rb' xmlns(?::\w+)?="[^"]*"')
+
+
+class ChunkSerializer:
+    """Serialises body elements for writing inside a document root that declares the namespaces"""
+
+    def __init__(self, root):
+        self.root_namespaces = set(root.nsmap.items())
+
+    def __call__(self, element):
+        xml = etree.tostring(element)
+        # lxml repeats every in-scope namespace on a serialised subtree; drop them when the root has them all
+        if set(element.nsmap.items()) <= self.root_namespaces:
+            end = xml.index(b'>')
+            xml = _NAMESPACE_DECLARATION.sub(b'', xml[:end]) + xml[end:]
+        return xml
+
+
+def root_start_tag(root):
+    """The <w:document ...> start tag of root, with its namespace declarations"""
+    empty_root = etree.Element(root.tag, attrib=dict(root.attrib), nsmap=root.nsmap)
+    return etree.tostring(empty_root)[:-2] + b'>'
+
+
+def section_break_paragraph():
+    """The paragraph that doc.add_section(WD_SECTION.NEW_PAGE) inserts"""
+    doc = Document()
+    doc.add_section(WD_SECTION.NEW_PAGE)
+    return doc.element.body[-2]
+
+
+def write_summary_table(out, serialize, findings, chunk_size):
+    """Write the summary table of all findings, built chunk_size rows at a time"""
+    sorted_findings = sort_summary_findings(findings)
+    trailing_paragraph = None
+    for start in range(0, len(sorted_findings), chunk_size):
+        chunk = sorted_findings[start:start + chunk_size]
+        scratch = Document()
+        # Numbered and shaded by their position in the whole table
+        if not create_summary_table(scratch, dict(enumerate(chunk)), start):
+            raise RuntimeError("Failed to create summary table")
+        tbl = scratch.element.body.find(qn('w:tbl'))
+        rows = tbl.tr_lst
+
+        if start == 0:
+            out.write(b'<w:tbl>')
+            out.write(serialize(tbl.tblPr))
+            out.write(serialize(tbl.tblGrid))
+            out.write(serialize(rows[0]))
+            trailing_paragraph = serialize(tbl.getnext())
+        for tr in rows[1:]:
+            out.write(serialize(tr))
+        del scratch, tbl, rows
+        gc.collect()
+    out.write(b'</w:tbl>')
+    # The spacing paragraph create_summary_table adds after the table
+    out.write(trailing_paragraph)
+
+
+def write_finding_pages(out, serialize, findings, use_block_template, chunk_size, finding_cache=None):
+    """Write the pages of all findings, built chunk_size findings at a time"""
+    for start in range(0, len(findings), chunk_size):
+        scratch = Document()
+        add_finding_pages(scratch, findings[start:start + chunk_size], start, len(findings), use_block_template,
+                          finding_cache)
+        body = scratch.element.body
+        for element in body:
+            if element.tag != qn('w:sectPr'):
+                out.write(serialize(element))
+        # python-docx documents are reference cycles; free each chunk's tree before building the next
+        del scratch, body
+        gc.collect()
+
+
+def write_document_xml(out, skeleton, grouped_vulnerabilities, use_block_template, chunk_size, finding_cache=None):
+    root = skeleton.element
+    serialize = ChunkSerializer(root)
+    findings = list(grouped_vulnerabilities.items())
+
+    out.write(XML_DECLARATION)
+    out.write(root_start_tag(root))
+    out.write(b'<w:body>')
+
+    with stage("summary_table"):
+        write_summary_table(out, serialize, grouped_vulnerabilities.values(), chunk_size)
+    # Add a page break after the summary table
+    out.write(serialize(section_break_paragraph()))
+
+    with stage("finding_tables"):
+        counters = StageCounters(logger, "Finding tables")
+        for _, data_to_append in findings:
+            counters.add("findings")
+            counters.add("affected resources", len(data_to_append.affected_resources))
+        write_finding_pages(out, serialize, findings, use_block_template, chunk_size, finding_cache)
+    counters.log()
+
+    out.write(serialize(root.body.sectPr))
+    out.write(b'</w:body></w:document>')
+
+
+def stream_document(finding_id_prefix=None, csv_path='dataset.csv', output_path='output_document.docx',
+                    use_block_template=True, ingestion_engine="csv", chunk_size=DEFAULT_CHUNK_SIZE,
+                    finding_cache=None, scan_cache=None):
+    """
+    Streaming counterpart of script5.build_document followed by doc.save.
+
+    Takes the same inputs and writes the same report to output_path (a path
+    or a writable binary stream). Raises on failure.
+    """
+    with stage("parse_csv"):
+        grouped_vulnerabilities = load_grouped_vulnerabilities(csv_path, finding_id_prefix, ingestion_engine, scan_cache)
+
+    # Check if we have any vulnerabilities to process
+    if not grouped_vulnerabilities:
+        logger.warning("No valid vulnerabilities found in the CSV file")
+        raise ValueError("No valid vulnerabilities found in the CSV file")
+    logger.info(f"Found {len(grouped_vulnerabilities)} unique vulnerabilities, streaming the report")
+
+    # Every part except the document body comes from an empty document with the report's Normal style
+    skeleton = Document()
+    normalize_fonts(skeleton, "Helvetica", 10.5)
+    package = io.BytesIO()
+    skeleton.save(package)
+    document_part = skeleton.part.partname.lstrip('/')
+
+    try:
+        with zipfile.ZipFile(package) as source, \
+                zipfile.ZipFile(output_path, 'w', zipfile.ZIP_DEFLATED) as target:
+            for info in source.infolist():
+                if info.filename == document_part:
+                    with target.open(document_part, 'w') as out:
+                        write_document_xml(out, skeleton, grouped_vulnerabilities, use_block_template, chunk_size,
+                                           finding_cache)
+                else:
+                    target.writestr(info, source.read(info.filename))
+    except Exception as e:
+        logger.error(f"Failed to stream document: {str(e)}")
+        raise
@@ -0,0 +1,111 @@
+"""
+On-disk cache of rendered finding pages.
+
+Re-uploading a scan after a small edit used to rebuild every finding. With
+a FindingCache the body XML of each rendered finding (heading, detail tables
+and page break) is stored under a hash of everything that determines it:
+the numbered heading, the finding's data, whether a page break follows,
+the builder used, the module keyword mapping and FINDING_FORMAT_VERSION. Unchanged findings are then
+parsed back from the cache and only changed ones are rendered.
+
+Bump FINDING_FORMAT_VERSION whenever the layout of a finding page changes,
+so pages rendered by older code are not reused.
+"""
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from copy import deepcopy
+
+from docx.oxml import parse_xml
+from docx.oxml.ns import qn
+from lxml import etree
+
+logger = logging.getLogger(__name__)
+
+FINDING_FORMAT_VERSION = 2
+
+# prune() keeps the cache under this size unless told otherwise
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+
+class FindingCache:
+    """Rendered finding XML stored as <directory>/<key[:2]>/<key>.xml"""
+
+    def __init__(self, directory, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    def key(self, heading, data, page_break, use_block_template, keywords_fingerprint=""):
+        """Hash of everything that determines the page; keywords_fingerprint identifies the module keyword mapping"""
+        payload = json.dumps(
+            [FINDING_FORMAT_VERSION, use_block_template, page_break, heading, data, keywords_fingerprint],
+            sort_keys=True,
+        )
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], f"{key}.xml")
+
+    def load(self, key):
+        """Return the cached body elements for key, or None on a miss"""
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as cache_file:
+                xml = cache_file.read()
+        except FileNotFoundError:
+            return None
+        # Mark the entry as recently used for prune()
+        os.utime(path)
+        return list(parse_xml(xml))
+
+    def store(self, key, elements):
+        """Save the rendered body elements of one finding under key"""
+        # Copies inside one wrapper, so namespaces are declared once rather than on every element
+        body = etree.Element(qn('w:body'), nsmap=elements[0].nsmap)
+        body.extend(deepcopy(element) for element in elements)
+        xml = etree.tostring(body)
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write to a temporary file first so concurrent readers never see a partial entry
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as cache_file:
+                cache_file.write(xml)
+            os.replace(temp_path, path)
+        except Exception:
+            os.unlink(temp_path)
+            raise
+
+    def prune(self):
+        """Remove the least recently used entries until the cache fits in max_bytes"""
+        if self.max_bytes is None:
+            return
+        total = prune_directory(self.directory, '.xml', self.max_bytes)
+        logger.info(f"Finding cache pruned to {total} bytes")
+
+
+def prune_directory(directory, suffix, max_bytes):
+    """
+    Remove the least recently used <directory>/<xx>/*<suffix> entries until
+    they add up to max_bytes at most, and return their remaining total size.
+    """
+    entries = []
+    for subdirectory in os.scandir(directory):
+        if subdirectory.is_dir():
+            for entry in os.scandir(subdirectory.path):
+                if entry.name.endswith(suffix):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+        total -= size
+    return total
@@ -0,0 +1,84 @@
+"""
+Typed record of one grouped finding.
+
+Grouping a scan used to produce one dict per finding, with the affected
+hosts kept as a set of "host:port" strings that was later joined into a
+newline separated string and split again to fill the report. A Finding
+keeps the same data in slots: the risk level is a RiskLevel member shared
+by all findings, the CVSS score is parsed once into a float, and the
+affected resources are a sorted tuple of (host, port) pairs that are only
+turned into text when a page is rendered.
+"""
+import math
+from dataclasses import dataclass
+from enum import Enum
+from typing import Optional, Tuple
+
+
+class RiskLevel(str, Enum):
+    """Risk level derived from the CVSS score; compares and formats as its lowercase name"""
+    CRITICAL = "critical"
+    HIGH = "high"
+    MEDIUM = "medium"
+    LOW = "low"
+    INFORMATIONAL = "informational"
+
+    @property
+    def priority(self):
+        """Position in the summary table ordering, most severe first"""
+        return _RISK_PRIORITY[self]
+
+    @property
+    def label(self):
+        """Capitalised name as shown in the report"""
+        return self.value.capitalize()
+
+
+_RISK_PRIORITY = {risk: priority for priority, risk in enumerate(RiskLevel, start=1)}
+
+# An affected resource: host and port, port 0 when the finding is not tied to a port
+Resource = Tuple[str, int]
+
+
+def parse_cvss_score(score):
+    """CVSS score as a float, or None when it is empty or not a number"""
+    try:
+        value = float(score)
+    except (ValueError, TypeError):
+        return None
+    return value if math.isfinite(value) else None
+
+
+def format_cvss_score(score):
+    """CVSS score with one decimal place, "" when there is none"""
+    return "" if score is None else f"{score:.1f}"
+
+
+def parse_port(port):
+    """Port column as an int; empty or non-numeric ports count as 0 (host only)"""
+    port = port.strip()
+    return int(port) if port.isdigit() else 0
+
+
+def format_resource(resource):
+    """host, or host:port for a non-zero port"""
+    host, port = resource
+    return host if port == 0 else f"{host}:{port}"
+
+
+@dataclass(slots=True)
+class Finding:
+    """One vulnerability grouped across every host it was reported on"""
+    name: str
+    description: str
+    cvss_score: Optional[float]
+    risk: RiskLevel
+    mitigation: str
+    references: str
+    affected_resources: Tuple[Resource, ...] = ()
+    finding_id: str = ""
+
+    @property
+    def summary_sort_key(self):
+        """By risk level, then highest CVSS first"""
+        return self.risk.priority, -(self.cvss_score or 0)
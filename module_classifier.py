@@ -0,0 +1,121 @@
+"""
+Module-name classification of finding names.
+
+The keyword -> module mapping is loaded from module_keywords.json, whose
+order is the priority order: when a finding name contains several keywords
+the one listed first wins, so products are listed before the vendors and
+platforms they run on ("Tomcat" before "Apache", "IIS" before "Windows").
+A keyword only matches as a whole word: the characters on either side of
+it must not be letters, so "Perl" does not match "Properly" nor "Java"
+"JavaScript", while "iDRAC" still matches "iDRAC9". The keywords are
+compiled once into an Aho-Corasick automaton, so classifying a name costs
+one pass over its characters however many keywords there are, and results
+are memoised per distinct name.
+"""
+import hashlib
+import json
+import logging
+import os
+from collections import deque
+from functools import lru_cache
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_KEYWORDS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'module_keywords.json')
+
+# Names classified per classifier before the least recently used are dropped
+CLASSIFY_CACHE_SIZE = 8192
+
+_NO_MATCH = float('inf')
+# Part of the fingerprint, so cached pages classified under other matching rules are not reused
+MATCHING_VERSION = 2
+
+
+class KeywordClassifier:
+    """Case-insensitive whole-word keyword matcher returning the module of the highest-priority keyword found"""
+
+    def __init__(self, keywords):
+        """keywords is an ordered mapping of keyword to module name, highest priority first"""
+        self.keywords = dict(keywords)
+        self.modules = []
+        # Trie as one transition dict per state, with failure links, the rank and length of the keyword
+        # ending at each state, and a link to the next state on the failure chain where a keyword ends
+        self._goto = [{}]
+        self._fail = [0]
+        self._rank = [_NO_MATCH]
+        self._depth = [0]
+        self._output = [0]
+        for keyword, module in self.keywords.items():
+            if not keyword:
+                continue
+            self._add(keyword.lower(), len(self.modules))
+            self.modules.append(module)
+        self._link()
+        self.fingerprint = hashlib.sha256(
+            json.dumps([MATCHING_VERSION, list(self.keywords.items())]).encode('utf-8')
+        ).hexdigest()[:16]
+        self.classify = lru_cache(maxsize=CLASSIFY_CACHE_SIZE)(self._classify)
+
+    @classmethod
+    def from_file(cls, path=DEFAULT_KEYWORDS_PATH):
+        """Load the mapping from a JSON object of keyword to module name, in priority order"""
+        with open(path, encoding='utf-8') as keywords_file:
+            keywords = json.load(keywords_file)
+        logger.info(f"Loaded {len(keywords)} module keywords from {path}")
+        return cls(keywords)
+
+    def _add(self, keyword, rank):
+        state = 0
+        for char in keyword:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._rank.append(_NO_MATCH)
+                self._depth.append(self._depth[state] + 1)
+                self._output.append(0)
+                self._goto[state][char] = next_state
+            state = next_state
+        # A keyword listed twice keeps its first (higher) priority
+        self._rank[state] = min(self._rank[state], rank)
+
+    def _link(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                fail_state = self._goto[fail].get(char, 0)
+                self._fail[next_state] = fail_state
+                # Keywords that are suffixes of this one also end here
+                if self._rank[fail_state] != _NO_MATCH:
+                    self._output[next_state] = fail_state
+                else:
+                    self._output[next_state] = self._output[fail_state]
+                queue.append(next_state)
+
+    def _classify(self, name):
+        goto, fail, rank_at, depth_at, output = self._goto, self._fail, self._rank, self._depth, self._output
+        text = name.lower()
+        end = len(text)
+        state = 0
+        best = _NO_MATCH
+        for index, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            match = state if rank_at[state] != _NO_MATCH else output[state]
+            # Every keyword ending here, longest first
+            while match:
+                rank = rank_at[match]
+                if rank < best:
+                    start = index + 1 - depth_at[match]
+                    if (start == 0 or not text[start - 1].isalpha()) and (index + 1 == end or not text[index + 1].isalpha()):
+                        best = rank
+                        if best == 0:
+                            return self.modules[0]
+                match = output[match]
+        return "" if best == _NO_MATCH else self.modules[best]
@@ -0,0 +1,317 @@
+"""
+Background report jobs for the web app.
+
+Each job gets its own work directory holding the uploaded CSV (or, for a
+multi-file upload, the scans/ directory, and for chunked uploads the scan
+already parsed) and the generated documents. Finished jobs, with their
+work directories, are deleted once they are older than the queue's
+retention period. Jobs run on a thread or process pool and their state is
+kept in a small SQLite database next to the work directories, so status and
+finished reports survive a restart and unfinished jobs can be resumed.
+"""
+import json
+import logging
+import os
+import pickle
+import shutil
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from finding_cache import FindingCache, DEFAULT_MAX_BYTES as DEFAULT_FINDING_CACHE_MAX_BYTES
+from scan_cache import ScanCache
+from report_pipeline import build_report
+from report_profiling import ReportProfiler
+
+logger = logging.getLogger(__name__)
+
+JOB_QUEUED = 'queued'
+JOB_RUNNING = 'running'
+JOB_DONE = 'done'
+JOB_FAILED = 'failed'
+
+# Stage breakdown of a profiled job, saved in its work directory
+PROFILE_FILENAME = 'profile.json'
+
+# The process running a job refreshes its updated_at this often
+HEARTBEAT_SECONDS = 60
+# Running jobs not updated for this long are assumed lost with their process
+STALE_JOB_SECONDS = 10 * HEARTBEAT_SECONDS
+# Finished jobs, their uploaded scans and reports are deleted after this long
+JOB_RETENTION_SECONDS = 24 * 3600
+
+# Uploads of several scans are saved here, inside the work directory, instead of dataset.csv
+SCANS_DIRNAME = 'scans'
+# Scans already parsed when the job was submitted (chunked uploads) are saved here instead
+PARSED_SCAN_FILENAME = 'dataset.pickle'
+
+
+def save_parsed_scan(parsed_scan, work_dir):
+    """Save a ParsedScan as the job's dataset and return its path"""
+    parsed_scan_path = os.path.join(work_dir, PARSED_SCAN_FILENAME)
+    with open(parsed_scan_path, 'wb') as parsed_scan_file:
+        pickle.dump(parsed_scan, parsed_scan_file, protocol=pickle.HIGHEST_PROTOCOL)
+    return parsed_scan_path
+
+
+def job_dataset(work_dir):
+    """
+    The job's dataset: its saved ParsedScan, its saved scans in upload order, or dataset.csv.
+
+    dataset.pickle is unpickled as it stands, which runs whatever code the
+    file names. It is only ever written by save_parsed_scan, so JOBS_FOLDER
+    must not be writable by anyone but the app (the same assumption as the
+    scan cache directory).
+    """
+    parsed_scan_path = os.path.join(work_dir, PARSED_SCAN_FILENAME)
+    if os.path.exists(parsed_scan_path):
+        with open(parsed_scan_path, 'rb') as parsed_scan_file:
+            return pickle.load(parsed_scan_file)
+    scans_dir = os.path.join(work_dir, SCANS_DIRNAME)
+    if os.path.isdir(scans_dir):
+        return [os.path.join(scans_dir, name) for name in sorted(os.listdir(scans_dir))]
+    return os.path.join(work_dir, 'dataset.csv')
+
+
+def run_report_job(work_dir, params):
+    """Executor entry point: build the report for one job"""
+    profile_options = params.get('profile')
+    if profile_options:
+        profiler = ReportProfiler.from_options(profile_options)
+        with profiler.run():
+            result = run_report_job(work_dir, dict(params, profile=None))
+        profiler.write(os.path.join(work_dir, PROFILE_FILENAME))
+        return result
+    finding_cache_dir = params.get('finding_cache_dir')
+    scan_cache_dir = params.get('scan_cache_dir')
+    return build_report(
+        work_dir,
+        job_dataset(work_dir),
+        params['finding_id_prefix'],
+        params['context'],
+        params['template_path'],
+        FindingCache(finding_cache_dir, params.get('finding_cache_max_bytes', DEFAULT_FINDING_CACHE_MAX_BYTES))
+        if finding_cache_dir else None,
+        ScanCache(scan_cache_dir) if scan_cache_dir else None,
+    )
+
+
+class JobStore:
+    """SQLite-backed job state, safe to share between threads and processes"""
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        with self._connect() as conn:
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    status TEXT NOT NULL,
+                    work_dir TEXT NOT NULL,
+                    params TEXT NOT NULL,
+                    result_path TEXT,
+                    merged INTEGER,
+                    error TEXT,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                )"""
+            )
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def create(self, job_id, work_dir, params):
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, status, work_dir, params, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (job_id, JOB_QUEUED, work_dir, json.dumps(params), now, now),
+            )
+
+    def claim(self, job_id):
+        """Mark a queued job as running; False if another worker already has it"""
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = ?, updated_at = ? WHERE id = ? AND status = ?",
+                (JOB_RUNNING, time.time(), job_id, JOB_QUEUED),
+            )
+            return cursor.rowcount == 1
+
+    def finish(self, job_id, status, result_path=None, merged=None, error=None):
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, result_path = ?, merged = ?, error = ?, updated_at = ? WHERE id = ?",
+                (status, result_path, merged, error, time.time(), job_id),
+            )
+
+    def heartbeat(self, job_ids):
+        """Record that the running jobs in job_ids are still being worked on"""
+        with self._connect() as conn:
+            conn.executemany(
+                "UPDATE jobs SET updated_at = ? WHERE id = ? AND status = ?",
+                [(time.time(), job_id, JOB_RUNNING) for job_id in job_ids],
+            )
+
+    def get(self, job_id):
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job['params'] = json.loads(job['params'])
+        return job
+
+    def finished_before(self, cutoff):
+        """Ids and work directories of done or failed jobs last updated before cutoff"""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT id, work_dir FROM jobs WHERE status IN (?, ?) AND updated_at < ?",
+                (JOB_DONE, JOB_FAILED, cutoff),
+            ).fetchall()
+        return [(row['id'], row['work_dir']) for row in rows]
+
+    def job_ids(self):
+        with self._connect() as conn:
+            return {row['id'] for row in conn.execute("SELECT id FROM jobs")}
+
+    def delete(self, job_id):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM jobs WHERE id = ?", (job_id,))
+
+    def requeue_unfinished(self, stale_before):
+        """Put stale running jobs back in the queue and return the ids of all queued jobs"""
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ? WHERE status = ? AND updated_at < ?",
+                (JOB_QUEUED, JOB_RUNNING, stale_before),
+            )
+            rows = conn.execute(
+                "SELECT id FROM jobs WHERE status = ? ORDER BY created_at", (JOB_QUEUED,)
+            ).fetchall()
+        return [row['id'] for row in rows]
+
+
+class ReportJobQueue:
+    """
+    Submit report jobs to an executor and track them in a JobStore.
+
+    While jobs it dispatched are running, a heartbeat thread refreshes their
+    rows every HEARTBEAT_SECONDS, so other server processes only take over
+    jobs whose process has gone.
+    """
+
+    def __init__(self, jobs_dir, max_workers=None, executor='thread', retention_seconds=JOB_RETENTION_SECONDS):
+        if executor not in ('thread', 'process'):
+            raise ValueError(f"Unknown job executor: {executor}")
+        os.makedirs(jobs_dir, exist_ok=True)
+        self.jobs_dir = jobs_dir
+        self.max_workers = max_workers
+        self.executor_type = executor
+        self.retention_seconds = retention_seconds
+        self.store = JobStore(os.path.join(jobs_dir, 'jobs.sqlite3'))
+        self._executor = None
+        self._lock = threading.Lock()
+        self._running = set()
+        self._heartbeat = None
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                executor_class = ProcessPoolExecutor if self.executor_type == 'process' else ThreadPoolExecutor
+                self._executor = executor_class(max_workers=self.max_workers)
+            return self._executor
+
+    def new_job(self):
+        """Create the id and work directory for a job that is about to be submitted"""
+        self.sweep()
+        job_id = uuid.uuid4().hex
+        work_dir = os.path.join(self.jobs_dir, job_id)
+        os.makedirs(work_dir)
+        return job_id, work_dir
+
+    def submit(self, job_id, work_dir, params):
+        """Queue a job whose dataset is already saved in work_dir (see job_dataset)"""
+        self.store.create(job_id, work_dir, params)
+        logger.info(f"Report job {job_id} queued")
+        self._dispatch(job_id)
+        return job_id
+
+    def _dispatch(self, job_id):
+        if not self.store.claim(job_id):
+            return
+        job = self.store.get(job_id)
+        with self._lock:
+            self._running.add(job_id)
+            if self._heartbeat is None:
+                self._heartbeat = threading.Thread(target=self._send_heartbeats, name="report-job-heartbeat",
+                                                   daemon=True)
+                self._heartbeat.start()
+        future = self._get_executor().submit(run_report_job, job['work_dir'], job['params'])
+        future.add_done_callback(lambda done: self._complete(job_id, done))
+
+    def _send_heartbeats(self):
+        while True:
+            time.sleep(HEARTBEAT_SECONDS)
+            with self._lock:
+                job_ids = list(self._running)
+            if not job_ids:
+                continue
+            try:
+                self.store.heartbeat(job_ids)
+            except Exception as e:
+                logger.error(f"Report job heartbeat failed: {str(e)}")
+
+    def _complete(self, job_id, future):
+        with self._lock:
+            self._running.discard(job_id)
+        try:
+            report_path, merged = future.result()
+        except Exception as e:
+            logger.error(f"Report job {job_id} failed: {str(e)}")
+            self.store.finish(job_id, JOB_FAILED, error=str(e))
+        else:
+            logger.info(f"Report job {job_id} finished")
+            self.store.finish(job_id, JOB_DONE, result_path=report_path, merged=int(merged))
+
+    def get(self, job_id):
+        return self.store.get(job_id)
+
+    def sweep(self):
+        """Delete expired jobs and pick up jobs lost with the process that ran them"""
+        try:
+            self.expire()
+            self.resume_pending()
+        except Exception as e:
+            # Housekeeping never stops a new job from being accepted
+            logger.error(f"Job sweep failed: {str(e)}")
+
+    def expire(self):
+        """
+        Delete finished jobs older than retention_seconds, with their work
+        directories, and work directories of jobs that were never submitted.
+        """
+        cutoff = time.time() - self.retention_seconds
+        expired = self.store.finished_before(cutoff)
+        for job_id, work_dir in expired:
+            shutil.rmtree(work_dir, ignore_errors=True)
+            self.store.delete(job_id)
+            logger.info(f"Removed expired report job {job_id}")
+
+        known = self.store.job_ids()
+        for entry in os.scandir(self.jobs_dir):
+            # A work directory without a job row is left over from a failed upload or a crash before submit
+            if entry.is_dir() and entry.name not in known and entry.stat().st_mtime < cutoff:
+                shutil.rmtree(entry.path, ignore_errors=True)
+                logger.info(f"Removed orphaned job directory {entry.name}")
+        return [job_id for job_id, _ in expired]
+
+    def resume_pending(self):
+        """Re-dispatch jobs left queued, or running without a heartbeat, by a process that is gone"""
+        job_ids = self.store.requeue_unfinished(time.time() - STALE_JOB_SECONDS)
+        for job_id in job_ids:
+            logger.info(f"Resuming report job {job_id}")
+            self._dispatch(job_id)
+        return job_ids
@@ -0,0 +1,188 @@
+"""
+Logging setup shared by script5, the web app and batch runs.
+
+Log records are put on an in-memory queue by a QueueHandler and written by a
+QueueListener thread, so the code generating a report never waits on file or
+console I/O. Each program writes to one log file in the log directory
+instead of a new timestamped file per run.
+
+Worker processes forked from a configured process (the pools of sharded
+builds, parse_scans, batch runs and the job queue) open no file of their
+own: their records go over a multiprocessing queue, created at the first
+fork, to a second listener thread in the parent that writes them with the
+parent's handlers. Separate processes that share a log file, such as the
+web app's gunicorn workers, must not each rotate it; they configure logging
+with rotate=False and leave rotation to an external tool like logrotate.
+
+Hot loops do not log per row; they count what happened in a StageCounters
+and log a single summary line per stage.
+"""
+import atexit
+import logging
+import logging.handlers
+import multiprocessing
+import os
+import queue
+import sys
+import threading
+from collections import Counter
+
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+# Defaults, overridable per call or through the environment
+DEFAULT_LOG_DIR = os.environ.get('REPORT_LOG_DIR', 'logs')
+DEFAULT_LOG_LEVEL = os.environ.get('REPORT_LOG_LEVEL', 'INFO')
+DEFAULT_MAX_BYTES = 10 * 1024 * 1024
+DEFAULT_BACKUP_COUNT = 5
+
+_lock = threading.Lock()
+_listener = None
+_config = None
+# Queue and listener for the records of forked worker processes
+_child_queue = None
+_child_listener = None
+
+
+class _InProcessQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler for a queue that never leaves the process.
+
+    The stock prepare() formats every record and copies it so it can be
+    pickled; here the record only has its message merged, and all formatting
+    happens once, on the listener thread.
+    """
+
+    def prepare(self, record):
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+def _build_handlers(config, log_name):
+    formatter = logging.Formatter(LOG_FORMAT)
+    log_path = os.path.join(config['log_dir'], f"{log_name}.log")
+    if config['rotate']:
+        file_handler = logging.handlers.RotatingFileHandler(
+            log_path,
+            maxBytes=config['max_bytes'],
+            backupCount=config['backup_count'],
+            delay=True,
+        )
+    else:
+        # Reopens the file when something else rotates it
+        file_handler = logging.handlers.WatchedFileHandler(log_path, delay=True)
+    file_handler.setFormatter(formatter)
+    handlers = [file_handler]
+    if config['console']:
+        console_handler = logging.StreamHandler(sys.stdout)
+        console_handler.setFormatter(formatter)
+        handlers.append(console_handler)
+    return handlers
+
+
+def _start_listener(log_name):
+    """Point the root logger at a fresh queue drained by a new listener thread"""
+    global _listener
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+        handler.close()
+    root.addHandler(_InProcessQueueHandler(log_queue))
+    _listener = logging.handlers.QueueListener(
+        log_queue, *_build_handlers(_config, log_name), respect_handler_level=True
+    )
+    _listener.start()
+
+
+def _start_child_listener():
+    """Before a fork: have the listener's handlers also write what worker processes put on _child_queue"""
+    global _child_queue, _child_listener
+    if _listener is None or _child_listener is not None:
+        return
+    _child_queue = multiprocessing.Queue()
+    _child_listener = logging.handlers.QueueListener(_child_queue, *_listener.handlers, respect_handler_level=True)
+    _child_listener.start()
+
+
+def _forward_from_child():
+    # The forked worker has the in-process queue but no thread draining it;
+    # its records go to the parent's listeners instead
+    global _listener, _child_listener
+    if _child_queue is None:
+        return
+    _listener = _child_listener = None
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(logging.handlers.QueueHandler(_child_queue))
+
+
+def configure_logging(process_name, log_dir=None, level=None, max_bytes=DEFAULT_MAX_BYTES,
+                      backup_count=DEFAULT_BACKUP_COUNT, console=True, rotate=True):
+    """
+    Route all logging through a background writer for this process.
+
+    Logs go to <log_dir>/<process_name>.log, rotated at max_bytes unless
+    rotate is False, and to stdout when console is True. Processes forked
+    from this one log through it. Only the first call in a process has an
+    effect; later calls return without changing anything.
+    """
+    global _config
+    with _lock:
+        if _config is not None:
+            return
+        log_dir = log_dir or DEFAULT_LOG_DIR
+        os.makedirs(log_dir, exist_ok=True)
+        _config = {
+            'process_name': process_name,
+            'log_dir': log_dir,
+            'max_bytes': max_bytes,
+            'backup_count': backup_count,
+            'console': console,
+            'rotate': rotate,
+        }
+        logging.getLogger().setLevel(level or DEFAULT_LOG_LEVEL)
+        _start_listener(process_name)
+        atexit.register(shutdown_logging)
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(before=_start_child_listener, after_in_child=_forward_from_child)
+
+
+def shutdown_logging():
+    """Write out any queued records and stop the listener threads"""
+    global _listener, _child_listener
+    if _child_listener is not None:
+        _child_listener.stop()
+        _child_listener = None
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+
+class StageCounters:
+    """
+    Counts events inside one processing stage and logs them as one line.
+
+        counters = StageCounters(logger, "ingest")
+        for row in rows:
+            counters.add("rows")
+        counters.log()   # ingest: rows=1000000
+    """
+
+    def __init__(self, logger, stage):
+        self.logger = logger
+        self.stage = stage
+        self.counts = Counter()
+
+    def add(self, name, count=1):
+        self.counts[name] += count
+
+    def __getitem__(self, name):
+        return self.counts[name]
+
+    def log(self, level=logging.INFO):
+        summary = ", ".join(f"{name}={count}" for name, count in self.counts.items())
+        self.logger.log(level, f"{self.stage}: {summary or 'nothing processed'}")
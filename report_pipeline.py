@@ -0,0 +1,148 @@
+"""
+Report generation pipeline shared by the web app and the background jobs.
+
+A report is the rendered cover page (report_template.docx) followed by the VA
+report built by script5, merged into one document.
+"""
+import io
+import logging
+import os
+
+from docx import Document
+from docx.oxml.ns import qn
+
+from docx_merge import append_document
+from report_profiling import stage
+from script5 import build_document, normalize_fonts
+from template_cache import template_cache
+
+logger = logging.getLogger(__name__)
+
+
+class ReportGenerationError(Exception):
+    """A pipeline step failed; the message is suitable for showing to the user"""
+
+
+def merge_document_objects(first_doc, second_doc):
+    """
+    Append the body of second_doc to first_doc in memory and return the merged Document.
+
+    See docx_merge.append_document; first_doc should not be used afterwards.
+    """
+    # Cover tables get the report font as well as everything moved over from the VA report
+    body_elements = [element for element in second_doc.element.body if element.tag != qn('w:sectPr')]
+    font_elements = list(first_doc.element.body.iterchildren(qn('w:tbl'))) + body_elements
+
+    # Only the cover tables and the appended content are walked, never the whole merged document
+    with stage("fonts"):
+        normalize_fonts(first_doc, "Helvetica", 10.5, elements=font_elements)
+
+    with stage("splice"):
+        return append_document(first_doc, second_doc)
+
+
+def merge_documents(first_doc_path, second_doc_path, output_path):
+    """Merge two saved Word documents into one file"""
+    logger.info("Merging documents")
+    try:
+        # Open the first document (cover) and the second document (VA report)
+        first_doc = Document(first_doc_path)
+        second_doc = Document(second_doc_path)
+
+        merged_doc = merge_document_objects(first_doc, second_doc)
+
+        # Save the merged document
+        merged_doc.save(output_path)
+        logger.info("Documents merged successfully")
+        return True
+    except Exception as e:
+        logger.error(f"Error merging documents: {str(e)}")
+        return False
+
+
+def prune_finding_cache(finding_cache):
+    """Keep the finding cache within max_bytes; a failed prune never fails the report"""
+    try:
+        with stage("prune_finding_cache"):
+            finding_cache.prune()
+    except Exception as e:
+        logger.warning(f"Failed to prune the finding cache: {str(e)}")
+
+
+def render_cover_document(template_path, context):
+    """Render the cover page template with the client context and return the live Document"""
+    doc = template_cache.get(template_path)
+    doc.render(context)
+    logger.info("Cover page generated successfully")
+    # get_docx() would reload the unrendered template, the rendered Document is doc.docx
+    return doc.docx
+
+
+def build_report_document(dataset, finding_id_prefix, context, template_path, finding_cache=None, scan_cache=None):
+    """
+    Render the cover, build the VA report and merge them without touching disk.
+
+    dataset is anything script5.load_grouped_vulnerabilities accepts: a CSV
+    path or stream, a zip of CSVs, a list of those or a ParsedScan. Returns (document, merged);
+    merged is False when merging failed and document is the VA report on its
+    own. Raises ReportGenerationError when no report could be produced.
+    finding_cache and scan_cache are passed on to script5.build_document;
+    finding_cache is pruned to its size limit once the VA report is built.
+    """
+    # Step 1: Generate the cover page document using DocxTemplate
+    if not os.path.exists(template_path):
+        logger.error("Report template not found")
+        raise ReportGenerationError("Report template not found")
+    try:
+        with stage("cover_render"):
+            cover_doc = render_cover_document(template_path, context)
+    except Exception as e:
+        logger.error(f"Failed to generate cover page: {str(e)}")
+        raise ReportGenerationError(f"Failed to generate cover page: {str(e)}") from e
+
+    # Step 2: Build the VA report as a live document
+    try:
+        with stage("va_report"):
+            va_doc = build_document(finding_id_prefix, dataset, finding_cache=finding_cache, scan_cache=scan_cache)
+    except Exception as e:
+        logger.critical(f"Document creation failed: {str(e)}")
+        raise ReportGenerationError("Failed to generate the vulnerability report. Please check the logs for details.") from e
+    logger.info("VA report generated successfully")
+    if finding_cache is not None:
+        prune_finding_cache(finding_cache)
+
+    # Step 3: Merge the documents in memory
+    try:
+        with stage("merge"):
+            merged_doc = merge_document_objects(cover_doc, va_doc)
+    except Exception as e:
+        logger.error(f"Error merging documents: {str(e)}")
+        logger.error("Document merging failed")
+        return va_doc, False
+    logger.info("Final report generated successfully")
+    return merged_doc, True
+
+
+def build_report_stream(dataset, finding_id_prefix, context, template_path, finding_cache=None, scan_cache=None):
+    """Build the report in memory and return it as a BytesIO positioned at the start, with the merged flag"""
+    doc, merged = build_report_document(dataset, finding_id_prefix, context, template_path, finding_cache, scan_cache)
+    output = io.BytesIO()
+    with stage("save"):
+        doc.save(output)
+    output.seek(0)
+    return output, merged
+
+
+def build_report(work_dir, dataset_path, finding_id_prefix, context, template_path, finding_cache=None,
+                 scan_cache=None):
+    """
+    Build the report and save it once inside work_dir.
+
+    Returns (report_path, merged); see build_report_document.
+    """
+    doc, merged = build_report_document(dataset_path, finding_id_prefix, context, template_path, finding_cache,
+                                        scan_cache)
+    report_path = os.path.join(work_dir, 'merged_report.docx' if merged else 'output_document.docx')
+    with stage("save"):
+        doc.save(report_path)
+    return report_path, merged
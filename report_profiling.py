@@ -0,0 +1,189 @@
+"""
+Per-stage timing and optional profiling of report generation.
+
+The pipeline marks its stages with `stage(name)`. Outside a profiled run
+that is a no-op; inside `ReportProfiler.run()` each stage records its wall
+time and, with memory capture on, its tracemalloc peak. Nested stages are
+reported by path ("va_report/summary_table/fonts") and times are inclusive.
+cProfile capture is optional as well, and covers the whole run.
+
+Stage timings are kept per run, so any number of runs can be timed at once.
+tracemalloc and the cProfile hooks are global to the process, so runs
+capturing memory or cProfile data take a module lock and run one at a time;
+their memory figures still include what other threads allocate meanwhile.
+
+    profiler = ReportProfiler(memory=True)
+    with profiler.run():
+        build_report_stream(...)
+    profiler.write("profile.json")
+"""
+import cProfile
+import contextvars
+import io
+import json
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+
+PROFILE_OPTIONS = ("timings", "cprofile", "memory")
+
+_active_profiler = contextvars.ContextVar("report_profiler", default=None)
+_no_stage = nullcontext()
+# Held by the run capturing memory or cProfile data, which are process-wide
+_capture_lock = threading.Lock()
+
+
+def parse_profile_options(value):
+    """Turn "timings,memory" into a set of options; raises ValueError on unknown ones"""
+    options = {option.strip().lower() for option in (value or "").split(",") if option.strip()}
+    unknown = options - set(PROFILE_OPTIONS)
+    if unknown:
+        raise ValueError(f"Unknown profile option(s): {', '.join(sorted(unknown))}")
+    return options
+
+
+def stage(name):
+    """Time a pipeline stage in the active profiled run, if there is one"""
+    profiler = _active_profiler.get()
+    if profiler is None:
+        return _no_stage
+    return profiler.stage(name)
+
+
+class ReportProfiler:
+    """Collects stage timings, and optionally memory and cProfile data, for one run"""
+
+    def __init__(self, cprofile=False, memory=False):
+        self.cprofile = cprofile
+        self.memory = memory
+        self.stages = {}
+        self.total_seconds = None
+        self._path = []
+        self._peaks = []
+        self._profile = None
+
+    @classmethod
+    def from_options(cls, options):
+        return cls(cprofile="cprofile" in options, memory="memory" in options)
+
+    @contextmanager
+    def run(self):
+        """
+        Make this profiler active for the code run inside the block. With
+        memory or cProfile capture on, waits for any other such run to end.
+        """
+        with _capture_lock if self.memory or self.cprofile else nullcontext():
+            token = _active_profiler.set(self)
+            started_tracing = self.memory and not tracemalloc.is_tracing()
+            if started_tracing:
+                tracemalloc.start()
+            if self.cprofile:
+                self._profile = cProfile.Profile()
+                self._profile.enable()
+            start = time.perf_counter()
+            try:
+                yield self
+            finally:
+                self.total_seconds = time.perf_counter() - start
+                if self._profile is not None:
+                    self._profile.disable()
+                if started_tracing:
+                    tracemalloc.stop()
+                _active_profiler.reset(token)
+
+    @contextmanager
+    def stage(self, name):
+        self._path.append(name)
+        path = "/".join(self._path)
+        if self.memory:
+            if self._peaks:
+                # Keep the parent's peak so far before the child resets it
+                self._peaks[-1] = max(self._peaks[-1], tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+            self._peaks.append(0)
+            start_memory = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            entry = self.stages.get(path)
+            if entry is None:
+                entry = {"calls": 0, "seconds": 0.0}
+                self.stages[path] = entry
+            entry["calls"] += 1
+            entry["seconds"] += elapsed
+            if self.memory:
+                current, peak = tracemalloc.get_traced_memory()
+                peak = max(self._peaks.pop(), peak)
+                if self._peaks:
+                    self._peaks[-1] = max(self._peaks[-1], peak)
+                entry["peak_bytes"] = max(entry.get("peak_bytes", 0), peak)
+                entry["retained_bytes"] = entry.get("retained_bytes", 0) + current - start_memory
+            self._path.pop()
+
+    def cprofile_stats(self, limit=25):
+        """The most expensive functions by cumulative time, as dicts"""
+        if self._profile is None:
+            return []
+        stats = pstats.Stats(self._profile, stream=io.StringIO())
+        stats.sort_stats(pstats.SortKey.CUMULATIVE)
+        functions = []
+        for (filename, line, function), (_, calls, total, cumulative, _) in stats.stats.items():
+            functions.append({
+                "function": f"{filename}:{line}({function})",
+                "calls": calls,
+                "total_seconds": round(total, 6),
+                "cumulative_seconds": round(cumulative, 6),
+            })
+        functions.sort(key=lambda item: item["cumulative_seconds"], reverse=True)
+        return functions[:limit]
+
+    def report(self):
+        """Machine-readable breakdown of the run"""
+        report = {
+            "total_seconds": round(self.total_seconds or 0.0, 6),
+            "stages": {
+                path: {key: round(value, 6) if key == "seconds" else value for key, value in entry.items()}
+                for path, entry in self.stages.items()
+            },
+        }
+        if self.cprofile:
+            report["cprofile"] = self.cprofile_stats()
+        return report
+
+    def server_timing(self):
+        """Top-level stages as a Server-Timing header value (durations in ms)"""
+        metrics = [
+            f"{path};dur={entry['seconds'] * 1000:.1f}"
+            for path, entry in self.stages.items()
+            if "/" not in path
+        ]
+        metrics.append(f"total;dur={(self.total_seconds or 0.0) * 1000:.1f}")
+        return ", ".join(metrics)
+
+    def write(self, path):
+        """Save the report as JSON, plus the raw cProfile data next to it when captured"""
+        with open(path, "w", encoding="utf-8") as report_file:
+            json.dump(self.report(), report_file, indent=2)
+        if self._profile is not None:
+            self._profile.dump_stats(f"{path}.prof")
+
+
+def expire_profiles(directory, keep):
+    """Delete all but the newest keep profile reports in directory, with their cProfile data"""
+    reports = []
+    for entry in os.scandir(directory):
+        if entry.name.endswith(".json"):
+            reports.append((entry.stat().st_mtime, entry.path))
+    reports.sort(reverse=True)
+    for _, path in reports[keep:]:
+        for stale_path in (path, f"{path}.prof"):
+            try:
+                os.unlink(stale_path)
+            except FileNotFoundError:
+                pass
+    return max(len(reports) - keep, 0)
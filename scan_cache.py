@@ -0,0 +1,127 @@
+"""
+Content-addressed cache of parsed scans.
+
+Regenerating a report from the same scan with only the finding ID prefix or
+the cover fields changed used to parse and group the whole CSV again. A
+ScanCache stores the grouping of a scan, without finding IDs, under the
+sha256 of the uploaded bytes (each file's digest, in order, for a
+multi-file upload), so a repeat upload skips parsing altogether and the
+report costs only its rendering.
+
+Entries are pickles of the column map and the findings.Finding records,
+behind a header naming the format version. Loading an entry unpickles it,
+which runs whatever code the pickle names, so the cache directory must
+only be writable by the user the app runs as: anyone who can write there
+can run code in the app. The header only keeps files this code did not
+write (or wrote in an older format) from reaching pickle.load; it is not a
+signature. Bump SCAN_FORMAT_VERSION whenever grouping or the Finding record
+changes, so scans grouped by older code are not reused. Storing an entry
+evicts the least recently used ones beyond max_bytes.
+"""
+import hashlib
+import io
+import json
+import logging
+import os
+import pickle
+import tempfile
+
+from finding_cache import prune_directory
+
+logger = logging.getLogger(__name__)
+
+SCAN_FORMAT_VERSION = 1
+
+# store() keeps the cache under this size unless told otherwise
+DEFAULT_MAX_BYTES = 1024 * 1024 * 1024
+HASH_BLOCK_SIZE = 1024 * 1024
+# Every entry starts with this line; anything else is discarded without being unpickled
+ENTRY_HEADER = f"report-scan-cache {SCAN_FORMAT_VERSION}\n".encode('ascii')
+
+
+def source_digest(source):
+    """sha256 of a path's or seekable binary stream's bytes; the stream is rewound to where it was"""
+    digest = hashlib.sha256()
+    if hasattr(source, 'read'):
+        position = source.tell()
+        for block in iter(lambda: source.read(HASH_BLOCK_SIZE), b''):
+            digest.update(block)
+        source.seek(position)
+    else:
+        with open(source, 'rb') as source_file:
+            for block in iter(lambda: source_file.read(HASH_BLOCK_SIZE), b''):
+                digest.update(block)
+    return digest.hexdigest()
+
+
+class ScanCache:
+    """Parsed scans stored as <directory>/<key[:2]>/<key>.pickle"""
+
+    def __init__(self, directory, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    def key(self, sources):
+        """
+        Content address of the scans, or None when one of them cannot be
+        hashed without consuming it (a text or unseekable stream).
+        """
+        for source in sources:
+            if isinstance(source, io.TextIOBase) or (hasattr(source, 'read') and not source.seekable()):
+                return None
+        digests = [source_digest(source) for source in sources]
+        payload = json.dumps([SCAN_FORMAT_VERSION, digests])
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], f"{key}.pickle")
+
+    def load(self, key):
+        """
+        Return the cached (column_map, grouped_vulnerabilities) for key, or
+        None on a miss. Entries without this version's header are discarded
+        unread; see the module docstring for why the directory must be private.
+        """
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as cache_file:
+                if cache_file.read(len(ENTRY_HEADER)) != ENTRY_HEADER:
+                    raise ValueError("not a scan cache entry of this version")
+                column_map, grouped_vulnerabilities = pickle.load(cache_file)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Discarding unreadable scan cache entry {key}: {str(e)}")
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+            return None
+        # Mark the entry as recently used for prune()
+        os.utime(path)
+        logger.info(f"Scan cache hit: {len(grouped_vulnerabilities)} findings")
+        return column_map, grouped_vulnerabilities
+
+    def store(self, key, column_map, grouped_vulnerabilities):
+        """Save the grouping of a scan, before finding IDs are assigned, under key"""
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write to a temporary file first so concurrent readers never see a partial entry
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as cache_file:
+                cache_file.write(ENTRY_HEADER)
+                pickle.dump((column_map, grouped_vulnerabilities), cache_file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_path, path)
+        except Exception:
+            os.unlink(temp_path)
+            raise
+        self.prune()
+
+    def prune(self):
+        """Remove the least recently used entries until the cache fits in max_bytes"""
+        if self.max_bytes is None:
+            return
+        total = prune_directory(self.directory, '.pickle', self.max_bytes)
+        logger.info(f"Scan cache pruned to {total} bytes")
@@ -7,12 +7,41 @@ from docx.oxml.shared import OxmlElement, qn
 from docx.enum.table import WD_ALIGN_VERTICAL
 from docx.oxml import parse_xml
 from docx.oxml.ns import nsdecls
+from docx.table import Table
+from docx.text.paragraph import Paragraph
+from copy import deepcopy
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from lxml import etree
+import argparse
 import csv
+import gzip
+import io
 import logging
 import re
 import os
 import sys
-from datetime import datetime
+import zipfile
+from contextlib import ExitStack, contextmanager
+from functools import lru_cache
+from dataclasses import asdict, dataclass, field
+from report_logging import configure_logging, StageCounters
+from report_profiling import PROFILE_OPTIONS, ReportProfiler, parse_profile_options, stage
+from finding_cache import FindingCache
+from scan_cache import ScanCache
+from module_classifier import DEFAULT_KEYWORDS_PATH, KeywordClassifier
+from findings import Finding, RiskLevel, format_cvss_score, format_resource, parse_cvss_score, parse_port
+
+# Optional columnar readers for the "columnar" ingestion engine
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+except ImportError:
+    pa = None
+    pa_csv = None
+try:
+    import pandas as pd
+except ImportError:
+    pd = None
 required_fields = {
             'name': 'Name',
             'description': 'Description',
@@ -38,20 +67,6 @@ def validate_csv_columns(column_map, required_fields):
     
     logger.info("All required columns found in CSV")
     return True, ""
-# Set up logging
-log_directory = "logs"
-if not os.path.exists(log_directory):
-    os.makedirs(log_directory)
-
-log_filename = os.path.join(log_directory, f"document_creation_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log")
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(log_filename),
-        logging.StreamHandler(sys.stdout)
-    ]
-)
 logger = logging.getLogger(__name__)
 
 def set_table_border_color(table, border_color="9C9C9C"):
@@ -70,25 +85,64 @@ def set_table_border_color(table, border_color="9C9C9C"):
     tbl_pr.append(borders)
 
 
-def set_document_font(doc, font_name="Helvetica", font_size=11):
-    """Set the default font for the entire document."""
-    logger.info(f"Setting document font to {font_name}, size {font_size}")
+def normalize_fonts(doc, font_name="Helvetica", font_size=11, elements=None):
+    """
+    Apply a font family and size to the document in a single pass.
+
+    Without `elements` the font is set on the Normal style, which every run
+    without explicit formatting inherits. With `elements` (for example tables
+    or content appended after a cover page) only the runs inside them are
+    updated, through one lxml iteration over their w:r elements.
+    """
+    logger.info(f"Normalising fonts to {font_name}, size {font_size}")
     try:
-        style = doc.styles['Normal']
-        style.font.name = font_name
-        style.font.size = Pt(font_size)
-        
-        # Ensure the correct font is applied to tables too
-        for table in doc.tables:
-            for row in table.rows:
-                for cell in row.cells:
-                    for paragraph in cell.paragraphs:
-                        for run in paragraph.runs:
-                            run.font.name = font_name
-                            run.font.size = Pt(font_size)
-        logger.info("Document font set successfully")
+        if elements is None:
+            style = doc.styles['Normal']
+            style.font.name = font_name
+            style.font.size = Pt(font_size)
+        else:
+            # w:sz is expressed in half-points
+            half_points = str(int(Pt(font_size).pt * 2))
+            rPr_tag, rFonts_tag, sz_tag = qn('w:rPr'), qn('w:rFonts'), qn('w:sz')
+            ascii_attr, hAnsi_attr, val_attr = qn('w:ascii'), qn('w:hAnsi'), qn('w:val')
+            rStyle_tag = qn('w:rStyle')
+            # Elements that must follow w:sz inside w:rPr
+            sz_successors = {qn(f'w:{tag}') for tag in (
+                'szCs', 'highlight', 'u', 'effect', 'bdr', 'shd', 'fitText', 'vertAlign',
+                'rtl', 'cs', 'em', 'lang', 'eastAsianLayout', 'specVanish', 'oMath')}
+            # Most runs carry no properties yet; they get a copy of a prebuilt rPr
+            rPr_template = parse_xml(
+                f'<w:rPr {nsdecls("w")}><w:rFonts w:ascii="{font_name}" w:hAnsi="{font_name}"/>'
+                f'<w:sz w:val="{half_points}"/></w:rPr>'
+            )
+            # Copies of prebuilt children are much cheaper than OxmlElement, which parses a string each time
+            rFonts_template, sz_template = rPr_template
+            run_count = 0
+            for element in elements:
+                for run in element.iter(qn('w:r')):
+                    run_count += 1
+                    rPr = run.find(rPr_tag)
+                    if rPr is None:
+                        run.insert(0, deepcopy(rPr_template))
+                        continue
+                    rFonts = rPr.find(rFonts_tag)
+                    if rFonts is None:
+                        # rFonts may only be preceded by rStyle
+                        rPr.insert(1 if len(rPr) and rPr[0].tag == rStyle_tag else 0, deepcopy(rFonts_template))
+                    else:
+                        rFonts.set(ascii_attr, font_name)
+                        rFonts.set(hAnsi_attr, font_name)
+                    sz = rPr.find(sz_tag)
+                    if sz is None:
+                        if any(child.tag in sz_successors for child in rPr):
+                            rPr.get_or_add_sz().set(val_attr, half_points)
+                        else:
+                            rPr.append(deepcopy(sz_template))
+                    else:
+                        sz.set(val_attr, half_points)
+            logger.info(f"Font applied to {run_count} runs")
     except Exception as e:
-        logger.error(f"Failed to set document font: {str(e)}")
+        logger.error(f"Failed to normalise fonts: {str(e)}")
         raise
 
 def make_cell_text_bold(cell):
@@ -107,13 +161,13 @@ def make_cell_text_bold(cell):
         raise
 
 def format_affected_resources(table, affected_resources):
-    logger.info(f"Formatting affected resources table for {len(affected_resources)} resources")
+    logger.debug(f"Formatting affected resources table for {len(affected_resources)} resources")
     try:
         cell = table.cell(1, 0)
         cell.text = ""  # Clear existing content
         
-        # Sort the resources for consistent display
-        resources = sorted(affected_resources)
+        # Finding.affected_resources is already sorted
+        resources = [format_resource(resource) for resource in affected_resources]
         total = len(resources)
         
         # Clear all existing paragraphs in the cell except the first one
@@ -181,12 +235,68 @@ def format_affected_resources(table, affected_resources):
                 # Set paragraph spacing
                 paragraph.space_after = Pt(0)
                 paragraph.space_before = Pt(0)
-        logger.info("Successfully formatted affected resources")
+        logger.debug("Successfully formatted affected resources")
     except Exception as e:
         logger.error(f"Failed to format affected resources: {str(e)}")
         raise
-def create_summary_table(doc, grouped_vulnerabilities):
-    """Create a summary table of all vulnerabilities at the beginning of the document"""
+def sort_summary_findings(vulnerabilities):
+    """Order findings for the summary table: by risk factor priority, then highest CVSS first"""
+    return sorted(vulnerabilities, key=lambda finding: finding.summary_sort_key)
+
+# Risk cell colours, in the summary table and on the finding pages
+RISK_COLORS = {
+    RiskLevel.CRITICAL: "C00000",  # Red
+    RiskLevel.HIGH: "FFC000",      # Orange
+    RiskLevel.MEDIUM: "FFFF00",    # Yellow
+    RiskLevel.LOW: "92D050",       # Green
+    RiskLevel.INFORMATIONAL: "9BC2E6"  # Light blue
+}
+
+# Summary table column widths
+SUMMARY_COLUMN_WIDTHS = [Pt(30), Pt(250), Pt(80), Pt(60), Pt(80)]
+# Columns centered horizontally: #, Risk and CVSS
+SUMMARY_CENTERED_COLUMNS = (0, 2, 3)
+
+def summary_row_template(shaded, risk_fill=None):
+    """
+    Build an empty summary data row: five cells with their width, shading,
+    vertical centering and a Helvetica 10 run waiting for its text.
+
+    shaded gives every cell the light blue alternating-row fill; risk_fill
+    overrides it on the Risk cell. tcPr children follow the schema order
+    (tcW, shd, vAlign).
+    """
+    cells = []
+    for cell_idx, width in enumerate(SUMMARY_COLUMN_WIDTHS):
+        fill = risk_fill if cell_idx == 2 and risk_fill else ('DEEAF6' if shaded else None)
+        shading = f'<w:shd w:fill="{fill}" w:val="clear"/>' if fill else ''
+        alignment = '<w:pPr><w:jc w:val="center"/></w:pPr>' if cell_idx in SUMMARY_CENTERED_COLUMNS else ''
+        cells.append(
+            f'<w:tc><w:tcPr><w:tcW w:type="dxa" w:w="{width.twips}"/>{shading}<w:vAlign w:val="center"/></w:tcPr>'
+            f'<w:p>{alignment}<w:r><w:rPr><w:rFonts w:ascii="Helvetica" w:hAnsi="Helvetica"/>'
+            f'<w:sz w:val="20"/></w:rPr><w:t/></w:r></w:p></w:tc>'
+        )
+    return parse_xml(f'<w:tr {nsdecls("w")}>{"".join(cells)}</w:tr>')
+
+def set_run_text(r, text):
+    """Set the text of a run holding rPr and an empty w:t, as cell.text would"""
+    if text and text == text.strip() and not any(char in text for char in '\t\n\r'):
+        r[-1].text = text
+    else:
+        # Whitespace, tabs and line breaks need python-docx's handling
+        r.remove(r[-1])
+        rPr = r.rPr
+        r.text = text
+        if rPr is not None and r.rPr is None:
+            r.insert(0, rPr)
+
+def create_summary_table(doc, grouped_vulnerabilities, start_index=0):
+    """
+    Create a summary table of all vulnerabilities at the beginning of the document.
+
+    start_index is the position of the first row in the whole summary, for
+    tables built a slice of the findings at a time.
+    """
     logger.info("Creating vulnerability summary table")
     try:
         
@@ -240,85 +350,41 @@ def create_summary_table(doc, grouped_vulnerabilities):
         
         tblPr.append(tblBorders)
         
-        # Sort vulnerabilities by risk factor priority and CVSS score
-        risk_priority = {"critical": 1, "high": 2, "medium": 3, "low": 4, "informational": 5}
-        
-        # Helper function to safely convert CVSS to float
-        def safe_cvss_float(cvss):
-            try:
-                return -float(cvss) if cvss and cvss.strip() else 0
-            except (ValueError, TypeError):
-                return 0
-        
-        sorted_vulns = sorted(
-            grouped_vulnerabilities.values(), 
-            key=lambda x: (risk_priority.get(x["risk_factor"].lower(), 999), safe_cvss_float(x["cvs_score"]))
-        )
-        
-        # Add vulnerability data with alternating row colors
-        for i, vuln in enumerate(sorted_vulns):
-            row = table.add_row()
-            
-            # Apply alternating row colors
-            if i % 2 == 1:  # Odd rows (0-indexed, so row 1, 3, 5, etc.)
-                for cell in row.cells:
-                    tcPr = cell._tc.get_or_add_tcPr()
-                    tcShading = OxmlElement('w:shd')
-                    tcShading.set(qn('w:fill'), 'DEEAF6')  # Light blue background (#DEEAF6)
-                    tcShading.set(qn('w:val'), 'clear')
-                    tcPr.append(tcShading)
-            
-            # Fill row data
-            row.cells[0].text = str(i + 1)  # Sequential numbering
-            row.cells[1].text = vuln["name"]
-            row.cells[2].text = vuln["risk_factor"].capitalize()
-            row.cells[3].text = str(vuln["cvs_score"]) if vuln["cvs_score"] else "-"
-            row.cells[4].text = vuln["finding_id"]
-            
-            # Apply formatting to all cells
-            for cell_idx, cell in enumerate(row.cells):
-                # Set font to Helvetica and size to 10 for all ceBUlls
-                for paragraph in cell.paragraphs:
-                    for run in paragraph.runs:
-                        run.font.name = "Helvetica"
-                        run.font.size = Pt(10)
-
-                cell.vertical_alignment = WD_ALIGN_VERTICAL.CENTER
-                # Center align specific columns: #, Risk, and CVSS
-                if cell_idx in [0, 2, 3]:  # #, Risk, and CVSS columns
-                    cell.paragraphs[0].alignment = WD_ALIGN_PARAGRAPH.CENTER
-                    cell.vertical_alignment = WD_ALIGN_VERTICAL.CENTER
-            
-            # Color coding for risk cells
-            risk_colors = {
-                "critical": "C00000",  # Red
-                "high": "FFC000",      # Orange
-                "medium": "FFFF00",    # Yellow
-                "low": "92D050",       # Green
-                "informational": "9BC2E6"  # Light blue
-            }
-            
-            risk_cell = row.cells[2]
-            risk_factor = vuln["risk_factor"].lower()
-            
-            if risk_factor in risk_colors:
-                # Apply cell shading
-                tcPr = risk_cell._tc.get_or_add_tcPr()
-                tcShading = OxmlElement('w:shd')
-                tcShading.set(qn('w:fill'), risk_colors[risk_factor])
-                tcShading.set(qn('w:val'), 'clear')
-                tcPr.append(tcShading)
+        sorted_vulns = sort_summary_findings(grouped_vulnerabilities.values())
         
         # Set column widths
         table.autofit = False
         table.allow_autofit = False
-        
-        # Set column widths (adjust as needed)
-        widths = [Pt(30), Pt(250), Pt(80), Pt(60), Pt(80)]
-        for i, width in enumerate(widths):
-            for row in table.rows:
-                row.cells[i].width = width
-        
+        for gridCol, width in zip(table._tbl.tblGrid.gridCol_lst, SUMMARY_COLUMN_WIDTHS):
+            gridCol.w = width
+        for cell, width in zip(header_cells, SUMMARY_COLUMN_WIDTHS):
+            cell.width = width
+
+        # Add vulnerability data with alternating row colors, cloning prebuilt rows
+        row_templates = {}
+        tbl = table._tbl
+        for i, vuln in enumerate(sorted_vulns, start_index):
+            # Odd rows (0-indexed, so row 1, 3, 5, etc.) are shaded; the risk cell takes its risk colour
+            risk_fill = RISK_COLORS.get(vuln.risk)
+            template_key = (i % 2 == 1, risk_fill)
+            row_template = row_templates.get(template_key)
+            if row_template is None:
+                row_template = summary_row_template(*template_key)
+                row_templates[template_key] = row_template
+            tr = deepcopy(row_template)
+
+            # Fill row data
+            values = (
+                str(i + 1),  # Sequential numbering
+                vuln.name,
+                vuln.risk.label,
+                format_cvss_score(vuln.cvss_score) or "-",
+                vuln.finding_id,
+            )
+            for r, value in zip(tr.iter(qn('w:r')), values):
+                set_run_text(r, value)
+            tbl.append(tr)
+
         # Add space after the table
         doc.add_paragraph()
         
@@ -329,20 +395,17 @@ def create_summary_table(doc, grouped_vulnerabilities):
         # Continue execution even if summary table fails
         return False
 
-def format_cvss_score(score):
-    """Format CVSS score to always show at least one decimal place"""
-    try:
-        # Try to convert to float
-        float_score = float(score)
-        # Format with one decimal place
-        return f"{float_score:.1f}"
-    except (ValueError, TypeError):
-        # If conversion fails, return the original score
-        return score
-       
 def create_table(doc, heading):
-    logger.info(f"Creating table with heading: {heading}")
+    """
+    Create the heading and the eight detail tables for one finding.
+
+    Returns the created tables in document order so callers can fill them
+    directly instead of looking them up again through doc.tables, which
+    python-docx rebuilds by walking the whole body on every access.
+    """
+    logger.debug(f"Creating table with heading: {heading}")
     try:
+        tables = []
         paragraph = doc.add_paragraph()
         run = paragraph.add_run(heading)
         run.bold = True
@@ -355,6 +418,7 @@ def create_table(doc, heading):
 
         # Row 0-1
         table = doc.add_table(rows=2, cols=2)
+        tables.append(table)
         table.style = 'Table Grid'
         table.autofit = False
         table.allow_autofit = False
@@ -389,6 +453,7 @@ def create_table(doc, heading):
 
         # Row 2-3
         table = doc.add_table(rows=2, cols=3)
+        tables.append(table)
         table.style = 'Table Grid'
         table.autofit = False
         table.allow_autofit = False
@@ -425,6 +490,7 @@ def create_table(doc, heading):
 
         # Row 4-5
         table = doc.add_table(rows=2, cols=3)
+        tables.append(table)
         table.style = 'Table Grid'
         table.autofit = False
         set_table_border_color(table)
@@ -463,6 +529,7 @@ def create_table(doc, heading):
 
         # Row 6-7
         table = doc.add_table(rows=2, cols=1)
+        tables.append(table)
         table.style = 'Table Grid'
         table.autofit = False
         table.allow_autofit = False
@@ -491,6 +558,7 @@ def create_table(doc, heading):
 
         # Row 8
         table = doc.add_table(rows=1, cols=2)
+        tables.append(table)
         table.style = 'Table Grid'
         table.autofit = False
         table.allow_autofit = False
@@ -515,6 +583,7 @@ def create_table(doc, heading):
 
         # Row 9-10
         table = doc.add_table(rows=2, cols=1)
+        tables.append(table)
         table.style = 'Table Grid'
         table.autofit = False
         table.allow_autofit = False
@@ -542,6 +611,7 @@ def create_table(doc, heading):
 
         # Row 11-12
         table = doc.add_table(rows=2, cols=3)
+        tables.append(table)
         table.style = 'Table Grid'
         table.autofit = False
         table.allow_autofit = False
@@ -578,6 +648,7 @@ def create_table(doc, heading):
 
         # Row 13-14
         table = doc.add_table(rows=2, cols=1)
+        tables.append(table)
         table.style = 'Table Grid'
         table.autofit = False
         table.allow_autofit = False
@@ -604,56 +675,113 @@ def create_table(doc, heading):
         tcShading.set(qn('w:themeTint'), '40')
         tcPr.append(tcShading)
         
-        logger.info(f"Table created successfully for heading: {heading}")
-        return True
+        logger.debug(f"Table created successfully for heading: {heading}")
+        return tables
     except Exception as e:
         logger.error(f"Failed to create table for {heading}: {str(e)}")
         raise
 
-KEYWORDS = {
-    'Apache': 'Apache',
-    'Window': 'Windows',
-    'SSH': 'SSH',
-    'Oracle': 'Oracle',
-    'DNS': 'DNS',
-}
+# Heading paragraph and detail tables of one finding, built once by
+# get_finding_block_template and deep-copied for every vulnerability
+_finding_block_template = None
+
+def get_finding_block_template():
+    """Build the styled finding block once in a scratch document and cache its XML"""
+    global _finding_block_template
+    if _finding_block_template is None:
+        logger.info("Building finding block template")
+        scratch_doc = Document()
+        create_table(scratch_doc, "")
+        body = scratch_doc.element.body
+        elements = [element for element in body if element.tag != qn('w:sectPr')]
+        _finding_block_template = (elements[0], elements[1:])
+    return _finding_block_template
+
+def append_body_element(doc, element):
+    """Append an element to the document body, keeping the final sectPr last"""
+    body = doc.element.body
+    sectPr = body.sectPr
+    if sectPr is not None:
+        sectPr.addprevious(element)
+    else:
+        body.append(element)
+
+def clone_finding_block(doc, heading):
+    """
+    Equivalent of create_table that deep-copies the prebuilt finding block
+    instead of building the tables through the python-docx API.
+
+    Returns the eight tables in document order, like create_table.
+    """
+    logger.debug(f"Cloning finding block for heading: {heading}")
+    try:
+        heading_template, table_templates = get_finding_block_template()
+
+        heading_element = deepcopy(heading_template)
+        append_body_element(doc, heading_element)
+        Paragraph(heading_element, doc._body).runs[0].text = heading
+
+        tables = []
+        for table_template in table_templates:
+            table_element = deepcopy(table_template)
+            append_body_element(doc, table_element)
+            tables.append(Table(table_element, doc._body))
+        return tables
+    except Exception as e:
+        logger.error(f"Failed to clone finding block for {heading}: {str(e)}")
+        raise
+
+# Keyword -> module name mapping, in priority order; see module_keywords.json
+KEYWORDS = KeywordClassifier.from_file(os.environ.get('REPORT_MODULE_KEYWORDS', DEFAULT_KEYWORDS_PATH))
+
 def determine_risk_factor(cvss_score):
-    """Determine risk factor based on CVSS score ranges"""
+    """Determine the RiskLevel based on CVSS score ranges"""
     try:
         score = float(cvss_score)
         
         if score >= 9.0 and score <= 10.0:
-            return "critical"
+            return RiskLevel.CRITICAL
         elif score >= 7.0 and score < 9.0:
-            return "high"
+            return RiskLevel.HIGH
         elif score >= 4.0 and score < 7.0:
-            return "medium"
+            return RiskLevel.MEDIUM
         elif score > 0.0 and score < 4.0:
-            return "low"
+            return RiskLevel.LOW
         elif score == 0.0:
-            return "informational"
+            return RiskLevel.INFORMATIONAL
         else:
             logger.warning(f"CVSS score {score} is outside expected range (0-10)")
-            return "informational"  # Default to lowest risk level
+            return RiskLevel.INFORMATIONAL  # Default to lowest risk level
     except (ValueError, TypeError):
         logger.error(f"Invalid CVSS score: {cvss_score}")
-        return "informational"  # Default to lowest risk level
+        return RiskLevel.INFORMATIONAL  # Default to lowest risk level
 
 def get_module_name(name, predefined_keywords):
-    """Helper function to match module names from predefined keywords"""
-    logger.debug(f"Finding module name for: {name}")
+    """
+    Helper function to match module names from predefined keywords.
+
+    predefined_keywords is a KeywordClassifier, or a keyword -> module mapping
+    in priority order. Returns the module of the highest-priority keyword
+    found in the name, or "" when none matches.
+    """
     try:
-        # Iterate through the predefined keywords and check if they match the name
-        for keyword in predefined_keywords:
-            if keyword.lower() in name.lower():
-                logger.debug(f"Found matching module name: {keyword}")
-                return keyword
-        logger.debug("No matching module name found")
-        return ""  # Return empty string if no match is found
+        if not isinstance(predefined_keywords, KeywordClassifier):
+            predefined_keywords = KeywordClassifier(predefined_keywords)
+        module_name = predefined_keywords.classify(name)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Module name for {name}: {module_name or 'no match'}")
+        return module_name
     except Exception as e:
         logger.error(f"Error in get_module_name: {str(e)}")
         return ""
 
+# Patterns like "X.Y" (version numbers, ASP.NET) and sentence breaks (period, space, capital letter)
+SPECIAL_PATTERN_RE = re.compile(r'\b\w+\.\w+\b')
+SENTENCE_BREAK_RE = re.compile(r'\.(?=\s+[A-Z])')
+# Special patterns are only appended while the description stays under this length
+DESCRIPTION_LENGTH_LIMIT = 400
+
+@lru_cache(maxsize=4096)
 def extract_description(text):
     """
     Extract a meaningful description from text with better handling of:
@@ -662,8 +790,11 @@ def extract_description(text):
     3. Periods followed by alphanumeric characters
     
     The function aims to preserve technical information while providing a concise description.
+    Results are memoised, as Nessus repeats the same description for every host.
     """
-    logger.debug(f"Extracting description from: {text}")
+    debug = logger.isEnabledFor(logging.DEBUG)
+    if debug:
+        logger.debug(f"Extracting description from: {text}")
     
     # Handle empty or None text
     if not text:
@@ -675,17 +806,10 @@ def extract_description(text):
         logger.debug("Text is short, returning full text")
         return text
     
-    # Use regex to identify special patterns that should be preserved
-    
-    
-    # Find all occurrences of patterns like "X.Y" where X and Y can be alphanumeric
-    # This will match version numbers, product names with periods, etc.
-    special_patterns = re.findall(r'\b\w+\.\w+\b', text)
-    logger.debug(f"Found special patterns to preserve: {special_patterns}")
-    
     # Split by sentences (periods followed by space and capital letter)
-    # This is a more reliable way to identify actual sentence boundaries
-    sentences = re.split(r'\.(?=\s+[A-Z])', text)
+    # This is a more reliable way to identify actual sentence boundaries.
+    # Only the first two sentences are used, so stop splitting after them.
+    sentences = SENTENCE_BREAK_RE.split(text, maxsplit=2)
     
     # If there's only one sentence or no clear sentence breaks, return the whole text
     if len(sentences) <= 1:
@@ -695,95 +819,56 @@ def extract_description(text):
     # Take the first two sentences as the base description
     result = sentences[0] + '.'
     
-    # Check if we need to add more context
-    if len(sentences) > 1:
-        # Add the second sentence if it's not too long
-        if len(sentences[1]) < 150:
-            result += sentences[1] + '.'
+    # Add the second sentence if it's not too long
+    if len(sentences[1]) < 150:
+        result += sentences[1] + '.'
     
-    # Check if any special patterns (like version numbers) were cut off
-    for pattern in special_patterns:
-        if pattern not in result and len(result) + len(pattern) + 20 < 400:  # Avoid making it too long
+    # Check if any special patterns (like version numbers) were cut off.
+    # The shortest pattern ("a.b") needs 23 characters of room, so once the
+    # description is that close to the limit nothing more can be added; the
+    # length test also runs before the substring test, which keeps every
+    # search within a bounded string.
+    seen_patterns = set()
+    for match in SPECIAL_PATTERN_RE.finditer(text):
+        if len(result) + 23 >= DESCRIPTION_LENGTH_LIMIT:
+            break
+        pattern = match.group()
+        if pattern in seen_patterns:
+            continue
+        seen_patterns.add(pattern)
+        if len(result) + len(pattern) + 20 < DESCRIPTION_LENGTH_LIMIT and pattern not in result:  # Avoid making it too long
             # Add a note about the version/pattern if it was important
             result += f" Relevant: {pattern}."
     
-    logger.debug(f"Extracted description: {result}")
+    if debug:
+        logger.debug(f"Extracted description: {result}")
     return result
-def reset_document_fonts(doc, font_name="Helvetica", font_size=10.5):
-    """Reset all fonts in the document to ensure consistency"""
-    logger.info(f"Resetting document fonts to {font_name}")
-    
-    # Set default style
-    style = doc.styles['Normal']
-    style.font.name = font_name
-    style.font.size = Pt(font_size)
-    
-    # Go through all paragraphs in the document
-    for paragraph in doc.paragraphs:
-        for run in paragraph.runs:
-            run.font.name = font_name
-            run.font.size = Pt(font_size)
-    
-    # Go through all tables in the document
-    for table in doc.tables:
-        for row in table.rows:
-            for cell in row.cells:
-                for paragraph in cell.paragraphs:
-                    for run in paragraph.runs:
-                        run.font.name = font_name
-                        run.font.size = Pt(font_size)
-    
-    logger.info("Document fonts reset successfully")
 
-def append_data(doc, csv_row_no, data_to_append, predefined_keywords):
-    logger.info(f"Appending data for vulnerability {data_to_append['finding_id']}")
+def append_data(finding_tables, data_to_append, predefined_keywords):
+    """Fill the tables returned by create_table with one finding's data"""
+    logger.debug(f"Appending data for vulnerability {data_to_append.finding_id}")
     try:
-        # Get total number of tables in document
-        total_tables = len(doc.tables)
-        logger.debug(f"Total tables in document: {total_tables}")
-        
-        # Calculate starting table index for this vulnerability
-        # With summary table at the beginning, we need to adjust the index
-        # Each vulnerability has 8 tables, and we need to account for the summary table
-        table_start_index = 1 + (csv_row_no * 8)  # 1 for summary table
-        
-        # Check if we have enough tables
-        if table_start_index + 7 >= total_tables:
-            logger.error(f"Not enough tables in document. Expected index {table_start_index}, total tables: {total_tables}")
-            raise IndexError(f"Table index out of range: {table_start_index} >= {total_tables}")
+        # Each vulnerability has 8 tables, created in order by create_table
+        if len(finding_tables) != 8:
+            logger.error(f"Expected 8 tables for the finding, got {len(finding_tables)}")
+            raise IndexError(f"Expected 8 finding tables, got {len(finding_tables)}")
         
-        def set_cell_text(cell, text_content):
-            cell.text = text_content
-            # Apply font to all runs in all paragraphs of the cell
-            for paragraph in cell.paragraphs:
-                for run in paragraph.runs:
-                    run.font.name = "Helvetica"
-                    run.font.size = Pt(10.5)
-
         # table - 0 (Finding ID and Description)
-        finding_id_cell = doc.tables[table_start_index].rows[1].cells[0]
-        finding_id_cell.text = data_to_append['finding_id']
+        finding_id_cell = finding_tables[0].rows[1].cells[0]
+        finding_id_cell.text = data_to_append.finding_id
         finding_id_cell.vertical_alignment = WD_ALIGN_VERTICAL.CENTER
         
         # Prepend the required text to the description
-        description = f"During Vulnerability assessment and Penetration testing we observed that, {data_to_append['description']}"
-        doc.tables[table_start_index].rows[1].cells[1].text = description
+        description = f"During Vulnerability assessment and Penetration testing we observed that, {data_to_append.description}"
+        finding_tables[0].rows[1].cells[1].text = description
 
         # table - 1 (CVSS Score and Risk Factor)
-        doc.tables[table_start_index + 1].rows[1].cells[0].text = format_cvss_score(data_to_append['cvs_score'])
-        
-        cell = doc.tables[table_start_index + 1].rows[1].cells[1]
-        cell.text = data_to_append['risk_factor'].capitalize()
-
-        risk_colors = {
-            "critical": "C00000",
-            "high": "FFC000",
-            "medium": "FFFF00",
-            "low": "92D050",
-            "informational": "9BC2E6",
-        }
+        finding_tables[1].rows[1].cells[0].text = format_cvss_score(data_to_append.cvss_score)
         
-        risk_color = risk_colors.get(data_to_append['risk_factor'].lower())
+        cell = finding_tables[1].rows[1].cells[1]
+        cell.text = data_to_append.risk.label
+
+        risk_color = RISK_COLORS.get(data_to_append.risk)
         if risk_color:
             tcPr = cell._tc.get_or_add_tcPr()
             tcShading = OxmlElement('w:shd')
@@ -791,40 +876,36 @@ def append_data(doc, csv_row_no, data_to_append, predefined_keywords):
             tcPr.append(tcShading)
 
         # remote_exploitability
-        doc.tables[table_start_index + 1].rows[1].cells[2].text = "Yes"
+        finding_tables[1].rows[1].cells[2].text = "Yes"
 
         # table - 2 (Affected Resource & Module Name)
-        table = doc.tables[table_start_index + 2]
-        
-        # Get affected resources as a list
-        affected_resources = data_to_append["affected_resource"].split("\n")
+        table = finding_tables[2]
         
-        # Use new formatting function
-        format_affected_resources(table, affected_resources)
+        format_affected_resources(table, data_to_append.affected_resources)
 
         # Module Name - dynamically matched from predefined keywords
         module_name_cell = table.cell(1, 2)
-        module_name_cell.text = get_module_name(data_to_append['name'], predefined_keywords)
+        module_name_cell.text = get_module_name(data_to_append.name, predefined_keywords)
         module_name_cell.vertical_alignment = WD_ALIGN_VERTICAL.CENTER
 
         # table - 3 (Security Risk)
-        doc.tables[table_start_index + 3].rows[1].cells[0].text = ""
+        finding_tables[3].rows[1].cells[0].text = ""
 
         # table - 4 (Business Impact)
-        doc.tables[table_start_index + 4].rows[0].cells[1].text = ""
+        finding_tables[4].rows[0].cells[1].text = ""
 
         # table - 5 (Workaround / Mitigation)
-        solution = f"It is recommended: \n-To {data_to_append['mitigation']}"
-        doc.tables[table_start_index + 5].rows[1].cells[0].text = solution
+        solution = f"It is recommended: \n-To {data_to_append.mitigation}"
+        finding_tables[5].rows[1].cells[0].text = solution
 
         # table - 6 (Tool Used & References)
-        doc.tables[table_start_index + 6].rows[1].cells[0].text = "Nessus"
-        tool_cell = doc.tables[table_start_index + 6].rows[1].cells[0]
+        finding_tables[6].rows[1].cells[0].text = "Nessus"
+        tool_cell = finding_tables[6].rows[1].cells[0]
         tool_cell.vertical_alignment = WD_ALIGN_VERTICAL.CENTER
-        doc.tables[table_start_index + 6].rows[1].cells[2].text = data_to_append['references']
+        finding_tables[6].rows[1].cells[2].text = data_to_append.references
 
         # table - 7 (Proof of Concept)
-        proof_of_concept_cell = doc.tables[table_start_index + 7].rows[1].cells[0]
+        proof_of_concept_cell = finding_tables[7].rows[1].cells[0]
         existing_text = proof_of_concept_cell.text  # Preserve existing content
         proof_of_concept_cell.text = ""  # Clear the cell to format text properly
 
@@ -834,177 +915,704 @@ def append_data(doc, csv_row_no, data_to_append, predefined_keywords):
         run.bold = True
         proof_paragraph.add_run(" - Shows " + existing_text)
         
-        logger.info(f"Successfully appended data for vulnerability {data_to_append['finding_id']}")
+        logger.debug(f"Successfully appended data for vulnerability {data_to_append.finding_id}")
         return True
     except Exception as e:
-        logger.error(f"Failed to append data for {data_to_append['finding_id']}: {str(e)}")
+        logger.error(f"Failed to append data for {data_to_append.finding_id}: {str(e)}")
         raise
 
 
-def main(finding_id_prefix=None):
-    logger.info("Starting document creation process")
-    
-    try:
-        # Create a new document
-        doc = Document()
-        
-        logger.info("Created new document")
-        
-        set_document_font(doc, "Helvetica", 10.5)
-        grouped_vulnerabilities = {}  
+INGESTION_ENGINES = ("csv", "columnar")
 
-        # Add a title
-        
-        
-        csv_file_path = 'dataset.csv'
-        logger.info(f"Using CSV file: {csv_file_path}")
+def build_column_map(header):
+    """Create a mapping of column names to indices"""
+    column_map = {}
+    for i, column_name in enumerate(header):
+        column_map[column_name] = i
+    return column_map
 
-       
-        if not os.path.exists(csv_file_path):
-            logger.error(f"CSV file not found: {csv_file_path}")
-            raise FileNotFoundError(f"CSV file not found: {csv_file_path}")
+def affected_resource(host, port, seen_resources):
+    """
+    (host, port) pair for one CSV row, port 0 meaning the host alone.
 
-        
-        finding_id_counter = 1
+    seen_resources maps every pair already read from the scan to itself, so
+    a host:port reported under many plugins is stored once.
+    """
+    resource = (sys.intern(host.strip()), parse_port(port))
+    return seen_resources.setdefault(resource, resource)
+
+def new_vulnerability(name, full_description, cvs_score, mitigation, references):
+    """Build the grouped Finding for the first row seen of a vulnerability"""
+    return Finding(
+        name=name,
+        description=extract_description(full_description),
+        cvss_score=parse_cvss_score(cvs_score),
+        # Calculate risk factor based on CVSS score instead of getting from CSV
+        risk=determine_risk_factor(cvs_score),
+        mitigation=mitigation,
+        # Handle possible empty references
+        references=references.split('\n')[0] if references else "",
+    )
+
+def set_affected_resources(grouped_vulnerabilities, affected_resources):
+    """Store each finding's affected resources as a sorted tuple once every row has been read"""
+    for vulnerability_name, vulnerability in grouped_vulnerabilities.items():
+        # Drop each set as soon as it is converted, so they are not all held alongside the tuples
+        vulnerability.affected_resources = tuple(sorted(affected_resources.pop(vulnerability_name)))
+    return grouped_vulnerabilities
+
+def group_vulnerabilities(csv_reader, column_map):
+    """
+    Stream CSV rows and group them by vulnerability name.
+
+    Only the first row of a plugin has its description, score, solution and
+    references extracted; later rows for the same plugin just contribute an
+    affected host. Hosts and (host, port) pairs are shared, so a host that
+    shows up under many plugins is stored once, and rows are never held
+    in memory, which keeps peak usage tied to the number of unique findings
+    and hosts rather than to the row count.
+    """
+    name_idx = column_map[required_fields['name']]
+    host_idx = column_map[required_fields['host']]
+    port_idx = column_map[required_fields['port']]
+    description_idx = column_map[required_fields['description']]
+    cvs_score_idx = column_map[required_fields['cvs_score']]
+    mitigation_idx = column_map[required_fields['mitigation']]
+    references_idx = column_map[required_fields['references']]
+
+    grouped_vulnerabilities = {}
+    affected_resources = {}
+    seen_resources = {}
+    counters = StageCounters(logger, "CSV ingestion")
+    row_count = 0
+    for csv_row_data in csv_reader:
+        row_count += 1
+        counters.add("rows")
 
         try:
-            with open(csv_file_path, 'r', encoding='utf-8', errors='ignore') as csv_file:
-                logger.info("Successfully opened CSV file")
-                
-                
-                try:
-                    csv_reader = csv.reader(csv_file)
-                    
-                    # Read the header row to determine column indices
-                    header = next(csv_reader)
-                    logger.info(f"CSV header read successfully with {len(header)} columns")
-                    
-                    # Create a mapping of column names to indices
-                    column_map = {}
-                    for i, column_name in enumerate(header):
-                        column_map[column_name] = i
-                    
-                    # Validate CSV columns
-                    valid, error_message = validate_csv_columns(column_map, required_fields)
-                    if not valid:
-                        logger.error(f"CSV validation failed: {error_message}")
-                        logger.info(f"Available columns: {', '.join(column_map.keys())}")
-                        raise ValueError(error_message)
-                    
-                    # Process each row in the CSV
-                    row_count = 0
-                    for csv_row_data in csv_reader:
-                        row_count += 1
-                        logger.info(f"Processing row {row_count}")
-                        
-                        try:
-                            # Extract data using column names instead of hardcoded indices
-                            vulnerability_name = csv_row_data[column_map[required_fields['name']]]
-                            host = csv_row_data[column_map[required_fields['host']]]
-                            port = csv_row_data[column_map[required_fields['port']]]
-
-                            # Check if port is 0 and format accordingly
-                            if port == "0":
-                                affected_host = host  # Use only the host when port is 0
-                            else:
-                                affected_host = f"{host}:{port}"  # Use host:port format for non-zero ports
-                                                    
-                            # Get other required fields
-                            full_description = csv_row_data[column_map[required_fields['description']]]
-                            description = extract_description(full_description)
-
-                            cvs_score = csv_row_data[column_map[required_fields['cvs_score']]]
-
-                            # Calculate risk factor based on CVSS score instead of getting from CSV
-                            risk_factor = determine_risk_factor(cvs_score)
-                            mitigation = csv_row_data[column_map[required_fields['mitigation']]]
-                            
-                            # Handle possible empty references
-                            references_idx = column_map[required_fields['references']]
-                            references = csv_row_data[references_idx].split('\n')[0] if csv_row_data[references_idx] else ""
-                        
-                            if vulnerability_name in grouped_vulnerabilities:
-                                grouped_vulnerabilities[vulnerability_name]["affected_resource"].add(affected_host)
-                            else:
-                                # Assign a new finding ID and store all required details
-                                grouped_vulnerabilities[vulnerability_name] = {
-                                    "name": vulnerability_name,
-                                    "finding_id": f"{finding_id_prefix}-{finding_id_counter:02d}",
-                                    "description": description,
-                                    "cvs_score": format_cvss_score(cvs_score),
-                                    "risk_factor": risk_factor,
-                                    "remote_exploitability": "Yes",
-                                    "affected_resource": {affected_host},
-                                    "mitigation": mitigation,
-                                    "references": references,
-                                }
-                                finding_id_counter += 1  # Increment counter
-                            
-                            logger.info(f"Successfully processed vulnerability: {vulnerability_name}")
-                        
-                        except IndexError as e:
-                            logger.error(f"Invalid data in row {row_count}: {str(e)}")
-                            logger.warning(f"Skipping row {row_count} due to missing or invalid data")
-                            continue
-                        except Exception as e:
-                            logger.error(f"Error processing row {row_count}: {str(e)}")
-                            logger.warning(f"Skipping row {row_count} due to processing error")
-                            continue
-                
-                except csv.Error as e:
-                    logger.error(f"CSV parsing error: {str(e)}")
-                    raise
-        
-        except FileNotFoundError:
-            logger.error(f"CSV file not found: {csv_file_path}")
-            raise
-        except PermissionError:
-            logger.error(f"Permission denied when accessing CSV file: {csv_file_path}")
-            raise
+            vulnerability_name = csv_row_data[name_idx]
+            affected_host = affected_resource(csv_row_data[host_idx], csv_row_data[port_idx], seen_resources)
+
+            resources = affected_resources.get(vulnerability_name)
+            if resources is not None:
+                resources.add(affected_host)
+            else:
+                grouped_vulnerabilities[vulnerability_name] = new_vulnerability(
+                    vulnerability_name,
+                    csv_row_data[description_idx],
+                    csv_row_data[cvs_score_idx],
+                    csv_row_data[mitigation_idx],
+                    csv_row_data[references_idx],
+                )
+                affected_resources[vulnerability_name] = {affected_host}
+                counters.add("findings")
+
+        except IndexError as e:
+            counters.add("skipped")
+            logger.error(f"Invalid data in row {row_count}: {str(e)}")
+            logger.warning(f"Skipping row {row_count} due to missing or invalid data")
+            continue
         except Exception as e:
-            logger.error(f"Unexpected error when reading CSV file: {str(e)}")
-            raise
+            counters.add("skipped")
+            logger.error(f"Error processing row {row_count}: {str(e)}")
+            logger.warning(f"Skipping row {row_count} due to processing error")
+            continue
 
-        # Check if we have any vulnerabilities to process
-        if not grouped_vulnerabilities:
-            logger.warning("No valid vulnerabilities found in the CSV file")
-            raise ValueError("No valid vulnerabilities found in the CSV file")
+    counters.log()
+    return set_affected_resources(grouped_vulnerabilities, affected_resources)
 
-        logger.info(f"Found {len(grouped_vulnerabilities)} unique vulnerabilities")
-        create_summary_table(doc, grouped_vulnerabilities)
+def read_csv_columns(csv_file_path):
+    """
+    Read the required columns of the CSV in bulk, as one list per column.
 
-# Add a page break after the summary table
-        doc.add_section(WD_SECTION.NEW_PAGE)
-        # Create tables for each vulnerability
-        for index, (vulnerability_name, data_to_append) in enumerate(grouped_vulnerabilities.items()):
-            logger.info(f"Creating table for vulnerability {index + 1}: {vulnerability_name}")
-            
-            # Fix: Strip spaces before joining affected resources
-            data_to_append["affected_resource"] = "\n".join(res.strip() for res in sorted(data_to_append["affected_resource"]))
+    Uses pyarrow when it is installed and pandas otherwise. Returns None when
+    neither is available.
+    """
+    columns = list(required_fields.values())
+    if pa_csv is not None:
+        table = pa_csv.read_csv(
+            csv_file_path,
+            parse_options=pa_csv.ParseOptions(
+                newlines_in_values=True,
+                invalid_row_handler=lambda row: 'skip',
+            ),
+            convert_options=pa_csv.ConvertOptions(
+                include_columns=columns,
+                column_types={column: pa.string() for column in columns},
+                strings_can_be_null=False,
+                quoted_strings_can_be_null=False,
+            ),
+        )
+        return {column: table.column(column).to_pylist() for column in columns}
+    if pd is not None:
+        frame = pd.read_csv(
+            csv_file_path,
+            usecols=columns,
+            dtype=str,
+            keep_default_na=False,
+            encoding='utf-8',
+            encoding_errors='ignore',
+            on_bad_lines='skip',
+        ).fillna("")
+        return {column: frame[column].tolist() for column in columns}
+    return None
+
+def group_vulnerabilities_columnar(csv_file_path):
+    """
+    Columnar counterpart of group_vulnerabilities.
 
-            # Create the table
-            numbered_finding_name = f"{index + 1}. {vulnerability_name}"
-            create_table(doc, numbered_finding_name)
-        
-            # Add new page except for the last vulnerability
-            if index < len(grouped_vulnerabilities) - 1:
-                doc.add_section(WD_SECTION.NEW_PAGE)
-                logger.info("Added new page for next vulnerability")
-            
-            append_data(doc, index, data_to_append, KEYWORDS)
+    The CSV is read in bulk through read_csv_columns and grouped by Name in a
+    single pass over the columns; description, risk and CVSS are computed
+    once per unique finding. Returns None when no columnar reader is installed
+    or the file cannot be read that way, so the caller can fall back to the
+    csv module path, which yields the same grouping.
+    """
+    try:
+        columns = read_csv_columns(csv_file_path)
+    except Exception as e:
+        logger.warning(f"Columnar CSV read failed, falling back to the csv module: {str(e)}")
+        return None
+    if columns is None:
+        logger.info("Neither pyarrow nor pandas is installed, using the csv module")
+        return None
+
+    names = columns[required_fields['name']]
+    hosts = columns[required_fields['host']]
+    ports = columns[required_fields['port']]
+    descriptions = columns[required_fields['description']]
+    cvs_scores = columns[required_fields['cvs_score']]
+    mitigations = columns[required_fields['mitigation']]
+    references = columns[required_fields['references']]
+    logger.info(f"Read {len(names)} rows in bulk")
+
+    grouped_vulnerabilities = {}
+    affected_resources = {}
+    seen_resources = {}
+    for row_index, (vulnerability_name, host, port) in enumerate(zip(names, hosts, ports)):
+        affected_host = affected_resource(host, port, seen_resources)
+        resources = affected_resources.get(vulnerability_name)
+        if resources is not None:
+            resources.add(affected_host)
+        else:
+            grouped_vulnerabilities[vulnerability_name] = new_vulnerability(
+                vulnerability_name,
+                descriptions[row_index],
+                cvs_scores[row_index],
+                mitigations[row_index],
+                references[row_index],
+            )
+            affected_resources[vulnerability_name] = {affected_host}
+    return set_affected_resources(grouped_vulnerabilities, affected_resources)
+
+def assign_finding_ids(grouped_vulnerabilities, finding_id_prefix):
+    """Number the grouped vulnerabilities in the order they were first seen"""
+    for finding_id_counter, vulnerability in enumerate(grouped_vulnerabilities.values(), start=1):
+        vulnerability.finding_id = f"{finding_id_prefix}-{finding_id_counter:02d}"
+    return grouped_vulnerabilities
+
+GZIP_MAGIC = b'\x1f\x8b'
+
+def is_gzip(csv_source):
+    """
+    Whether a path or binary stream holds gzip data. Streams are checked
+    with peek, or read and rewound when seekable, so nothing is consumed;
+    other streams count as uncompressed.
+    """
+    if not hasattr(csv_source, 'read'):
+        with open(csv_source, 'rb') as binary_file:
+            return binary_file.read(2) == GZIP_MAGIC
+    if hasattr(csv_source, 'peek'):
+        return csv_source.peek(2)[:2] == GZIP_MAGIC
+    if not csv_source.seekable():
+        return False
+    position = csv_source.tell()
+    try:
+        return csv_source.read(2) == GZIP_MAGIC
+    finally:
+        csv_source.seek(position)
+
+@contextmanager
+def open_csv_source(csv_source):
+    """Open a CSV path, or wrap a binary stream, as a text file; gzipped CSVs are decompressed as they are read"""
+    if isinstance(csv_source, io.TextIOBase):
+        yield csv_source
+    elif hasattr(csv_source, 'read'):
+        binary_source = gzip.GzipFile(fileobj=csv_source, mode='rb') if is_gzip(csv_source) else csv_source
+        csv_file = io.TextIOWrapper(binary_source, encoding='utf-8', errors='ignore', newline='')
+        try:
+            yield csv_file
+        finally:
+            # Leave the caller's stream open
+            csv_file.detach()
+    elif is_gzip(csv_source):
+        with gzip.open(csv_source, 'rt', encoding='utf-8', errors='ignore') as csv_file:
+            yield csv_file
+    else:
+        with open(csv_source, 'r', encoding='utf-8', errors='ignore') as csv_file:
+            yield csv_file
+
+@dataclass
+class ParsedScan:
+    """
+    Result of a single pass over a Nessus CSV.
+
+    Carries the header's column map, the validation outcome and, when the
+    header is valid, the grouped Findings keyed by name (without finding
+    IDs), so the same pass serves both validation and report generation.
+    """
+    column_map: dict
+    valid: bool
+    error_message: str = ""
+    grouped_vulnerabilities: dict = field(default_factory=dict)
+
+def parse_scan(csv_source, engine="csv"):
+    """
+    Read the header, validate it and group the rows in one pass.
+
+    csv_source is a file path or an open text/binary stream, plain or
+    gzipped. A header that fails validation returns an invalid ParsedScan
+    without reading any rows.
+
+    engine is "csv" to stream rows through the csv module or "columnar" to
+    read the file in bulk with pyarrow/pandas when one of them is installed.
+    The columnar engine is faster on large exports but holds the required
+    columns in memory, where the csv engine keeps memory flat.
+    """
+    is_stream = hasattr(csv_source, 'read')
+    csv_file_path = "<stream>" if is_stream else csv_source
+    logger.info(f"Using CSV file: {csv_file_path} ({engine} engine)")
+    if engine not in INGESTION_ENGINES:
+        raise ValueError(f"Unknown ingestion engine: {engine}")
+
+    if not is_stream and not os.path.exists(csv_file_path):
+        logger.error(f"CSV file not found: {csv_file_path}")
+        raise FileNotFoundError(f"CSV file not found: {csv_file_path}")
+
+    try:
+        with open_csv_source(csv_source) as csv_file:
+            logger.info("Successfully opened CSV file")
+
+            try:
+                csv_reader = csv.reader(csv_file)
+
+                # Read the header row to determine column indices
+                header = next(csv_reader, [])
+                logger.info(f"CSV header read successfully with {len(header)} columns")
+                column_map = build_column_map(header)
+
+                # Validate CSV columns
+                valid, error_message = validate_csv_columns(column_map, required_fields)
+                if not valid:
+                    logger.error(f"CSV validation failed: {error_message}")
+                    logger.info(f"Available columns: {', '.join(column_map.keys())}")
+                    return ParsedScan(column_map, False, error_message)
+
+                grouped_vulnerabilities = None
+                # The bulk readers work on plain CSV paths; streams and gzipped files always use the csv module
+                if engine == "columnar" and not is_stream and not is_gzip(csv_file_path):
+                    grouped_vulnerabilities = group_vulnerabilities_columnar(csv_file_path)
+                if grouped_vulnerabilities is None:
+                    grouped_vulnerabilities = group_vulnerabilities(csv_reader, column_map)
+
+            except csv.Error as e:
+                logger.error(f"CSV parsing error: {str(e)}")
+                raise
+
+    except FileNotFoundError:
+        logger.error(f"CSV file not found: {csv_file_path}")
+        raise
+    except PermissionError:
+        logger.error(f"Permission denied when accessing CSV file: {csv_file_path}")
+        raise
+    except Exception as e:
+        logger.error(f"Unexpected error when reading CSV file: {str(e)}")
+        raise
+
+    return ParsedScan(column_map, True, "", grouped_vulnerabilities)
+
+def is_scan_archive(source):
+    """Whether a path or seekable stream is a zip archive rather than a CSV"""
+    if isinstance(source, io.TextIOBase):
+        return False
+    if not hasattr(source, 'read'):
+        return zipfile.is_zipfile(source)
+    if not source.seekable():
+        # A zip is read from its end, so only seekable streams can be archives
+        return False
+    position = source.tell()
+    try:
+        return zipfile.is_zipfile(source)
+    finally:
+        source.seek(position)
+
+def archive_scan_members(archive):
+    """Names of the CSV files inside an open zip archive"""
+    return [
+        info.filename for info in archive.infolist()
+        if not info.is_dir() and info.filename.lower().endswith('.csv')
+        and not info.filename.startswith('__MACOSX/')
+    ]
+
+def parse_scan_task(task, engine="csv"):
+    """
+    Parse one entry of scan_tasks. Archive members named by (zip path, member)
+    are opened here, so the task can run in another process.
+    """
+    name, source = task
+    if isinstance(source, tuple):
+        archive_path, member = source
+        with zipfile.ZipFile(archive_path) as archive, archive.open(member) as member_file:
+            return parse_scan(member_file, engine)
+    return parse_scan(source, engine)
+
+def scan_tasks(sources, names, archives):
+    """
+    (name, source) for every CSV to parse. Zip archives contribute each of
+    their CSV members, decompressed as they are read; members of an archive on
+    disk are named by (zip path, member), members of an archive stream are
+    opened streams whose ZipFile is registered with the archives ExitStack.
+    """
+    tasks = []
+    for name, source in zip(names, sources):
+        if not is_scan_archive(source):
+            tasks.append((name, source))
+            continue
+        if hasattr(source, 'read'):
+            archive = archives.enter_context(zipfile.ZipFile(source))
+            members = archive_scan_members(archive)
+            tasks.extend((f"{name}/{member}", archives.enter_context(archive.open(member))) for member in members)
+        else:
+            with zipfile.ZipFile(source) as archive:
+                members = archive_scan_members(archive)
+            tasks.extend((f"{name}/{member}", (source, member)) for member in members)
+        if not members:
+            raise ValueError(f"No CSV files found in {name}")
+    return tasks
+
+def merge_parsed_scans(parsed_scans):
+    """
+    Merge the groupings of several scans into one ParsedScan.
+
+    Findings are merged on plugin name: the first scan to report a finding
+    provides its details and later scans add affected resources, which are
+    deduplicated through one (host, port) index shared by all scans.
+    """
+    if len(parsed_scans) == 1:
+        return parsed_scans[0]
+    grouped_vulnerabilities = {}
+    affected_resources = {}
+    seen_resources = {}
+    counters = StageCounters(logger, "Scan merge")
+    for parsed_scan in parsed_scans:
+        counters.add("scans")
+        for vulnerability_name, vulnerability in parsed_scan.grouped_vulnerabilities.items():
+            resources = [seen_resources.setdefault(resource, resource) for resource in vulnerability.affected_resources]
+            if vulnerability_name in affected_resources:
+                affected_resources[vulnerability_name].update(resources)
+                counters.add("merged findings")
+            else:
+                grouped_vulnerabilities[vulnerability_name] = vulnerability
+                affected_resources[vulnerability_name] = set(resources)
+                counters.add("findings")
+    counters.log()
+    return ParsedScan(parsed_scans[0].column_map, True, "",
+                      set_affected_resources(grouped_vulnerabilities, affected_resources))
+
+def parse_scans(sources, engine="csv", workers=None, names=None):
+    """
+    Parse several Nessus CSVs, gzipped or not, or zip archives of them, into one merged ParsedScan.
+
+    sources are file paths or open binary streams; names label them in log
+    and error messages. Scans are parsed concurrently, each with the same
+    single pass as parse_scan, and merged with merge_parsed_scans; nothing is
+    concatenated or extracted to disk first. When every scan is a path (or a
+    member of an archive on disk) they are parsed in up to workers processes,
+    otherwise in threads. The first scan whose header fails validation
+    returns an invalid ParsedScan naming the file.
+    """
+    sources = list(sources)
+    names = list(names) if names is not None else [
+        source if isinstance(source, str) else getattr(source, 'name', f"upload {index + 1}")
+        for index, source in enumerate(sources)
+    ]
+    with ExitStack() as archives:
+        tasks = scan_tasks(sources, names, archives)
+        if not tasks:
+            raise ValueError("No scans to parse")
+        workers = min(workers or os.cpu_count() or 1, len(tasks))
+        logger.info(f"Parsing {len(tasks)} scans with {workers} worker(s)")
+        if workers <= 1:
+            parsed_scans = [parse_scan_task(task, engine) for task in tasks]
+        else:
+            in_process = any(hasattr(source, 'read') for _, source in tasks)
+            executor_class = ThreadPoolExecutor if in_process else ProcessPoolExecutor
+            with executor_class(max_workers=workers) as executor:
+                parsed_scans = list(executor.map(parse_scan_task, tasks, [engine] * len(tasks)))
+
+    for (name, _), parsed_scan in zip(tasks, parsed_scans):
+        if not parsed_scan.valid:
+            return ParsedScan(parsed_scan.column_map, False, f"{name}: {parsed_scan.error_message}")
+    return merge_parsed_scans(parsed_scans)
+
+def parse_scan_sources(csv_source, engine="csv", scan_cache=None, names=None):
+    """
+    Parse a file path, an open stream, a zip archive of CSVs or a list of
+    any of those (merged through parse_scans) into a ParsedScan.
 
-        # Save the document
+    With a scan_cache.ScanCache the grouping is looked up by the hash of the
+    sources' bytes first, and stored there after a successful parse, so the
+    same scan is only ever parsed once.
+    """
+    sources = list(csv_source) if isinstance(csv_source, (list, tuple)) else [csv_source]
+    cache_key = scan_cache.key(sources) if scan_cache is not None else None
+    if cache_key is not None:
+        cached = scan_cache.load(cache_key)
+        if cached is not None:
+            column_map, grouped_vulnerabilities = cached
+            return ParsedScan(column_map, True, "", grouped_vulnerabilities)
+
+    if len(sources) == 1 and not is_scan_archive(sources[0]):
+        parsed_scan = parse_scan(sources[0], engine)
+    else:
+        parsed_scan = parse_scans(sources, engine, names=names)
+
+    if cache_key is not None and parsed_scan.valid:
         try:
-            
-            doc.save('output_document.docx')
-            logger.info("Document saved successfully as 'output_document.docx'")
-        except PermissionError:
-            logger.error("Permission denied when saving the document. Check if the file is open in another application.")
-            raise
+            scan_cache.store(cache_key, parsed_scan.column_map, parsed_scan.grouped_vulnerabilities)
         except Exception as e:
-            logger.error(f"Failed to save document: {str(e)}")
-            raise
+            # The report does not depend on the cache
+            logger.warning(f"Failed to cache the parsed scan: {str(e)}")
+    return parsed_scan
+
+def load_grouped_vulnerabilities(csv_source, finding_id_prefix=None, engine="csv", scan_cache=None):
+    """
+    Validate the CSV and group it into vulnerabilities with finding IDs.
+
+    csv_source is anything parse_scan_sources accepts or an already parsed
+    ParsedScan; scan_cache is passed on to parse_scan_sources. Finding IDs
+    are assigned after merging, and never cached. Raises ValueError when a
+    header fails validation.
+    """
+    if isinstance(csv_source, ParsedScan):
+        parsed_scan = csv_source
+    else:
+        parsed_scan = parse_scan_sources(csv_source, engine, scan_cache)
+    if not parsed_scan.valid:
+        raise ValueError(parsed_scan.error_message)
+    return assign_finding_ids(parsed_scan.grouped_vulnerabilities, finding_id_prefix)
+
+def add_finding_page(doc, numbered_finding_name, data_to_append, page_break, use_block_template=True):
+    """Add the heading and detail tables of one finding, followed by a page break when page_break is set"""
+    # Create the table
+    if use_block_template:
+        finding_tables = clone_finding_block(doc, numbered_finding_name)
+    else:
+        finding_tables = create_table(doc, numbered_finding_name)
+
+    # Add new page except for the last vulnerability
+    if page_break:
+        doc.add_section(WD_SECTION.NEW_PAGE)
+
+    append_data(finding_tables, data_to_append, KEYWORDS)
+
+def add_finding_pages(doc, findings, start_index, total_findings, use_block_template=True, finding_cache=None):
+    """
+    Add the heading, detail tables and page break of each finding.
+
+    findings is a slice of (name, data) pairs starting at position
+    start_index in a report of total_findings findings, which sets the
+    numbering and leaves out the page break after the report's last finding.
+    With a finding_cache.FindingCache, unchanged findings are copied from the
+    cache and newly rendered ones are added to it.
+    """
+    body = doc.element.body
+    cache_hits = 0
+    for offset, (vulnerability_name, data_to_append) in enumerate(findings):
+        index = start_index + offset
+        logger.debug(f"Creating table for vulnerability {index + 1}: {vulnerability_name}")
+
+        numbered_finding_name = f"{index + 1}. {vulnerability_name}"
+        page_break = index < total_findings - 1
+        if finding_cache is None:
+            add_finding_page(doc, numbered_finding_name, data_to_append, page_break, use_block_template)
+            continue
+
+        cache_key = finding_cache.key(numbered_finding_name, asdict(data_to_append), page_break, use_block_template,
+                                      KEYWORDS.fingerprint)
+        cached_elements = finding_cache.load(cache_key)
+        sectPr = body.sectPr
+        if cached_elements is not None:
+            for element in cached_elements:
+                sectPr.addprevious(element)
+            cache_hits += 1
+            continue
+
+        last_element = sectPr.getprevious()
+        add_finding_page(doc, numbered_finding_name, data_to_append, page_break, use_block_template)
+        new_elements = []
+        element = body[0] if last_element is None else last_element.getnext()
+        while element is not sectPr:
+            new_elements.append(element)
+            element = element.getnext()
+        finding_cache.store(cache_key, new_elements)
+
+    if finding_cache is not None:
+        logger.info(f"Finding cache: {cache_hits} of {len(findings)} findings reused")
+
+# Below this many findings per shard the process start-up and XML transfer cost more than they save
+MIN_FINDINGS_PER_SHARD = 50
+
+def build_finding_shard(findings, start_index, total_findings, use_block_template=True, finding_cache=None):
+    """
+    Worker entry point for sharded generation: build the finding pages of one
+    shard in a scratch document and return its body XML without the final sectPr.
+    """
+    doc = Document()
+    add_finding_pages(doc, findings, start_index, total_findings, use_block_template, finding_cache)
+    body = doc.element.body
+    body.remove(body.sectPr)
+    return etree.tostring(body)
+
+def add_finding_pages_sharded(doc, findings, use_block_template=True, workers=None, finding_cache=None):
+    """
+    Build the finding pages in parallel processes and splice them into doc.
+
+    Findings are split into one contiguous shard per worker; each shard is
+    built by build_finding_shard and its body elements are appended in shard
+    order, so the result matches add_finding_pages on the whole list.
+    """
+    workers = workers or os.cpu_count()
+    shard_size = max(-(-len(findings) // workers), MIN_FINDINGS_PER_SHARD)
+    shards = [(findings[start:start + shard_size], start) for start in range(0, len(findings), shard_size)]
+    logger.info(f"Building {len(findings)} findings in {len(shards)} shards")
+    if use_block_template:
+        # Built here so forked workers inherit it instead of each building their own
+        get_finding_block_template()
+    try:
+        with ProcessPoolExecutor(max_workers=min(workers, len(shards))) as executor:
+            futures = [
+                executor.submit(build_finding_shard, shard, start, len(findings), use_block_template, finding_cache)
+                for shard, start in shards
+            ]
+            for future in futures:
+                for element in list(parse_xml(future.result())):
+                    append_body_element(doc, element)
+    except Exception as e:
+        logger.error(f"Sharded generation failed: {str(e)}")
+        raise
+
+def build_document(finding_id_prefix=None, csv_path='dataset.csv', use_block_template=True, ingestion_engine="csv",
+                   workers=None, finding_cache=None, scan_cache=None):
+    """
+    Build the VA report from a Nessus CSV and return it as a live Document.
+
+    csv_path is anything load_grouped_vulnerabilities accepts. With workers > 1
+    large reports have their finding pages built in that many processes, on
+    machines with more than one CPU.
+    finding_cache (a finding_cache.FindingCache) reuses the pages of findings
+    unchanged since an earlier run, and scan_cache (a scan_cache.ScanCache)
+    the grouping of a scan parsed before. Raises on failure.
+    """
+    # Create a new document
+    doc = Document()
+    
+    logger.info("Created new document")
+    
+    normalize_fonts(doc, "Helvetica", 10.5)
+
+    with stage("parse_csv"):
+        grouped_vulnerabilities = load_grouped_vulnerabilities(csv_path, finding_id_prefix, ingestion_engine, scan_cache)
+
+    # Check if we have any vulnerabilities to process
+    if not grouped_vulnerabilities:
+        logger.warning("No valid vulnerabilities found in the CSV file")
+        raise ValueError("No valid vulnerabilities found in the CSV file")
+
+    logger.info(f"Found {len(grouped_vulnerabilities)} unique vulnerabilities")
+    with stage("summary_table"):
+        create_summary_table(doc, grouped_vulnerabilities)
+
+    # Add a page break after the summary table
+    doc.add_section(WD_SECTION.NEW_PAGE)
+    # Create tables for each vulnerability
+    with stage("finding_tables"):
+        counters = StageCounters(logger, "Finding tables")
+        findings = list(grouped_vulnerabilities.items())
+        for _, data_to_append in findings:
+            counters.add("findings")
+            counters.add("affected resources", len(data_to_append.affected_resources))
+        # A single CPU runs the shards one after another, at the cost of the process start-up and XML transfer
+        if workers and workers > 1 and (os.cpu_count() or 1) > 1 and len(findings) >= 2 * MIN_FINDINGS_PER_SHARD:
+            add_finding_pages_sharded(doc, findings, use_block_template, workers, finding_cache)
+        else:
+            add_finding_pages(doc, findings, 0, len(findings), use_block_template, finding_cache)
+
+    counters.log()
+    return doc
+
+# "python-docx" builds the report as a Document; "stream" writes it with docx_stream_writer
+WRITER_BACKENDS = ("python-docx", "stream")
+
+def main(finding_id_prefix=None, csv_path='dataset.csv', output_path='output_document.docx',
+         use_block_template=True, ingestion_engine="csv", profile_path=None, profile_options=("timings",),
+         workers=None, writer="python-docx", cache_dir=None, scan_cache_dir=None):
+    """
+    Build the VA report from a Nessus CSV and save it.
+
+    csv_path is anything load_grouped_vulnerabilities accepts and output_path a
+    file path or a writable binary stream, so callers never need to change the working
+    directory. Returns True on success and False on failure.
+
+    With profile_path set the run is profiled (see report_profiling) and the
+    stage breakdown is written there as JSON; profile_options can add
+    "cprofile" and "memory" capture. workers enables sharded generation, see
+    build_document. writer picks one of WRITER_BACKENDS; the "stream" backend
+    keeps memory flat on very large reports. cache_dir keeps rendered finding
+    pages there so re-runs on a mostly unchanged scan only render what changed,
+    and scan_cache_dir keeps parsed scans there so re-runs on the same scan
+    with another finding ID prefix skip parsing.
+    """
+    if profile_path is not None:
+        profiler = ReportProfiler.from_options(profile_options)
+        with profiler.run():
+            success = main(finding_id_prefix, csv_path, output_path, use_block_template, ingestion_engine,
+                           workers=workers, writer=writer, cache_dir=cache_dir, scan_cache_dir=scan_cache_dir)
+        profiler.write(profile_path)
+        logger.info(f"Profile written to '{profile_path}'")
+        return success
+
+    logger.info("Starting document creation process")
+    
+    try:
+        finding_cache = FindingCache(cache_dir) if cache_dir else None
+        scan_cache = ScanCache(scan_cache_dir) if scan_cache_dir else None
+        if writer not in WRITER_BACKENDS:
+            raise ValueError(f"Unknown writer backend: {writer}")
+        if writer == "stream":
+            # Imported here as the streaming backend is built on top of this module
+            from docx_stream_writer import stream_document
+            stream_document(finding_id_prefix, csv_path, output_path, use_block_template, ingestion_engine,
+                            finding_cache=finding_cache, scan_cache=scan_cache)
+            logger.info(f"Document streamed successfully to '{output_path}'")
+        else:
+            doc = build_document(finding_id_prefix, csv_path, use_block_template, ingestion_engine, workers, finding_cache,
+                                 scan_cache)
 
+            # Save the document
+            try:
+            
+                with stage("save"):
+                    doc.save(output_path)
+                logger.info(f"Document saved successfully as '{output_path}'")
+            except PermissionError:
+                logger.error("Permission denied when saving the document. Check if the file is open in another application.")
+                raise
+            except Exception as e:
+                logger.error(f"Failed to save document: {str(e)}")
+                raise
+
+        if finding_cache is not None:
+            finding_cache.prune()
         logger.info("Document creation process completed successfully")
         return True
 
@@ -1012,21 +1620,50 @@ def main(finding_id_prefix=None):
         logger.critical(f"Document creation failed: {str(e)}")
         return False
 
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Build the VA report from a Nessus CSV export")
+    parser.add_argument('csv_paths', nargs='*', default=['dataset.csv'], metavar='csv_path',
+                        help="Nessus CSV exports or zip archives of them, merged into one report (default: dataset.csv)")
+    parser.add_argument('--prefix', help="finding ID prefix, e.g. ABC (prompted for when omitted)")
+    parser.add_argument('-o', '--output', default='output_document.docx', help="report to write")
+    parser.add_argument('--engine', choices=INGESTION_ENGINES, default="csv", help="CSV ingestion engine")
+    parser.add_argument('--writer', choices=WRITER_BACKENDS, default="python-docx", help="document writer backend")
+    parser.add_argument('--workers', type=int, help="processes for building finding pages in parallel")
+    parser.add_argument('--cache-dir', help="directory caching rendered finding pages between runs")
+    parser.add_argument('--scan-cache-dir', help="directory caching parsed scans, keyed by their content")
+    parser.add_argument('--profile', metavar='PATH', help="write a stage timing profile (JSON) to PATH")
+    parser.add_argument('--profile-options', default="timings",
+                        help=f"comma-separated, from: {', '.join(PROFILE_OPTIONS)}")
+    parser.add_argument('--no-block-template', dest='use_block_template', action='store_false',
+                        help="build every finding's tables from scratch instead of cloning the prebuilt block")
+    args = parser.parse_args(argv)
+    try:
+        args.profile_options = parse_profile_options(args.profile_options)
+    except ValueError as e:
+        parser.error(str(e))
+    return args
+
 if __name__ == "__main__":
+    args = parse_args()
+    configure_logging("document_creation")
     try:
-        test_prefix = input("Enter finding ID prefix (e.g., ABC): ")
-        if not test_prefix:
+        finding_id_prefix = args.prefix or input("Enter finding ID prefix (e.g., ABC): ")
+        if not finding_id_prefix:
             print("Finding ID prefix is required")
-            exit(1)
-        
-        success = main(test_prefix)
-        success = main()
+            sys.exit(1)
+
+        csv_path = args.csv_paths[0] if len(args.csv_paths) == 1 else args.csv_paths
+        success = main(finding_id_prefix, csv_path, args.output, args.use_block_template, args.engine,
+                       profile_path=args.profile, profile_options=args.profile_options, workers=args.workers,
+                       writer=args.writer, cache_dir=args.cache_dir, scan_cache_dir=args.scan_cache_dir)
         if success:
             print("Document created successfully!")
             logger.info("Script execution completed successfully")
         else:
             print("Document creation failed. Check the log file for details.")
             logger.error("Script execution failed")
+            sys.exit(1)
     except Exception as e:
         print(f"An unexpected error occurred: {str(e)}")
-        logger.critical(f"Unhandled exception: {str(e)}", exc_info=True)
\ No newline at end of file
+        logger.critical(f"Unhandled exception: {str(e)}", exc_info=True)
+        sys.exit(1)
@@ -0,0 +1,112 @@
+"""
+Cache of parsed cover templates (report_template.docx) shared across requests.
+
+Rendering a DocxTemplate from disk re-reads the zip, re-runs docxtpl's XML
+patching regexes and recompiles the Jinja source of every part on each call.
+TemplateCache keeps the raw template bytes, the patched XML and the compiled
+Jinja templates per template path, invalidated when the file's mtime
+changes, and hands out a fresh CachedDocxTemplate per request that only has
+to unzip from memory and render.
+"""
+import io
+import logging
+import os
+import threading
+
+from docxtpl import DocxTemplate
+from jinja2 import Environment
+
+logger = logging.getLogger(__name__)
+
+
+class CompiledTemplateEnvironment(Environment):
+    """Jinja environment that compiles each distinct template source only once"""
+
+    def __init__(self, **options):
+        super().__init__(**options)
+        self._compiled = {}
+
+    def from_string(self, source, globals=None, template_class=None):
+        if globals is not None or template_class is not None:
+            return super().from_string(source, globals, template_class)
+        template = self._compiled.get(source)
+        if template is None:
+            template = super().from_string(source)
+            self._compiled[source] = template
+        return template
+
+
+class TemplateEntry:
+    """Everything cached for one version of one template file"""
+
+    def __init__(self, template_path, mtime, data):
+        self.template_path = template_path
+        self.mtime = mtime
+        self.data = data
+        self.patched_xml = {}
+        self.environments = {}
+
+    def environment(self, autoescape):
+        environment = self.environments.get(autoescape)
+        if environment is None:
+            environment = CompiledTemplateEnvironment(autoescape=autoescape)
+            self.environments[autoescape] = environment
+        return environment
+
+
+class CachedDocxTemplate(DocxTemplate):
+    """DocxTemplate that reuses the patched XML and compiled Jinja templates of its entry"""
+
+    def __init__(self, entry):
+        super().__init__(io.BytesIO(entry.data))
+        self._entry = entry
+
+    def patch_xml(self, src_xml):
+        patched = self._entry.patched_xml.get(src_xml)
+        if patched is None:
+            patched = super().patch_xml(src_xml)
+            self._entry.patched_xml[src_xml] = patched
+        return patched
+
+    def render(self, context, jinja_env=None, autoescape=False):
+        # A caller-supplied environment is used as is and compiles as usual
+        if jinja_env is None:
+            jinja_env = self._entry.environment(autoescape)
+        super().render(context, jinja_env, autoescape)
+
+
+class TemplateCache:
+    """Parsed templates keyed by path, reloaded when the file's mtime changes"""
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def _entry(self, template_path):
+        template_path = os.path.abspath(template_path)
+        mtime = os.stat(template_path).st_mtime_ns
+        with self._lock:
+            entry = self._entries.get(template_path)
+            if entry is None or entry.mtime != mtime:
+                logger.info(f"Loading template into cache: {template_path}")
+                with open(template_path, 'rb') as template_file:
+                    entry = TemplateEntry(template_path, mtime, template_file.read())
+                self._entries[template_path] = entry
+        return entry
+
+    def get(self, template_path):
+        """Return a fresh CachedDocxTemplate for one render"""
+        return CachedDocxTemplate(self._entry(template_path))
+
+    def warm(self, template_path, context=None):
+        """Load a template and render it once so its XML is patched and compiled ahead of requests"""
+        self.get(template_path).render(context or {})
+        logger.info(f"Template cache warmed for {template_path}")
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+# Shared by the web app, the background jobs and batch runs in this process
+template_cache = TemplateCache()
@@ -0,0 +1,69 @@
+"""
+Shared fixtures. Logs go to a temporary directory, set before any module
+configures logging, and every app folder the web app writes to is pointed
+at the test's tmp_path.
+"""
+import io
+import os
+import sys
+import tempfile
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault('REPORT_LOG_DIR', tempfile.mkdtemp(prefix='report-test-logs-'))
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, os.path.join(ROOT_DIR, 'benchmarks'))
+
+import pytest
+
+from bench_cover_template import write_sample_template
+from synthetic_csv import write_synthetic_csv
+
+
+@pytest.fixture
+def scan_csv(tmp_path):
+    """A small synthetic Nessus export"""
+    return write_synthetic_csv(str(tmp_path / 'scan.csv'), findings=12, hosts_per_finding=3)
+
+
+@pytest.fixture
+def template_path(tmp_path):
+    return write_sample_template(str(tmp_path / 'report_template.docx'), paragraphs=5)
+
+
+@pytest.fixture
+def web_app(tmp_path, template_path):
+    """The Flask app with its folders in tmp_path and jobs run on threads"""
+    import webapp
+
+    saved = dict(webapp.app.config)
+    webapp.app.config.update(
+        TESTING=True,
+        REPORT_TEMPLATE=template_path,
+        JOBS_FOLDER=str(tmp_path / 'jobs'),
+        REPORT_JOB_EXECUTOR='thread',
+        REPORT_JOB_WORKERS=1,
+        PROFILES_FOLDER=str(tmp_path / 'profiles'),
+        FINDING_CACHE_FOLDER=str(tmp_path / 'finding_cache'),
+        SCAN_CACHE_FOLDER=str(tmp_path / 'scan_cache'),
+        UPLOADS_FOLDER=str(tmp_path / 'uploads'),
+    )
+    yield webapp.app
+    job_queue = webapp._job_queue
+    if job_queue is not None and job_queue._executor is not None:
+        job_queue._executor.shutdown(wait=True)
+    webapp._job_queue = webapp._finding_cache = webapp._scan_cache = webapp._upload_store = None
+    webapp.app.config.clear()
+    webapp.app.config.update(saved)
+
+
+def report_form(csv_path, prefix='TST', filename='scan.csv'):
+    """Form data for one report of the CSV at csv_path"""
+    with open(csv_path, 'rb') as csv_file:
+        data = csv_file.read()
+    return {
+        'companyName': 'Acme',
+        'networkType': 'External Network',
+        'assessmentDate': '2025-01-02',
+        'findingIdPrefix': prefix,
+        'file': (io.BytesIO(data), filename),
+    }
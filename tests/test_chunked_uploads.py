@@ -0,0 +1,118 @@
+import io
+import os
+import time
+
+import pytest
+
+import chunked_uploads
+from chunked_uploads import ChunkedUploadError, OffsetMismatch, UploadStore
+from conftest import report_form
+
+
+def upload_in_chunks(store, upload, data, chunk_size, start=0):
+    for offset in range(start, len(data), chunk_size):
+        store.get(upload.upload_id).write_chunk(offset, io.BytesIO(data[offset:offset + chunk_size]))
+
+
+def test_chunks_must_follow_the_offset_until_the_upload_is_complete(tmp_path, scan_csv):
+    with open(scan_csv, 'rb') as csv_file:
+        data = csv_file.read()
+    store = UploadStore(str(tmp_path / 'uploads'))
+    upload = store.create('scan.csv')
+
+    assert upload.write_chunk(0, io.BytesIO(data[:100])) == 100
+    with pytest.raises(OffsetMismatch) as mismatch:
+        upload.write_chunk(50, io.BytesIO(data[50:100]))
+    assert mismatch.value.expected == 100
+    assert upload.write_chunk(100, io.BytesIO(data[100:])) == len(data)
+
+    with pytest.raises(ChunkedUploadError, match="expected"):
+        upload.finish(len(data) + 1)
+    assert not upload.complete
+    upload.finish(len(data))
+    with pytest.raises(ChunkedUploadError, match="already complete"):
+        upload.write_chunk(len(data), io.BytesIO(b'more'))
+
+    parsed = upload.parsed_scan(timeout=30)
+    assert parsed.valid
+    assert upload.status()['parsed']
+
+
+def test_a_scan_is_not_handed_out_before_its_upload_is_complete(tmp_path, scan_csv):
+    store = UploadStore(str(tmp_path / 'uploads'))
+    upload = store.create('scan.csv')
+    with open(scan_csv, 'rb') as csv_file:
+        upload.write_chunk(0, csv_file)
+
+    with pytest.raises(ChunkedUploadError, match="not complete"):
+        upload.parsed_scan(timeout=1)
+
+
+def test_discarding_an_upload_stops_its_parser(tmp_path, scan_csv):
+    store = UploadStore(str(tmp_path / 'uploads'))
+    upload = store.create('scan.csv')
+    with open(scan_csv, 'rb') as csv_file:
+        upload.write_chunk(0, io.BytesIO(csv_file.read(200)))
+
+    store.discard(upload.upload_id)
+
+    upload._parser.join(timeout=10)
+    assert not upload._parser.is_alive()
+    assert store.get(upload.upload_id) is None
+    assert not os.path.exists(upload.directory)
+
+
+def test_an_upload_shared_by_two_processes(tmp_path, scan_csv, monkeypatch):
+    """Chunks and completion sent to another worker reach this worker's parser through the disk"""
+    monkeypatch.setattr(chunked_uploads, 'POLL_SECONDS', 0.05)
+    with open(scan_csv, 'rb') as csv_file:
+        data = csv_file.read()
+    first = UploadStore(str(tmp_path / 'uploads'))
+    other = UploadStore(str(tmp_path / 'uploads'))
+    upload = first.create('scan.csv')
+    upload.write_chunk(0, io.BytesIO(data[:300]))
+
+    with pytest.raises(OffsetMismatch):
+        other.get(upload.upload_id).write_chunk(0, io.BytesIO(data[:300]))
+    upload_in_chunks(other, upload, data, 300, start=300)
+    other.get(upload.upload_id).finish(len(data))
+
+    assert upload.offset == len(data) and upload.complete
+    expected = other.get(upload.upload_id).parsed_scan(timeout=30)
+    parsed = first.get(upload.upload_id).parsed_scan(timeout=30)
+    assert list(parsed.grouped_vulnerabilities) == list(expected.grouped_vulnerabilities)
+
+    other.discard(upload.upload_id)
+    assert first.get(upload.upload_id) is None
+
+
+def test_looking_up_an_upload_removes_expired_ones(tmp_path, monkeypatch):
+    monkeypatch.setattr(chunked_uploads, 'EXPIRE_INTERVAL_SECONDS', 0)
+    store = UploadStore(str(tmp_path / 'uploads'), max_age_seconds=3600)
+    old = store.create('old.csv')
+    recent = store.create('recent.csv')
+    an_hour_ago = time.time() - 3700
+    for name in (chunked_uploads.STATE_FILENAME, chunked_uploads.DATA_FILENAME):
+        os.utime(os.path.join(old.directory, name), (an_hour_ago, an_hour_ago))
+
+    assert store.get(recent.upload_id) is recent
+    assert not os.path.exists(old.directory)
+    assert store.get(old.upload_id) is None
+
+
+def test_a_report_from_an_upload_completed_elsewhere(web_app, tmp_path, scan_csv):
+    """The report POST may reach a worker that saw none of the upload's requests"""
+    with open(scan_csv, 'rb') as csv_file:
+        data = csv_file.read()
+    other = UploadStore(web_app.config['UPLOADS_FOLDER'])
+    upload = other.create('scan.csv')
+    upload.write_chunk(0, io.BytesIO(data))
+    upload.finish(len(data))
+
+    form = report_form(scan_csv)
+    del form['file']
+    form['uploadId'] = upload.upload_id
+    response = web_app.test_client().post('/', data=form)
+
+    assert response.status_code == 200, response.get_data(as_text=True)
+    assert response.mimetype.endswith('wordprocessingml.document')
@@ -0,0 +1,51 @@
+from docx import Document
+from docx.oxml import parse_xml
+from docx.oxml.ns import qn
+from docx.shared import Inches
+from lxml import etree
+
+from docx_merge import append_document, splice_body_xml
+
+
+def body_texts(document):
+    return ["".join(node.text or '' for node in element.iter(qn('w:t'))) for element in document.element.body]
+
+
+def test_splice_keeps_the_first_body_then_the_second_in_order():
+    cover = parse_xml(
+        '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"><w:body>'
+        '<w:p><w:r><w:t>cover 1</w:t></w:r></w:p><w:p><w:r><w:t>cover 2</w:t></w:r></w:p>'
+        '</w:body></w:document>')
+    report = parse_xml(
+        '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"'
+        ' xmlns:x="urn:example"><w:body>'
+        + ''.join(f'<w:p x:tag="{i}"><w:r><w:t>report {i}</w:t></w:r></w:p>' for i in range(5))
+        + '</w:body></w:document>')
+
+    merged = etree.fromstring(splice_body_xml(cover, report.find(qn('w:body'))))
+
+    texts = [''.join(paragraph.itertext()) for paragraph in merged.find(qn('w:body'))]
+    assert texts == ['cover 1', 'cover 2'] + [f'report {i}' for i in range(5)]
+    assert merged.nsmap['x'] == 'urn:example'
+
+
+def test_append_document_ends_the_cover_section_and_keeps_one_final_sectPr():
+    cover = Document()
+    cover.add_paragraph("Cover page")
+    cover.sections[0].left_margin = Inches(2)
+    report = Document()
+    report.add_heading("Findings", level=1)
+    report.add_paragraph("First finding", style='List Bullet')
+    report.add_table(rows=1, cols=2).cell(0, 0).text = "cell"
+    report.add_paragraph("Last paragraph")
+    report_sections = len(report.element.body.findall(qn('w:sectPr')))
+
+    merged = append_document(cover, report)
+
+    body = merged.element.body
+    assert body_texts(merged)[:5] == ["Cover page", "Findings", "First finding", "cell", "Last paragraph"]
+    assert body[-1].tag == qn('w:sectPr')
+    assert len(body.findall(qn('w:sectPr'))) == report_sections == 1
+    # The cover's page setup now ends the cover's section
+    assert body[0].pPr.sectPr.find(qn('w:pgMar')).get(qn('w:left')) == str(Inches(2).twips)
+    assert merged.paragraphs[2].style.name == 'List Bullet'
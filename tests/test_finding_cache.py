@@ -0,0 +1,76 @@
+import os
+import time
+import zipfile
+
+import script5
+from conftest import report_form
+from finding_cache import FindingCache
+from synthetic_csv import write_synthetic_csv
+
+
+def document_xml(path):
+    with zipfile.ZipFile(path) as docx:
+        return docx.read('word/document.xml')
+
+
+def cache_size(cache_dir):
+    return sum(entry.stat().st_size
+               for subdirectory in os.scandir(cache_dir) if subdirectory.is_dir()
+               for entry in os.scandir(subdirectory.path) if entry.name.endswith('.xml'))
+
+
+def test_warm_cache_matches_uncached_report(tmp_path, scan_csv):
+    cache_dir = str(tmp_path / 'cache')
+    outputs = {name: str(tmp_path / f'{name}.docx') for name in ('uncached', 'cold', 'warm')}
+    assert script5.main('TST', csv_path=scan_csv, output_path=outputs['uncached'])
+    assert script5.main('TST', csv_path=scan_csv, output_path=outputs['cold'], cache_dir=cache_dir)
+    assert script5.main('TST', csv_path=scan_csv, output_path=outputs['warm'], cache_dir=cache_dir)
+
+    expected = document_xml(outputs['uncached'])
+    assert document_xml(outputs['cold']) == expected
+    assert document_xml(outputs['warm']) == expected
+
+
+def test_prune_removes_least_recently_used_entries(tmp_path):
+    cache = FindingCache(str(tmp_path / 'cache'), max_bytes=250)
+    for index in range(5):
+        path = cache._path(f"{index:02d}" + "0" * 62)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as entry:
+            entry.write(b'x' * 100)
+        os.utime(path, (index, index))
+
+    cache.prune()
+
+    assert cache_size(cache.directory) == 200
+    remaining = sorted(name[:2] for _, _, names in os.walk(cache.directory) for name in names)
+    assert remaining == ['03', '04']
+
+
+def test_web_reports_keep_the_cache_within_its_limit(web_app, tmp_path):
+    max_bytes = 40 * 1024
+    web_app.config['FINDING_CACHE_MAX_BYTES'] = max_bytes
+    client = web_app.test_client()
+    for index in range(3):
+        # Different scans every time, so every report adds new pages
+        csv_path = write_synthetic_csv(str(tmp_path / f'scan{index}.csv'), findings=25, seed=index + 1)
+        response = client.post('/', data=report_form(csv_path), content_type='multipart/form-data')
+        assert response.status_code == 200
+        assert 0 < cache_size(web_app.config['FINDING_CACHE_FOLDER']) <= max_bytes
+
+
+def test_report_jobs_keep_the_cache_within_its_limit(web_app, tmp_path):
+    max_bytes = 40 * 1024
+    web_app.config['FINDING_CACHE_MAX_BYTES'] = max_bytes
+    client = web_app.test_client()
+    for index in range(2):
+        csv_path = write_synthetic_csv(str(tmp_path / f'scan{index}.csv'), findings=25, seed=index + 1)
+        response = client.post('/jobs', data=report_form(csv_path), content_type='multipart/form-data')
+        assert response.status_code == 202
+        job = response.get_json()
+        deadline = time.time() + 60
+        while job['status'] in ('queued', 'running') and time.time() < deadline:
+            time.sleep(0.1)
+            job = client.get(job['status_url']).get_json()
+        assert job['status'] == 'done'
+        assert 0 < cache_size(web_app.config['FINDING_CACHE_FOLDER']) <= max_bytes
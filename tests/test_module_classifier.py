@@ -0,0 +1,55 @@
+import pytest
+
+from module_classifier import KeywordClassifier
+
+
+@pytest.fixture(scope='module')
+def classifier():
+    return KeywordClassifier.from_file()
+
+
+@pytest.mark.parametrize('name, module', [
+    ("Apache Tomcat 9.0.0.M1 < 9.0.50 Multiple Vulnerabilities", "Apache Tomcat"),
+    ("Apache HTTP Server 2.4.x < 2.4.49 Multiple Vulnerabilities", "Apache"),
+    ("Apache 2.4.x < 2.4.52 mod_lua Buffer Overflow", "Apache"),
+    ("Oracle WebLogic Server Multiple Vulnerabilities (Jan 2021 CPU)", "Oracle WebLogic"),
+    ("Oracle MySQL Server 5.7.x < 5.7.34 Multiple Vulnerabilities", "MySQL"),
+    ("Oracle Database Server Multiple Vulnerabilities", "Oracle"),
+    ("Dell iDRAC9 < 4.40.00.00 Multiple Vulnerabilities", "Dell iDRAC"),
+    ("Dell EMC OpenManage Server Administrator", "Dell"),
+    ("Microsoft IIS 10 on Windows Server Information Disclosure", "IIS"),
+    ("Microsoft Windows SMB Shares Unprivileged Access", "SMB"),
+    ("Microsoft Windows Unquoted Service Path Enumeration", "Windows"),
+    ("JavaScript library jQuery < 3.5.0 Multiple XSS", "jQuery"),
+    ("Oracle Java SE Multiple Vulnerabilities", "Java"),
+    ("OpenSSH < 8.0 Multiple Vulnerabilities", "SSH"),
+    ("SSLv3 Padding Oracle On Downgraded Legacy Encryption Vulnerability (POODLE)", "SSL"),
+    ("Web Server Does Not Properly Validate Input", ""),
+    ("Web Application Potentially Vulnerable to Clickjacking", ""),
+])
+def test_the_most_specific_keyword_wins(classifier, name, module):
+    assert classifier.classify(name) == module
+
+
+def test_keywords_only_match_whole_words():
+    classifier = KeywordClassifier({'Perl': 'Perl', 'Java': 'Java', 'iDRAC': 'iDRAC'})
+
+    assert classifier.classify("Improperly Configured Service") == ""
+    assert classifier.classify("JavaScript Source Disclosure") == ""
+    assert classifier.classify("perl: use after free") == "Perl"
+    assert classifier.classify("iDRAC9 Default Credentials") == "iDRAC"
+
+
+def test_a_rejected_longer_keyword_does_not_hide_a_shorter_one():
+    # "web cat" and "cat" end at the same character, but only "cat" is a whole word here
+    classifier = KeywordClassifier({'web cat': 'Web Cat', 'cat': 'Cat'})
+
+    assert classifier.classify("cobweb cat") == "Cat"
+    assert classifier.classify("a web cat") == "Web Cat"
+
+
+def test_earlier_keywords_take_priority():
+    classifier = KeywordClassifier({'Tomcat': 'Apache Tomcat', 'Apache': 'Apache'})
+
+    assert classifier.classify("Apache Tomcat") == "Apache Tomcat"
+    assert KeywordClassifier({'Apache': 'Apache', 'Tomcat': 'Apache Tomcat'}).classify("Apache Tomcat") == "Apache"
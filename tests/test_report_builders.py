@@ -0,0 +1,64 @@
+import zipfile
+
+import pytest
+
+import docx_stream_writer
+import script5
+
+
+def document_xml(path):
+    with zipfile.ZipFile(path) as docx:
+        return docx.read('word/document.xml')
+
+
+@pytest.fixture
+def serial_report(tmp_path, scan_csv):
+    output_path = str(tmp_path / 'serial.docx')
+    assert script5.main('TST', csv_path=scan_csv, output_path=output_path)
+    return output_path
+
+
+def test_sharded_build_matches_the_serial_build(tmp_path, scan_csv, serial_report, monkeypatch):
+    # Small shards, so the 12 findings of the test scan are built in two processes, even on one CPU
+    monkeypatch.setattr(script5, 'MIN_FINDINGS_PER_SHARD', 3)
+    monkeypatch.setattr(script5.os, 'cpu_count', lambda: 2)
+    output_path = str(tmp_path / 'sharded.docx')
+
+    assert script5.main('TST', csv_path=scan_csv, output_path=output_path, workers=2)
+
+    assert document_xml(output_path) == document_xml(serial_report)
+
+
+# With an odd chunk size the summary chunks start on both shaded and plain rows
+@pytest.mark.parametrize('chunk_size', [docx_stream_writer.DEFAULT_CHUNK_SIZE, 5])
+def test_streamed_report_matches_the_python_docx_build(tmp_path, scan_csv, serial_report, chunk_size):
+    output_path = str(tmp_path / 'streamed.docx')
+
+    docx_stream_writer.stream_document('TST', scan_csv, output_path, chunk_size=chunk_size)
+
+    assert document_xml(output_path) == document_xml(serial_report)
+    with zipfile.ZipFile(output_path) as streamed, zipfile.ZipFile(serial_report) as built:
+        assert sorted(streamed.namelist()) == sorted(built.namelist())
+        assert streamed.read('word/styles.xml') == built.read('word/styles.xml')
+
+
+def test_main_streams_with_the_stream_writer(tmp_path, scan_csv, serial_report):
+    output_path = str(tmp_path / 'streamed.docx')
+
+    assert script5.main('TST', csv_path=scan_csv, output_path=output_path, writer="stream")
+
+    assert document_xml(output_path) == document_xml(serial_report)
+
+
+def test_a_single_cpu_builds_serially(tmp_path, scan_csv, serial_report, monkeypatch):
+    def sharded(*args, **kwargs):
+        raise AssertionError("sharded on a single CPU")
+
+    monkeypatch.setattr(script5, 'MIN_FINDINGS_PER_SHARD', 3)
+    monkeypatch.setattr(script5.os, 'cpu_count', lambda: 1)
+    monkeypatch.setattr(script5, 'add_finding_pages_sharded', sharded)
+    output_path = str(tmp_path / 'single_cpu.docx')
+
+    assert script5.main('TST', csv_path=scan_csv, output_path=output_path, workers=2)
+
+    assert document_xml(output_path) == document_xml(serial_report)
@@ -0,0 +1,123 @@
+import os
+import shutil
+import sqlite3
+import threading
+import time
+
+import pytest
+
+import report_jobs
+from report_jobs import JOB_DONE, JOB_FAILED, JOB_QUEUED, JOB_RUNNING, STALE_JOB_SECONDS, JobStore, ReportJobQueue
+
+CONTEXT = {
+    'companyName': 'Acme',
+    'networkType': 'External Network',
+    'assessmentDate': '02/01/2025',
+    'findingsCount': '5',
+}
+
+
+def saved_job(jobs_dir, job_id, scan_csv, template_path, status, updated_at=None):
+    """A job row and work directory as a previous server process would have left them"""
+    work_dir = os.path.join(jobs_dir, job_id)
+    os.makedirs(work_dir)
+    shutil.copy(scan_csv, os.path.join(work_dir, 'dataset.csv'))
+    store = JobStore(os.path.join(jobs_dir, 'jobs.sqlite3'))
+    store.create(job_id, work_dir, {
+        'company_name': 'Acme',
+        'finding_id_prefix': 'TST',
+        'context': CONTEXT,
+        'template_path': template_path,
+    })
+    set_job_row(jobs_dir, job_id, status=status, updated_at=updated_at or time.time())
+    return store, work_dir
+
+
+def set_job_row(jobs_dir, job_id, **values):
+    with sqlite3.connect(os.path.join(jobs_dir, 'jobs.sqlite3')) as conn:
+        assignments = ", ".join(f"{column} = ?" for column in values)
+        conn.execute(f"UPDATE jobs SET {assignments} WHERE id = ?", (*values.values(), job_id))
+
+
+def wait_for(store, job_id, timeout=60):
+    deadline = time.time() + timeout
+    job = store.get(job_id)
+    while job['status'] in (JOB_QUEUED, JOB_RUNNING) and time.time() < deadline:
+        time.sleep(0.1)
+        job = store.get(job_id)
+    return job
+
+
+@pytest.mark.parametrize('status, age', [(JOB_QUEUED, 0), (JOB_RUNNING, STALE_JOB_SECONDS + 60)])
+def test_creating_the_web_job_queue_resumes_unfinished_jobs(web_app, scan_csv, template_path, status, age):
+    import webapp
+
+    jobs_dir = web_app.config['JOBS_FOLDER']
+    store, work_dir = saved_job(jobs_dir, 'left-over', scan_csv, template_path, status, time.time() - age)
+
+    webapp.get_job_queue()
+
+    job = wait_for(store, 'left-over')
+    assert job['status'] == JOB_DONE, job['error']
+    assert os.path.exists(job['result_path'])
+
+
+def test_running_job_of_a_live_process_is_not_taken_over(tmp_path, scan_csv, template_path):
+    jobs_dir = str(tmp_path / 'jobs')
+    store, _ = saved_job(jobs_dir, 'busy', scan_csv, template_path, JOB_RUNNING)
+
+    assert ReportJobQueue(jobs_dir).resume_pending() == []
+    assert store.get('busy')['status'] == JOB_RUNNING
+
+
+def test_a_long_running_job_is_not_taken_over_by_another_process(tmp_path, scan_csv, template_path, monkeypatch):
+    monkeypatch.setattr(report_jobs, 'HEARTBEAT_SECONDS', 0.05)
+    monkeypatch.setattr(report_jobs, 'STALE_JOB_SECONDS', 0.5)
+    release = threading.Event()
+    runs = []
+
+    def slow_report_job(work_dir, params):
+        runs.append(work_dir)
+        release.wait(timeout=30)
+        return os.path.join(work_dir, 'report.docx'), False
+
+    monkeypatch.setattr(report_jobs, 'run_report_job', slow_report_job)
+    jobs_dir = str(tmp_path / 'jobs')
+    queue = ReportJobQueue(jobs_dir, max_workers=1)
+    job_id, work_dir = queue.new_job()
+    queue.submit(job_id, work_dir, {})
+
+    # Well past STALE_JOB_SECONDS, while another server process accepts a job
+    time.sleep(1.5)
+    other = ReportJobQueue(jobs_dir, max_workers=1)
+    other.new_job()
+
+    try:
+        assert queue.get(job_id)['status'] == JOB_RUNNING
+        assert runs == [work_dir]
+    finally:
+        release.set()
+        queue._executor.shutdown(wait=True)
+    assert wait_for(queue.store, job_id)['status'] == JOB_DONE
+    assert other._executor is None
+
+
+def test_new_job_removes_expired_jobs_and_orphaned_directories(tmp_path, scan_csv, template_path):
+    jobs_dir = str(tmp_path / 'jobs')
+    old = time.time() - 7200
+    store, expired_dir = saved_job(jobs_dir, 'expired', scan_csv, template_path, JOB_DONE, old)
+    _, failed_dir = saved_job(jobs_dir, 'failed', scan_csv, template_path, JOB_FAILED, old)
+    _, recent_dir = saved_job(jobs_dir, 'recent', scan_csv, template_path, JOB_DONE)
+    orphan_dir = os.path.join(jobs_dir, 'orphan')
+    os.makedirs(orphan_dir)
+    os.utime(orphan_dir, (old, old))
+
+    queue = ReportJobQueue(jobs_dir, retention_seconds=3600)
+    job_id, work_dir = queue.new_job()
+
+    for removed_id, removed_dir in (('expired', expired_dir), ('failed', failed_dir), (None, orphan_dir)):
+        assert not os.path.exists(removed_dir)
+        if removed_id:
+            assert store.get(removed_id) is None
+    assert os.path.exists(recent_dir) and store.get('recent') is not None
+    assert os.path.isdir(work_dir)
@@ -0,0 +1,41 @@
+import os
+import subprocess
+import sys
+import textwrap
+
+from conftest import ROOT_DIR
+
+# Logging configuration is global to a process, so each scenario runs in its own interpreter
+POOL_SCRIPT = textwrap.dedent("""
+    import logging, sys
+    from concurrent.futures import ProcessPoolExecutor
+    sys.path.insert(0, {root!r})
+    from report_logging import configure_logging
+
+    def work(index):
+        logging.getLogger('worker').info(f"worker record {{index}}")
+        return index
+
+    if __name__ == '__main__':
+        configure_logging('pooled', log_dir={log_dir!r}, console=False)
+        logging.getLogger('parent').info("parent record")
+        for run in range(2):
+            with ProcessPoolExecutor(max_workers=2) as executor:
+                list(executor.map(work, range(run * 4, run * 4 + 4)))
+        logging.getLogger('parent').info("parent done")
+""")
+
+
+def test_forked_workers_log_through_the_parent(tmp_path):
+    log_dir = str(tmp_path / 'logs')
+    script = tmp_path / 'pooled.py'
+    script.write_text(POOL_SCRIPT.format(root=ROOT_DIR, log_dir=log_dir))
+
+    subprocess.run([sys.executable, str(script)], check=True, timeout=120)
+
+    assert os.listdir(log_dir) == ['pooled.log']
+    with open(os.path.join(log_dir, 'pooled.log'), encoding='utf-8') as log_file:
+        log = log_file.read()
+    for index in range(8):
+        assert f"worker record {index}" in log
+    assert "parent record" in log and "parent done" in log
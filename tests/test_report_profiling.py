@@ -0,0 +1,67 @@
+import os
+import threading
+
+import pytest
+
+from conftest import report_form
+from report_profiling import ReportProfiler, stage
+
+
+def run_in_thread(profiler, entered, release):
+    def target():
+        with profiler.run():
+            with stage("work"):
+                entered.set()
+                release.wait(timeout=30)
+
+    thread = threading.Thread(target=target)
+    thread.start()
+    return thread
+
+
+@pytest.mark.parametrize('options', [{'memory'}, {'cprofile'}])
+def test_capturing_runs_wait_for_each_other(options):
+    first_entered, first_release = threading.Event(), threading.Event()
+    second_entered, second_release = threading.Event(), threading.Event()
+    first = run_in_thread(ReportProfiler.from_options(options), first_entered, first_release)
+    assert first_entered.wait(timeout=10)
+
+    second_profiler = ReportProfiler.from_options(options)
+    second = run_in_thread(second_profiler, second_entered, second_release)
+    assert not second_entered.wait(timeout=0.3)
+
+    first_release.set()
+    assert second_entered.wait(timeout=10)
+    second_release.set()
+    first.join()
+    second.join()
+    assert second_profiler.stages["work"]["calls"] == 1
+
+
+def test_timing_runs_do_not_wait():
+    first_entered, first_release = threading.Event(), threading.Event()
+    second_entered, second_release = threading.Event(), threading.Event()
+    first = run_in_thread(ReportProfiler(), first_entered, first_release)
+    assert first_entered.wait(timeout=10)
+
+    second = run_in_thread(ReportProfiler(), second_entered, second_release)
+    try:
+        assert second_entered.wait(timeout=10)
+    finally:
+        first_release.set()
+        second_release.set()
+        first.join()
+        second.join()
+
+
+def test_only_the_newest_web_profiles_are_kept(web_app, scan_csv):
+    web_app.config.update(REPORT_PROFILING=True, PROFILES_KEEP=2)
+    client = web_app.test_client()
+
+    names = []
+    for prefix in ('AAA', 'BBB', 'CCC'):
+        response = client.post('/?profile=timings', data=report_form(scan_csv, prefix))
+        assert response.status_code == 200
+        names.append(response.headers['X-Report-Profile'])
+
+    assert sorted(os.listdir(web_app.config['PROFILES_FOLDER'])) == sorted(names[1:])
@@ -0,0 +1,78 @@
+import io
+import os
+
+import pytest
+
+import script5
+from conftest import report_form
+from scan_cache import ENTRY_HEADER, ScanCache
+
+
+def findings_by_name(grouped):
+    return [(name, finding) for name, finding in grouped.items()]
+
+
+def test_cached_scan_serves_another_prefix_without_parsing(tmp_path, scan_csv, monkeypatch):
+    scan_cache = ScanCache(str(tmp_path / 'scan_cache'))
+    expected = script5.load_grouped_vulnerabilities(scan_csv, 'NEW')
+    script5.load_grouped_vulnerabilities(scan_csv, 'OLD', scan_cache=scan_cache)
+
+    def fail_parse(*args, **kwargs):
+        raise AssertionError("the scan was parsed again")
+    monkeypatch.setattr(script5, 'parse_scan', fail_parse)
+    monkeypatch.setattr(script5, 'parse_scans', fail_parse)
+
+    assert findings_by_name(script5.load_grouped_vulnerabilities(scan_csv, 'NEW', scan_cache=scan_cache)) == \
+        findings_by_name(expected)
+
+
+def test_key_is_the_same_for_a_path_and_a_stream_of_the_same_bytes(tmp_path, scan_csv):
+    scan_cache = ScanCache(str(tmp_path / 'scan_cache'))
+    with open(scan_csv, 'rb') as scan_file:
+        stream = io.BytesIO(scan_file.read())
+    assert scan_cache.key([scan_csv]) == scan_cache.key([stream])
+    # Hashing leaves the stream where it was
+    stream.seek(10)
+    scan_cache.key([stream])
+    assert stream.tell() == 10
+    assert scan_cache.key([io.StringIO("text")]) is None
+
+
+@pytest.mark.parametrize('content', [b'', b'not a cache entry', ENTRY_HEADER + b'truncated pickle'])
+def test_unreadable_entries_are_discarded(tmp_path, content):
+    scan_cache = ScanCache(str(tmp_path / 'scan_cache'))
+    key = 'ab' * 32
+    path = scan_cache._path(key)
+    os.makedirs(os.path.dirname(path))
+    with open(path, 'wb') as entry:
+        entry.write(content)
+
+    assert scan_cache.load(key) is None
+    assert not os.path.exists(path)
+
+
+def test_store_keeps_the_cache_within_max_bytes(tmp_path, scan_csv):
+    parsed = script5.parse_scan(scan_csv)
+    scan_cache = ScanCache(str(tmp_path / 'scan_cache'))
+    scan_cache.store('ab' * 32, parsed.column_map, parsed.grouped_vulnerabilities)
+    # Room for one entry only
+    scan_cache.max_bytes = os.path.getsize(scan_cache._path('ab' * 32)) * 3 // 2
+    scan_cache.store('cd' * 32, parsed.column_map, parsed.grouped_vulnerabilities)
+
+    assert scan_cache.load('ab' * 32) is None
+    assert scan_cache.load('cd' * 32) is not None
+
+
+def test_web_regeneration_with_another_prefix_hits_the_cache(web_app, scan_csv, monkeypatch):
+    client = web_app.test_client()
+    first = client.post('/', data=report_form(scan_csv, prefix='OLD'), content_type='multipart/form-data')
+    assert first.status_code == 200
+    entries = [name for _, _, names in os.walk(web_app.config['SCAN_CACHE_FOLDER']) for name in names]
+    assert len(entries) == 1
+
+    def fail_parse(*args, **kwargs):
+        raise AssertionError("the scan was parsed again")
+    monkeypatch.setattr(script5, 'parse_scan', fail_parse)
+
+    second = client.post('/', data=report_form(scan_csv, prefix='NEW'), content_type='multipart/form-data')
+    assert second.status_code == 200
@@ -1,256 +1,580 @@
-from flask import Flask, request, render_template, send_file, flash, redirect, url_for
+from flask import Flask, Request, request, render_template, send_file, flash, redirect, url_for, jsonify
 import os
-import tempfile
-from docx.shared import Pt
 import csv
+import shutil
+import threading
+import uuid
+import zipfile
+import json
+from contextlib import nullcontext
 from werkzeug.utils import secure_filename
 import logging
 from datetime import datetime
-from script5 import main as generate_document, validate_csv_columns, required_fields
-from docxtpl import DocxTemplate
-from docxcompose.composer import Composer
-from docx import Document
+from script5 import (validate_csv_columns, required_fields, parse_scan_sources, merge_parsed_scans, archive_scan_members,
+                     is_gzip, get_finding_block_template)
+from report_pipeline import build_report_stream, ReportGenerationError
+from report_jobs import ReportJobQueue, JOB_DONE, JOB_RETENTION_SECONDS, PROFILE_FILENAME, SCANS_DIRNAME, save_parsed_scan
+from chunked_uploads import UploadStore, ChunkedUploadError, OffsetMismatch
+from template_cache import template_cache
+from report_logging import configure_logging
+from report_profiling import ReportProfiler, expire_profiles, parse_profile_options, stage
+from finding_cache import FindingCache, DEFAULT_MAX_BYTES as DEFAULT_FINDING_CACHE_MAX_BYTES
+from scan_cache import ScanCache
 
-def enforce_font_on_appended_content(doc, font_name="Helvetica", font_size=10.5, from_paragraph_idx=None):
-    """
-    Enforce font size and font family starting from a specific paragraph index,
-    assuming everything before that is from the cover page.
-    """
-    logger.info(f"Enforcing font settings from paragraph index {from_paragraph_idx}")
-    try:
-        if from_paragraph_idx is None:
-            from_paragraph_idx = 0  # default to all paragraphs
-
-        for i, para in enumerate(doc.paragraphs):
-            if i >= from_paragraph_idx:
-                for run in para.runs:
-                    run.font.name = font_name
-                    run.font.size = Pt(font_size)
-
-        for table in doc.tables:
-            for row in table.rows:
-                for cell in row.cells:
-                    for para in cell.paragraphs:
-                        for run in para.runs:
-                            run.font.name = font_name
-                            run.font.size = Pt(font_size)
-    except Exception as e:
-        logger.error(f"Failed to enforce font on appended content: {str(e)}")   
-# Set up logging
-log_directory = "logs"
-if not os.path.exists(log_directory):
-    os.makedirs(log_directory)
-
-log_filename = os.path.join(log_directory, f"webapp_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log")
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(log_filename),
-        logging.StreamHandler()
-    ]
-)
+# Set up logging; gunicorn workers share webapp.log, so none of them rotates it
+configure_logging("webapp", rotate=False)
 logger = logging.getLogger(__name__)
 
 app = Flask(__name__)
 app.secret_key = 'your_secret_key_here' 
-app.config['UPLOAD_FOLDER'] = tempfile.mkdtemp()
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024 
+app.config['REPORT_TEMPLATE'] = os.path.join(app.root_path, 'templates', 'report_template.docx')
+# Background report jobs: work directories and the SQLite job store live here
+app.config['JOBS_FOLDER'] = os.path.join(app.root_path, 'jobs')
+app.config['REPORT_JOB_EXECUTOR'] = 'thread'  # or 'process'
+app.config['REPORT_JOB_WORKERS'] = os.cpu_count()
+# Finished jobs, with their uploaded scans and reports, are deleted after this long
+app.config['JOB_RETENTION_SECONDS'] = JOB_RETENTION_SECONDS
+# Per-run profiling (?profile=timings,cprofile,memory) and where its reports are kept
+app.config['REPORT_PROFILING'] = os.environ.get('REPORT_PROFILING') == '1'
+app.config['PROFILES_FOLDER'] = os.path.join(app.root_path, 'profiles')
+# Only the newest profile reports are kept in PROFILES_FOLDER
+app.config['PROFILES_KEEP'] = 200
+# Rendered finding pages reused when a scan is uploaded again; None disables the cache
+app.config['FINDING_CACHE_FOLDER'] = os.path.join(app.root_path, 'finding_cache')
+# Least recently used finding pages are pruned after each report once the cache is over this size
+app.config['FINDING_CACHE_MAX_BYTES'] = DEFAULT_FINDING_CACHE_MAX_BYTES
+# Parsed scans reused when the same file is uploaded again, e.g. with another prefix; None disables the cache
+app.config['SCAN_CACHE_FOLDER'] = os.path.join(app.root_path, 'scan_cache')
+# Resumable chunked uploads for scans over MAX_CONTENT_LENGTH, removed when unused for a day
+app.config['UPLOADS_FOLDER'] = os.path.join(app.root_path, 'uploads')
+app.config['UPLOAD_MAX_AGE_SECONDS'] = 24 * 3600
 
 ALLOWED_EXTENSIONS = {'csv'}
+# Zip archives of CSVs are accepted alongside plain CSVs
+ALLOWED_ARCHIVE_EXTENSIONS = {'zip'}
+# Gzipped CSVs (scan.csv.gz) are decompressed as they are parsed
+ALLOWED_COMPRESSED_EXTENSIONS = {'gz'}
+
+def warm_up():
+    """Parse the cover template and build the finding block template before the first request"""
+    try:
+        if os.path.exists(app.config['REPORT_TEMPLATE']):
+            template_cache.warm(app.config['REPORT_TEMPLATE'])
+        get_finding_block_template()
+    except Exception as e:
+        logger.error(f"Warm-up failed, templates will be loaded on first use: {str(e)}")
+
+warm_up()
 
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
-def merge_documents(first_doc_path, second_doc_path, output_path):
-    """Merge two Word documents into one"""
-    logger.info("Merging documents")
+def allowed_archive(filename):
+    return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_ARCHIVE_EXTENSIONS
+
+def allowed_compressed(filename):
+    return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_COMPRESSED_EXTENSIONS
+
+def allowed_upload(filename):
+    return allowed_file(filename) or allowed_archive(filename) or allowed_compressed(filename)
+
+def send_report(report, download_name, profiler=None):
+    """
+    Send a generated report from a path or an in-memory stream.
+
+    For a profiled run the stage timings go in a Server-Timing header and the
+    full breakdown is saved to PROFILES_FOLDER, named in X-Report-Profile;
+    the folder keeps the newest PROFILES_KEEP of them.
+    """
+    response = send_file(
+        report,
+        as_attachment=True,
+        download_name=download_name,
+        mimetype='application/vnd.openxmlformats-officedocument.wordprocessingml.document'
+    )
+    if profiler is not None:
+        os.makedirs(app.config['PROFILES_FOLDER'], exist_ok=True)
+        profile_name = f"{uuid.uuid4().hex}.json"
+        profiler.write(os.path.join(app.config['PROFILES_FOLDER'], profile_name))
+        expire_profiles(app.config['PROFILES_FOLDER'], app.config['PROFILES_KEEP'])
+        response.headers['Server-Timing'] = profiler.server_timing()
+        response.headers['X-Report-Profile'] = profile_name
+    return response
+
+class UploadError(ValueError):
+    """The submitted form or CSV was rejected; the message is shown to the user"""
+
+
+def requested_profile_options():
+    """Profile options from the query string, or None when the run is not profiled"""
+    value = request.args.get('profile')
+    if not value or not app.config['REPORT_PROFILING']:
+        return None
     try:
-        # Open the first document (cover)
-        first_doc = Document(first_doc_path)
+        return parse_profile_options(value) or {'timings'}
+    except ValueError as e:
+        raise UploadError(str(e))
+
+
+def read_report_form():
+    """Read the client information from the submitted form"""
+    company_name = request.form.get('companyName', 'Company Name')
+    network_type = request.form.get('networkType', 'External Network')
+    assessment_date = request.form.get('assessmentDate')
+    finding_id_prefix = request.form.get('findingIdPrefix')
+    if assessment_date:
+        # Convert from YYYY-MM-DD to your preferred format (e.g., DD/MM/YYYY)
+        date_obj = datetime.strptime(assessment_date, '%Y-%m-%d')
+        assessment_date = date_obj.strftime('%d/%m/%Y')
+    else:
+        assessment_date = datetime.now().strftime('%d/%m/%Y')
+    findings_count = request.form.get('findingsCount', '5')
 
-        # Open the second document (VA report)
-        second_doc = Document(second_doc_path)
+    if not finding_id_prefix:
+        raise UploadError('Finding ID prefix is required')
 
-        # Record how many paragraphs are in the cover page (to know where appended content starts)
-        cover_paragraph_count = len(first_doc.paragraphs)
+    logger.info(f"Processing report for {company_name}, {network_type}")
+    return {
+        'company_name': company_name,
+        'finding_id_prefix': finding_id_prefix,
+        'context': {
+            'companyName': company_name,
+            'networkType': network_type,
+            'assessmentDate': assessment_date,
+            'findingsCount': findings_count,
+        },
+        'template_path': app.config['REPORT_TEMPLATE'],
+    }
+
+
+class CSVHeaderError(Exception):
+    """An upload's CSV header failed validation while the request body was still arriving"""
+
+
+class HeaderValidatingStream:
+    """
+    Upload spool that validates the CSV header as soon as its first line is
+    written, so a file with the wrong columns is rejected before the rest of
+    the request body is stored. Everything else is delegated to the spool.
+    """
+    MAX_HEADER_BYTES = 64 * 1024
 
-        # Append all elements from the second document to the first
-        for element in second_doc.element.body:
-            first_doc.element.body.append(element)
+    def __init__(self, spool):
+        self._spool = spool
+        self._head = b''
+        self._checked = False
+
+    def _check_header(self):
+        self._checked = True
+        first_line = self._head.split(b'\n', 1)[0].decode('utf-8', errors='ignore')
+        header = next(csv.reader([first_line]), [])
+        self._head = b''
+
+        column_map = {}
+        for i, column_name in enumerate(header):
+            column_map[column_name] = i
+
+        valid, error_message = validate_csv_columns(column_map, required_fields)
+        if not valid:
+            raise CSVHeaderError(error_message)
+
+    def write(self, data):
+        if not self._checked:
+            self._head += data
+            if b'\n' in self._head or len(self._head) > self.MAX_HEADER_BYTES:
+                self._check_header()
+        return self._spool.write(data)
+
+    def seek(self, *args):
+        # Header-only files have no newline; they are checked once writing is done
+        if not self._checked:
+            self._check_header()
+        return self._spool.seek(*args)
+
+    def __getattr__(self, name):
+        return getattr(self._spool, name)
+
+
+class ReportRequest(Request):
+    """Request that spools CSV uploads through HeaderValidatingStream"""
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        stream = super()._get_file_stream(total_content_length, content_type, filename, content_length)
+        if filename and allowed_file(filename):
+            return HeaderValidatingStream(stream)
+        return stream
+
+
+app.request_class = ReportRequest
+
+
+def receive_upload(work_dir=None):
+    """
+    Validate the submitted form and scans.
+
+    The file field can carry several CSVs, gzipped CSVs and zip archives of
+    CSVs, and uploadId fields name completed chunked uploads; all their
+    findings are merged into one report. CSV headers are checked while the
+    upload arrives. Without a work_dir the uploads are parsed straight from
+    their streams into one merged ParsedScan, in the same single pass per
+    file that generation uses. With a work_dir, for a background job, a
+    single CSV is saved there as dataset.csv and several files under scans/;
+    chunked uploads were parsed while their chunks arrived, so their merged
+    ParsedScan is saved instead. Either way it ends up in params['dataset'].
+    """
+    try:
+        # Parse the request body now so header errors surface before anything else
+        request.files
+    except CSVHeaderError as e:
+        logger.error(f"CSV validation failed: {str(e)}")
+        raise UploadError(f"CSV validation failed: {str(e)}")
+
+    params = read_report_form()
+    upload_ids = request.form.getlist('uploadId')
+
+    if 'file' not in request.files and not upload_ids:
+        raise UploadError('No file part')
+
+    files = [file for file in request.files.getlist('file') if file.filename]
+
+    if not files and not upload_ids:
+        raise UploadError('No selected file')
+
+    for file in files:
+        if not allowed_upload(file.filename):
+            raise UploadError('Only CSV files, gzipped CSVs or ZIP archives of them are allowed')
+
+    filenames = [secure_filename(file.filename) for file in files]
+    if filenames:
+        logger.info(f"Files uploaded: {', '.join(filenames)}")
+    if work_dir is None or upload_ids:
+        parsed_scans = [parse_uploaded_files(files, filenames)] if files else []
+        parsed_scans.extend(parse_chunked_uploads(upload_ids))
+        parsed_scan = merge_parsed_scans(parsed_scans)
+        if work_dir is None:
+            params['dataset'] = parsed_scan
+        else:
+            params['dataset'] = save_parsed_scan(parsed_scan, work_dir)
+        for upload_id in upload_ids:
+            get_upload_store().discard(upload_id)
+    elif len(files) == 1 and allowed_file(files[0].filename):
+        dataset_path = os.path.join(work_dir, 'dataset.csv')
+        files[0].save(dataset_path)
+        params['dataset'] = dataset_path
+    else:
+        scans_dir = os.path.join(work_dir, SCANS_DIRNAME)
+        os.makedirs(scans_dir)
+        params['dataset'] = []
+        for index, (file, filename) in enumerate(zip(files, filenames), start=1):
+            # The index keeps the upload order, which decides finding order
+            scan_path = os.path.join(scans_dir, f"{index:03d}_{filename}")
+            file.save(scan_path)
+            if allowed_archive(filename):
+                check_archive(scan_path, filename)
+            elif allowed_compressed(filename) and not is_gzip(scan_path):
+                raise UploadError(f"{filename} is not a gzip file")
+            params['dataset'].append(scan_path)
+    return params
 
-        # Apply font only to the newly appended content
-        enforce_font_on_appended_content(first_doc, font_name="Helvetica", font_size=10.5, from_paragraph_idx=cover_paragraph_count)
 
-        # Save the merged document
-        first_doc.save(output_path)
-        logger.info("Documents merged successfully")
-        return True
+def parse_uploaded_files(files, filenames):
+    """Parse the uploaded files from their streams into one merged ParsedScan"""
+    try:
+        with stage("parse_csv"):
+            parsed_scan = parse_scan_sources([file.stream for file in files], scan_cache=get_scan_cache(), names=filenames)
+    except (ValueError, OSError, zipfile.BadZipFile) as e:
+        # OSError covers gzip.BadGzipFile
+        raise UploadError(f"Upload rejected: {str(e)}")
+    if not parsed_scan.valid:
+        raise UploadError(f"CSV validation failed: {parsed_scan.error_message}")
+    return parsed_scan
+
+
+def parse_chunked_uploads(upload_ids):
+    """The ParsedScans of completed chunked uploads, waiting for any still being parsed"""
+    parsed_scans = []
+    with stage("parse_chunked_uploads"):
+        for upload_id in upload_ids:
+            upload = get_upload_store().get(upload_id)
+            if upload is None:
+                raise UploadError(f"Unknown upload: {upload_id}")
+            try:
+                parsed_scan = upload.parsed_scan()
+            except ChunkedUploadError as e:
+                raise UploadError(f"CSV validation failed: {str(e)}")
+            cache_scan(upload.data_path, parsed_scan)
+            parsed_scans.append(parsed_scan)
+    return parsed_scans
+
+
+def cache_scan(scan_path, parsed_scan):
+    """Add a scan parsed outside parse_scan_sources to the scan cache, so a plain re-upload of it skips parsing"""
+    scan_cache = get_scan_cache()
+    if scan_cache is None:
+        return
+    try:
+        scan_cache.store(scan_cache.key([scan_path]), parsed_scan.column_map, parsed_scan.grouped_vulnerabilities)
     except Exception as e:
-        logger.error(f"Error merging documents: {str(e)}")
-        return False
+        logger.warning(f"Failed to cache the parsed scan: {str(e)}")
+
+
+def check_archive(archive_path, filename):
+    """Reject an uploaded archive that is not a zip or holds no CSVs before a job is queued"""
+    try:
+        with zipfile.ZipFile(archive_path) as archive:
+            members = archive_scan_members(archive)
+    except zipfile.BadZipFile:
+        raise UploadError(f"{filename} is not a valid ZIP archive")
+    if not members:
+        raise UploadError(f"No CSV files found in {filename}")
+
+
+_job_queue = None
+_job_queue_lock = threading.Lock()
+_upload_store = None
+_upload_store_lock = threading.Lock()
+_finding_cache = None
+_finding_cache_lock = threading.Lock()
+_scan_cache = None
+_scan_cache_lock = threading.Lock()
+
+def get_finding_cache():
+    """The finding page cache from the app config, or None when it is disabled"""
+    global _finding_cache
+    cache_dir = app.config['FINDING_CACHE_FOLDER']
+    if not cache_dir:
+        return None
+    with _finding_cache_lock:
+        max_bytes = app.config['FINDING_CACHE_MAX_BYTES']
+        if _finding_cache is None or (_finding_cache.directory, _finding_cache.max_bytes) != (cache_dir, max_bytes):
+            _finding_cache = FindingCache(cache_dir, max_bytes)
+        return _finding_cache
+
+def get_scan_cache():
+    """The parsed scan cache from the app config, or None when it is disabled"""
+    global _scan_cache
+    cache_dir = app.config['SCAN_CACHE_FOLDER']
+    if not cache_dir:
+        return None
+    with _scan_cache_lock:
+        if _scan_cache is None or _scan_cache.directory != cache_dir:
+            _scan_cache = ScanCache(cache_dir)
+        return _scan_cache
+
+def get_upload_store():
+    """Create the chunked upload store on first use, from the app config"""
+    global _upload_store
+    with _upload_store_lock:
+        if _upload_store is None or _upload_store.directory != app.config['UPLOADS_FOLDER']:
+            _upload_store = UploadStore(app.config['UPLOADS_FOLDER'], app.config['UPLOAD_MAX_AGE_SECONDS'])
+        return _upload_store
+
+def get_job_queue():
+    """
+    Create the background job queue on first use, from the app config.
+
+    Creating it resumes the jobs a previous process left queued or stuck
+    running, so every server process (gunicorn workers included) picks them
+    up; the job store lets only one of them claim each job.
+    """
+    global _job_queue
+    with _job_queue_lock:
+        if _job_queue is None:
+            _job_queue = ReportJobQueue(
+                app.config['JOBS_FOLDER'],
+                max_workers=app.config['REPORT_JOB_WORKERS'],
+                executor=app.config['REPORT_JOB_EXECUTOR'],
+                retention_seconds=app.config['JOB_RETENTION_SECONDS'],
+            )
+            _job_queue.sweep()
+        return _job_queue
+
+
+def job_status(job):
+    """JSON-friendly view of a job record"""
+    status = {
+        'job_id': job['id'],
+        'status': job['status'],
+        'status_url': url_for('get_job', job_id=job['id']),
+    }
+    if job['status'] == JOB_DONE:
+        status['download_url'] = url_for('download_job', job_id=job['id'])
+        status['merged'] = bool(job['merged'])
+    if job['error']:
+        status['error'] = job['error']
+    profile_path = os.path.join(job['work_dir'], PROFILE_FILENAME)
+    if job['status'] == JOB_DONE and os.path.exists(profile_path):
+        with open(profile_path, encoding='utf-8') as profile_file:
+            status['profile'] = json.load(profile_file)
+    return status
 
 
 @app.route('/', methods=['GET', 'POST'])
 def index():
     if request.method == 'POST':
-        # Get client information
-        company_name = request.form.get('companyName', 'Company Name')
-        network_type = request.form.get('networkType', 'External Network')
-        assessment_date = request.form.get('assessmentDate')
-        finding_id_prefix = request.form.get('findingIdPrefix')
-        if assessment_date:
-            # Convert from YYYY-MM-DD to your preferred format (e.g., DD/MM/YYYY)
-            date_obj = datetime.strptime(assessment_date, '%Y-%m-%d')
-            assessment_date = date_obj.strftime('%d/%m/%Y')
-        else:
-            assessment_date = datetime.now().strftime('%d/%m/%Y')
-        findings_count = request.form.get('findingsCount', '5')
+        try:
+            profile_options = requested_profile_options()
+            profiler = ReportProfiler.from_options(profile_options) if profile_options else None
+            # The whole pipeline runs in memory, from one pass over the upload stream to the response
+            with profiler.run() if profiler else nullcontext():
+                params = receive_upload()
+                report, merged = build_report_stream(
+                    params['dataset'],
+                    params['finding_id_prefix'],
+                    params['context'],
+                    params['template_path'],
+                    get_finding_cache(),
+                    get_scan_cache(),
+                )
+            if merged:
+                return send_report(report, f"{params['company_name']}_vulnerability_report.docx", profiler)
 
-        if not finding_id_prefix:
-            flash('Finding ID prefix is required')
-            return redirect(request.url)
-        
-        logger.info(f"Processing report for {company_name}, {network_type}")
-        
-      
-        if 'file' not in request.files:
-            flash('No file part')
+            flash("Failed to merge documents")
+            # Fallback: return just the VA report
+            return send_report(report, 'vulnerability_report.docx', profiler)
+
+        except UploadError as e:
+            flash(str(e))
             return redirect(request.url)
-        
-        file = request.files['file']
-        
-       
-        if file.filename == '':
-            flash('No selected file')
+        except ReportGenerationError as e:
+            flash(str(e))
+        except Exception as e:
+            flash(f"An error occurred: {str(e)}")
+            logger.exception("Exception during file processing")
             return redirect(request.url)
-        
-        if file and allowed_file(file.filename):
-            try:
-                filename = secure_filename(file.filename)
-                filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-                file.save(filepath)
-                logger.info(f"File uploaded: {filename}")
-                
-            
-                with open(filepath, 'r', encoding='utf-8', errors='ignore') as csv_file:
-                    csv_reader = csv.reader(csv_file)
-                    header = next(csv_reader)
-                    
-                  
-                    column_map = {}
-                    for i, column_name in enumerate(header):
-                        column_map[column_name] = i
-                    
-                    valid, error_message = validate_csv_columns(column_map, required_fields)
-                    if not valid:
-                        flash(f"CSV validation failed: {error_message}")
-                        logger.error(f"CSV validation failed: {error_message}")
-                        return redirect(request.url)
-                
-                # Save as dataset.csv for the script
-                dataset_path = os.path.join(app.config['UPLOAD_FOLDER'], 'dataset.csv')
-                if os.path.exists(dataset_path):
-                    os.remove(dataset_path)  # Delete the existing file first
-                os.rename(filepath, dataset_path)
-                
-                # Step 1: Generate the cover page document using DocxTemplate
-                try:
-                    template_path = os.path.join('templates', 'report_template.docx')
-                    
-                    # Make sure the template exists
-                    if not os.path.exists(template_path):
-                        flash("Report template not found")
-                        logger.error("Report template not found")
-                        return redirect(request.url)
-                        
-                    doc = DocxTemplate(template_path)
-                    
-                    context = {
-                        'companyName': company_name,
-                        'networkType': network_type,
-                        'assessmentDate': assessment_date,
-                        'findingsCount': findings_count,
-                    }
-                    
-                    doc.render(context)
-                    
-                    # Save the cover document
-                    cover_path = os.path.join(app.config['UPLOAD_FOLDER'], 'cover_document.docx')
-                    doc.save(cover_path)
-                    logger.info("Cover page generated successfully")
-                    
-                except Exception as e:
-                    flash(f"Failed to generate cover page: {str(e)}")
-                    logger.error(f"Failed to generate cover page: {str(e)}")
-                    return redirect(request.url)
-                
-                # Step 2: Set the current working directory to the upload folder and run the VA report generation
-                original_dir = os.getcwd()
-                os.chdir(app.config['UPLOAD_FOLDER'])
-                
-                # Run the document generation
-                success = generate_document(finding_id_prefix)
-                
-                # Reset working directory
-                os.chdir(original_dir)
-                
-                if success:
-                    output_path = os.path.join(app.config['UPLOAD_FOLDER'], 'output_document.docx')
-                    if os.path.exists(output_path):
-                        logger.info("VA report generated successfully")
-                        
-                        # Step 3: Merge the documents
-                        merged_path = os.path.join(app.config['UPLOAD_FOLDER'], 'merged_report.docx')
-                        merge_success = merge_documents(cover_path, output_path, merged_path)
-                        
-                        if merge_success:
-                            logger.info("Final report generated successfully")
-                            return send_file(
-                                merged_path,
-                                as_attachment=True,
-                                download_name=f'{company_name}_vulnerability_report.docx',
-                                mimetype='application/vnd.openxmlformats-officedocument.wordprocessingml.document'
-                            )
-                        else:
-                            flash("Failed to merge documents")
-                            logger.error("Document merging failed")
-                            # Fallback: return just the VA report
-                            return send_file(
-                                output_path,
-                                as_attachment=True,
-                                download_name='vulnerability_report.docx',
-                                mimetype='application/vnd.openxmlformats-officedocument.wordprocessingml.document'
-                            )
-                    else:
-                        flash("Document was not generated properly")
-                        logger.error("Document file not found after generation")
-                else:
-                    flash("Failed to generate the vulnerability report. Please check the logs for details.")
-                    logger.error("VA report generation failed")
-            
-            except Exception as e:
-                flash(f"An error occurred: {str(e)}")
-                logger.exception("Exception during file processing")
-                return redirect(request.url)
-        else:
-            flash('Only CSV files are allowed')
     
     # Get the required fields to display in the template
     required_columns = list(required_fields.values())
     
     return render_template('index.html', required_columns=required_columns)
 
+
+@app.route('/jobs', methods=['POST'])
+def submit_job():
+    """Queue a report and return its job id straight away"""
+    job_queue = get_job_queue()
+    job_id, work_dir = job_queue.new_job()
+    try:
+        profile_options = requested_profile_options()
+        params = receive_upload(work_dir)
+    except UploadError as e:
+        shutil.rmtree(work_dir, ignore_errors=True)
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        shutil.rmtree(work_dir, ignore_errors=True)
+        logger.exception("Exception during file processing")
+        return jsonify({'error': f"An error occurred: {str(e)}"}), 500
+
+    # The dataset always sits in the job's work directory
+    del params['dataset']
+    if profile_options:
+        params['profile'] = sorted(profile_options)
+    if app.config['FINDING_CACHE_FOLDER']:
+        params['finding_cache_dir'] = app.config['FINDING_CACHE_FOLDER']
+        params['finding_cache_max_bytes'] = app.config['FINDING_CACHE_MAX_BYTES']
+    if app.config['SCAN_CACHE_FOLDER']:
+        params['scan_cache_dir'] = app.config['SCAN_CACHE_FOLDER']
+    job_queue.submit(job_id, work_dir, params)
+    return jsonify(job_status(job_queue.get(job_id))), 202
+
+
+@app.route('/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    job = get_job_queue().get(job_id)
+    if job is None:
+        return jsonify({'error': 'Unknown job'}), 404
+    return jsonify(job_status(job))
+
+
+def upload_status(upload):
+    """JSON-friendly view of a chunked upload"""
+    status = upload.status()
+    status['upload_url'] = url_for('upload_chunk', upload_id=upload.upload_id)
+    status['complete_url'] = url_for('complete_upload', upload_id=upload.upload_id)
+    return status
+
+
+@app.route('/uploads', methods=['POST'])
+def create_upload():
+    """
+    Start a resumable chunked upload. The client then PUTs the file to
+    upload_url in chunks, each at ?offset=<bytes sent so far>, and POSTs to
+    complete_url; the returned upload_id goes in the report form's uploadId
+    field. The scan is parsed while the chunks arrive.
+    """
+    body = request.get_json(silent=True) or {}
+    filename = secure_filename(body.get('filename') or '')
+    if not filename or not allowed_upload(filename):
+        return jsonify({'error': 'Only CSV files, gzipped CSVs or ZIP archives of them are allowed'}), 400
+    upload = get_upload_store().create(filename)
+    return jsonify(upload_status(upload)), 201
+
+
+@app.route('/uploads/<upload_id>', methods=['GET', 'PUT', 'DELETE'])
+def upload_chunk(upload_id):
+    """GET the upload's status and offset, PUT the next chunk or DELETE the upload"""
+    upload = get_upload_store().get(upload_id)
+    if upload is None:
+        return jsonify({'error': 'Unknown upload'}), 404
+    if request.method == 'DELETE':
+        get_upload_store().discard(upload_id)
+        return '', 204
+    if request.method == 'PUT':
+        offset = request.args.get('offset', type=int)
+        if offset is None:
+            return jsonify({'error': 'The chunk offset is required'}), 400
+        try:
+            # Copied to disk as it is read, never held in memory as a whole
+            upload.write_chunk(offset, request.stream)
+        except OffsetMismatch as e:
+            # Resume from the offset the server has, e.g. after a dropped connection
+            return jsonify(dict(upload_status(upload), error=str(e))), 409
+        except ChunkedUploadError as e:
+            return jsonify({'error': str(e)}), 400
+    return jsonify(upload_status(upload))
+
+
+@app.route('/uploads/<upload_id>/complete', methods=['POST'])
+def complete_upload(upload_id):
+    """Mark the upload complete; the optional size in the JSON body is checked against the bytes received"""
+    upload = get_upload_store().get(upload_id)
+    if upload is None:
+        return jsonify({'error': 'Unknown upload'}), 404
+    size = (request.get_json(silent=True) or {}).get('size')
+    try:
+        upload.finish(size)
+    except ChunkedUploadError as e:
+        return jsonify(dict(upload_status(upload), error=str(e))), 400
+    return jsonify(upload_status(upload))
+
+
+@app.route('/jobs/<job_id>/download', methods=['GET'])
+def download_job(job_id):
+    job = get_job_queue().get(job_id)
+    if job is None:
+        return jsonify({'error': 'Unknown job'}), 404
+    if job['status'] != JOB_DONE:
+        return jsonify(job_status(job)), 409
+
+    if job['merged']:
+        download_name = f"{job['params']['company_name']}_vulnerability_report.docx"
+    else:
+        download_name = 'vulnerability_report.docx'
+    return send_report(job['result_path'], download_name)
+
 if __name__ == '__main__':
     # Ensure templates directory exists
-    if not os.path.exists('templates'):
-        os.makedirs('templates')
+    templates_dir = os.path.dirname(app.config['REPORT_TEMPLATE'])
+    if not os.path.exists(templates_dir):
+        os.makedirs(templates_dir)
     
     # Check if the template exists, if not create a placeholder
-    template_path = os.path.join('templates', 'report_template.docx')
-    if not os.path.exists(template_path):
+    if not os.path.exists(app.config['REPORT_TEMPLATE']):
         logger.warning("Report template not found. Please add a template file.")
-        flash("Report template not found. Please add a template file.")
     
+    # Pick up report jobs left unfinished by a previous run before serving requests
+    get_job_queue()
+
     logger.info("Starting web application")
-    app.run
\ No newline at end of file
+    app.run()